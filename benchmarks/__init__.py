@@ -0,0 +1,4 @@
+"""
+Benchmark suite for pyengine. Run every benchmark headless with: python -m benchmarks (see --help)
+Each benchmark module has a run(quick) function returning {name: (value, unit)}, where a lower value is better
+"""
@@ -0,0 +1,41 @@
+"""
+Prefix lookups of console variables at large convar counts
+"""
+from pyengine import ConVar
+
+from .timing import best_time
+
+CONVAR_COUNTS = (1000, 100000)
+PREFIXES = ("", "phys_", "phys_grid_1", "zzz")
+
+
+def run(quick: bool = False) -> dict:
+    """
+    Registers generated convars and times get_startswith for a range of prefixes, from matching everything to nothing
+    :param quick: time fewer lookups
+    :return: microseconds per lookup for each convar count and prefix
+    """
+    saved = dict(ConVar._convars)
+    results = {}
+    try:
+        for count in CONVAR_COUNTS:
+            ConVar._convars.clear()
+            ConVar._rebuild_names()
+            for i in range(count):
+                ConVar.ConVar(int, f"{('phys_grid_', 'r_draw_', 'cl_input_')[i % 3]}{i}", i)
+            lookups = max(20000 // count, 2)
+            if quick:
+                lookups = max(lookups // 4, 1)
+            for prefix in PREFIXES:
+                results[f"convar.startswith.{count}.{prefix or 'all'}"] = \
+                    (best_time(lambda: ConVar.get_startswith(prefix), lookups), "us/lookup")
+    finally:
+        ConVar._convars.clear()
+        ConVar._convars.update(saved)
+        ConVar._rebuild_names()
+    return results
+
+
+if __name__ == "__main__":
+    for name, (value, unit) in run().items():
+        print(f"{name:<40} {value:12.1f} {unit}")
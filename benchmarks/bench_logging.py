@@ -0,0 +1,41 @@
+"""
+Logger throughput, both for lines that are written and lines filtered out by the log level
+"""
+import os
+import tempfile
+import time
+
+from pyengine import EngineLog
+from pyengine.Constants import *
+
+from .timing import best_time
+
+
+def run(quick: bool = False) -> dict:
+    """
+    Times writing lines through a Logger until they are on disk, and calls below the log level
+    :param quick: write fewer lines
+    :return: microseconds per written line (including the writer thread draining the queue) and per filtered call
+    """
+    lines = 5000 if quick else 50000
+    path = os.path.join(tempfile.mkdtemp(), "bench.log")
+    logger = EngineLog.Logger(path, "BENCH")
+    sink = logger.get_sink()
+    sink.set_policy(LOG_POLICY_BLOCK)
+    start = time.perf_counter()
+    for i in range(lines):
+        logger.info("benchmark line %d of %d", i, lines)
+    sink.close()
+    written = (time.perf_counter() - start) / lines * 1e6
+
+    logger.set_level(LOG_ERROR)
+    filtered = best_time(lambda: logger.info("filtered line %d", 1), lines)
+    return {
+        "logging.line": (written, "us/line"),
+        "logging.filtered": (filtered, "us/call")
+    }
+
+
+if __name__ == "__main__":
+    for name, (value, unit) in run().items():
+        print(f"{name:<32} {value:10.3f} {unit} ({1e6 / value:,.0f}/s)")
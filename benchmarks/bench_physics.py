@@ -0,0 +1,56 @@
+"""
+Cost of one physics step as the number of bodies grows, and of stepping many small worlds in one call
+"""
+import random
+
+from pyengine import Physics
+
+from .timing import best_time
+
+BODY_COUNTS = (10, 100, 1000, 10000)
+WORLD_COUNT = 200
+WORLD_BODIES = 20
+
+
+def _build_world(count: int) -> Physics.PhysicsWorld:
+    """
+    Creates a world of count particles scattered above a floor plane
+    :param count: number of particles
+    :return: the world
+    """
+    world = Physics.PhysicsWorld()
+    rand = random.Random(count)
+    side = int(count ** 0.5) + 1
+    world.create_component(Physics.CollisionType.PHYS_PLANE, -100, side * 12 + 50, side * 12 + 200, 20, 0, 0, 0,
+                           apply_grav=False)
+    for i in range(count):
+        world.create_component(Physics.CollisionType.PHYS_PARTICLE, (i % side) * 12, (i // side) * 12, 4, 4,
+                               rand.uniform(-20, 20), rand.uniform(-20, 20), 1)
+    return world
+
+
+def run(quick: bool = False) -> dict:
+    """
+    Times _physics_step advancing a world by exactly one step for each body count, then step_worlds advancing
+    WORLD_COUNT worlds of WORLD_BODIES bodies by one step each
+    :param quick: take fewer steps
+    :return: microseconds per step for each body count and per batch of worlds
+    """
+    results = {}
+    for count in BODY_COUNTS:
+        world = _build_world(count)
+        steps = max(2000 // count, 2)
+        if quick:
+            steps = max(steps // 4, 1)
+        results[f"physics.step.{count}"] = (best_time(lambda: world._physics_step(world.m_step_time), steps),
+                                            "us/step")
+    worlds = [_build_world(WORLD_BODIES) for _ in range(WORLD_COUNT)]
+    stepTime = worlds[0].m_step_time
+    results[f"physics.worlds.{WORLD_COUNT}x{WORLD_BODIES}"] = (
+        best_time(lambda: Physics.step_worlds(worlds, stepTime), 2 if quick else 5), "us/step")
+    return results
+
+
+if __name__ == "__main__":
+    for name, (value, unit) in run().items():
+        print(f"{name:<32} {value:12.1f} {unit}")
@@ -0,0 +1,96 @@
+"""
+Draw call throughput of every render type, batched and unbatched, rendering offscreen
+"""
+import os
+import tempfile
+
+import pygame
+
+from pyengine import Engine, Scene
+from pyengine.Constants import *
+
+from .timing import best_time
+
+COMMANDS = 1000
+
+
+class _DrawScene(Scene.Scene):
+    """ Scene that queues the same set of draw calls every frame """
+
+    def __init__(self):
+        super().__init__()
+        self.m_draw = None
+
+    def draw_scene(self):
+        self.m_draw()
+
+    def step_scene(self):
+        pass
+
+
+def _draw_rects():
+    for i in range(COMMANDS):
+        Engine.fill_rect(i % 600, (i * 7) % 440, 30, 30, (i % 256, 80, 160))
+
+
+def _draw_ellipses():
+    for i in range(COMMANDS):
+        Engine.fill_ellipse(20 + i % 600, 20 + (i * 7) % 440, 15, 10, (i % 256, 80, 160))
+
+
+def _draw_textures():
+    for i in range(COMMANDS):
+        Engine.draw_texture(i % 600, (i * 7) % 440, "bench", 32, 32)
+
+
+def _init_engine() -> None:
+    if Engine.get_init():
+        return
+    Engine.set_headless(HM_OFFSCREEN)
+    # init writes its log file under the working directory, keep it out of wherever the benchmarks were run from
+    directory = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        Engine.init()
+    finally:
+        os.chdir(cwd)
+    Engine.set_log_level(LOG_ERROR)
+    path = os.path.join(directory, "bench.png")
+    texture = pygame.Surface((64, 64))
+    texture.fill((200, 120, 40))
+    pygame.image.save(texture, path)
+    Engine.load_texture(path, "bench")
+
+
+def run(quick: bool = False) -> dict:
+    """
+    Times one frame of COMMANDS draw calls of each render type
+    :param quick: draw fewer frames
+    :return: microseconds per draw call for each render type and batching mode
+    """
+    _init_engine()
+    scene = _DrawScene()
+    Engine.set_scene(scene)
+    frames = 5 if quick else 20
+    draws = {"rect": _draw_rects, "ellipse": _draw_ellipses, "texture": _draw_textures}
+    assert draws.keys() == Engine._ENGINE_DRAW_FUNCTIONS.keys(), "render types changed, update bench_render"
+    results = {}
+    batching = Engine.get_render_batching()
+    # both modes are timed back to back for each render type so drift on the machine does not favour either
+    for rType, draw in draws.items():
+        scene.m_draw = draw
+        for batched in (False, True):
+            Engine.set_render_batching(batched)
+            Engine._engine_draw()
+            perFrame = best_time(Engine._engine_draw, frames)
+            results[f"render.{rType}.{'batched' if batched else 'unbatched'}"] = (perFrame / COMMANDS, "us/draw")
+    Engine.set_render_batching(batching)
+    # release the scene now rather than at interpreter exit, when the engine it unregisters from is torn down
+    Engine.set_scene(None)
+    return results
+
+
+if __name__ == "__main__":
+    for name, (value, unit) in run().items():
+        print(f"{name:<32} {value:10.3f} {unit}")
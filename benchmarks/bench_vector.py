@@ -0,0 +1,80 @@
+"""
+Micro-benchmark comparing pyengine's slotted vectors against the dataclass vectors they replaced
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+
+from pyengine.vector import vec2d, Vec2Array
+
+from .timing import best_time
+
+
+@dataclass()
+class dataclass_vec2d:
+    """ The previous vec2d implementation (only the operators used by the physics step) """
+    x: float = 0
+    y: float = 0
+
+    def __add__(self, other: dataclass_vec2d) -> dataclass_vec2d:
+        return dataclass_vec2d(self.x + other.x, self.y + other.y)
+
+    def __iadd__(self, other: dataclass_vec2d) -> dataclass_vec2d:
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __mul__(self, other: float) -> dataclass_vec2d:
+        return dataclass_vec2d(self.x * other, self.y * other)
+
+
+BODIES = 1000
+STEP = 1 / 32
+
+
+def integrate_dataclass(positions: list, velocities: list) -> None:
+    for pos, vel in zip(positions, velocities):
+        pos += vel * STEP
+
+
+def integrate_operators(positions: list, velocities: list) -> None:
+    for pos, vel in zip(positions, velocities):
+        pos += vel * STEP
+
+
+def integrate_add_scaled(positions: list, velocities: list) -> None:
+    for pos, vel in zip(positions, velocities):
+        pos.add_scaled(vel, STEP)
+
+
+def integrate_array(positions: Vec2Array, velocities: Vec2Array) -> None:
+    positions.add_scaled(velocities, STEP)
+
+
+def run(quick: bool = False) -> dict:
+    """
+    Times one integration step over BODIES vectors for each implementation
+    :param quick: time fewer steps
+    :return: microseconds per step for each implementation
+    """
+    cases = {
+        "vector.dataclass_ops": (integrate_dataclass,
+                                 [dataclass_vec2d(i, i) for i in range(BODIES)],
+                                 [dataclass_vec2d(1, 2) for _ in range(BODIES)]),
+        "vector.slotted_ops": (integrate_operators,
+                               [vec2d(i, i) for i in range(BODIES)],
+                               [vec2d(1, 2) for _ in range(BODIES)]),
+        "vector.add_scaled": (integrate_add_scaled,
+                              [vec2d(i, i) for i in range(BODIES)],
+                              [vec2d(1, 2) for _ in range(BODIES)]),
+        "vector.vec2array_add_scaled": (integrate_array,
+                                        Vec2Array.from_vectors(vec2d(i, i) for i in range(BODIES)),
+                                        Vec2Array.from_vectors(vec2d(1, 2) for _ in range(BODIES))),
+    }
+    number = 50 if quick else 200
+    return {name: (best_time(lambda: funct(positions, velocities), number), f"us/{BODIES}")
+            for name, (funct, positions, velocities) in cases.items()}
+
+
+if __name__ == "__main__":
+    for name, (value, unit) in run().items():
+        print(f"{name:<32} {value:10.1f} {unit}")
@@ -0,0 +1,85 @@
+"""
+Runs the benchmark modules, writes the results as JSON and compares them against a stored baseline
+"""
+import argparse
+import importlib
+import json
+import platform
+import sys
+
+BENCHMARKS = ("bench_render", "bench_physics", "bench_vector", "bench_logging", "bench_convar")
+
+
+def run_benchmarks(names: list, quick: bool) -> dict:
+    """
+    Runs benchmark modules
+    :param names: module names to run
+    :param quick: run fewer iterations, for a fast but noisier result
+    :return: {benchmark name: {"value": value, "unit": unit}}
+    """
+    results = {}
+    for name in names:
+        module = importlib.import_module(f"{__package__}.{name}")
+        print(f"Running {name}...", file=sys.stderr)
+        for benchName, (value, unit) in module.run(quick).items():
+            results[benchName] = {"value": value, "unit": unit}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compares results against a baseline. Every benchmark measures a cost, so higher values are slower
+    :param results: results of this run
+    :param baseline: results of the baseline run
+    :param threshold: fraction a result can be slower than its baseline before it counts as a regression
+    :return: list of (name, baseline value, new value, ratio) for every regression
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or base["value"] <= 0:
+            continue
+        ratio = result["value"] / base["value"]
+        print(f"{name:<40} {base['value']:12.3f} -> {result['value']:12.3f} {result['unit']:<10} x{ratio:.2f}",
+              file=sys.stderr)
+        if ratio > 1 + threshold:
+            regressions.append((name, base["value"], result["value"], ratio))
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help="comma separated benchmark modules to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="run fewer iterations")
+    parser.add_argument("--output", help="file to write the JSON results to (default: stdout)")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fraction slower than the baseline that fails the run (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": run_benchmarks(names, args.quick)
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(report["results"], baseline, args.threshold)
+    for name, base, new, ratio in regressions:
+        print(f"REGRESSION {name}: {base:.3f} -> {new:.3f} (x{ratio:.2f})", file=sys.stderr)
+    return 1 if regressions else 0
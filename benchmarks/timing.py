@@ -0,0 +1,15 @@
+"""
+Timing helpers shared by the benchmark modules
+"""
+import timeit
+
+
+def best_time(funct: callable, number: int, repeat: int = 3) -> float:
+    """
+    Times a function, taking the best of several repeats to reduce noise from the rest of the machine
+    :param funct: function to time, called with no arguments
+    :param number: calls per repeat
+    :param repeat: number of repeats
+    :return: best time per call in microseconds
+    """
+    return min(timeit.repeat(funct, number=number, repeat=repeat)) / number * 1e6
@@ -0,0 +1,284 @@
+"""
+Alternative physics backend that keeps every body in contiguous NumPy arrays and steps them all with vectorised
+expressions. Physics.py stays the reference implementation; this backend mirrors its particle vs plane behaviour but
+does not simulate particle/particle collisions, continuous collision detection or put bodies to sleep
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if __package__ is None or __package__ == '':
+    from Physics import CollisionType
+    from vector import vec2d
+else:
+    from .Physics import CollisionType
+    from .vector import vec2d
+
+
+class ArrayBody:
+    """
+    Lightweight handle to one body of an ArrayPhysicsWorld. Reading a vector attribute returns a copy, assigning one
+    writes it back into the world's arrays. Once the body is removed the handle is detached from the world and using
+    it raises ReferenceError
+    """
+    __slots__ = ("m_world", "m_index")
+
+    def __init__(self, world, index: int):
+        self.m_world = world
+        self.m_index: int = index
+
+    def _get_world(self):
+        if self.m_world is None:
+            raise ReferenceError("ArrayBody has been removed from its world")
+        return self.m_world
+
+    def _get(self, column) -> vec2d:
+        row = column[self.m_index]
+        return vec2d(float(row[0]), float(row[1]))
+
+    def is_removed(self) -> bool:
+        return self.m_world is None
+
+    @property
+    def obj_type(self) -> CollisionType:
+        return CollisionType(int(self._get_world().m_type[self.m_index]))
+
+    @property
+    def pos(self) -> vec2d:
+        return self._get(self._get_world().m_pos)
+
+    @pos.setter
+    def pos(self, value: vec2d) -> None:
+        self._get_world().m_pos[self.m_index] = (value.x, value.y)
+
+    @property
+    def vel(self) -> vec2d:
+        return self._get(self._get_world().m_vel)
+
+    @vel.setter
+    def vel(self, value: vec2d) -> None:
+        self._get_world().m_vel[self.m_index] = (value.x, value.y)
+
+    @property
+    def accel(self) -> vec2d:
+        return self._get(self._get_world().m_accel)
+
+    @accel.setter
+    def accel(self, value: vec2d) -> None:
+        self._get_world().m_accel[self.m_index] = (value.x, value.y)
+
+    @property
+    def dimensions(self) -> vec2d:
+        return self._get(self._get_world().m_dims)
+
+    @dimensions.setter
+    def dimensions(self, value: vec2d) -> None:
+        self._get_world().m_dims[self.m_index] = (value.x, value.y)
+
+    @property
+    def weight(self) -> float:
+        return float(self._get_world().m_weight[self.m_index])
+
+    @weight.setter
+    def weight(self, value: float) -> None:
+        self._get_world().m_weight[self.m_index] = value
+
+
+class ArrayPhysicsWorld:
+    """
+    Physics world storing positions, velocities, accelerations, dimensions and weights as (n, 2) / (n,) float arrays
+    """
+
+    def __init__(self, capacity: int = 256):
+        if np is None:
+            raise ImportError("ArrayPhysicsWorld requires numpy to be installed")
+        self.m_count: int = 0
+        self.m_capacity: int = 0
+        self.m_pos = np.zeros((0, 2))
+        self.m_vel = np.zeros((0, 2))
+        self.m_accel = np.zeros((0, 2))
+        self.m_dims = np.zeros((0, 2))
+        self.m_lastNewVel = np.zeros((0, 2))
+        self.m_prevPos = np.zeros((0, 2))
+        self.m_weight = np.zeros(0)
+        self.m_type = np.zeros(0, dtype=np.int8)
+        self.m_hasLastNewVel = np.zeros(0, dtype=bool)
+        self.m_applyGrav = np.zeros(0, dtype=bool)
+        self.m_bodies: list = []
+        self._grow(max(capacity, 1))
+
+        self.m_physics_steps: int = 32
+        self.m_step_time: float = 1e3 / self.m_physics_steps
+        self.m_step_mult: float = 1 / self.m_physics_steps
+        self.m_grav: vec2d = vec2d(0, 120)
+        self.m_internal_lag: float = 0
+        self.m_max_substeps: int = 8
+        self.m_stable_thresh: float = 1
+
+    def _grow(self, newCapacity: int) -> None:
+        extra = newCapacity - self.m_capacity
+        if extra <= 0:
+            return
+        for name in ("m_pos", "m_vel", "m_accel", "m_dims", "m_lastNewVel", "m_prevPos"):
+            setattr(self, name, np.concatenate((getattr(self, name), np.zeros((extra, 2)))))
+        self.m_weight = np.concatenate((self.m_weight, np.zeros(extra)))
+        self.m_type = np.concatenate((self.m_type, np.zeros(extra, dtype=np.int8)))
+        self.m_hasLastNewVel = np.concatenate((self.m_hasLastNewVel, np.zeros(extra, dtype=bool)))
+        self.m_applyGrav = np.concatenate((self.m_applyGrav, np.zeros(extra, dtype=bool)))
+        self.m_capacity = newCapacity
+
+    def set_physics_steps(self, newsteps: int) -> bool:
+        if newsteps <= 0:
+            return False
+        self.m_physics_steps = newsteps
+        self.m_step_time = 1e3 / newsteps
+        self.m_step_mult = 1 / newsteps
+        return True
+
+    def set_gravity(self, grav: float) -> None:
+        """
+        Sets the gravity of the world, updating the acceleration of every existing body that gravity applies to
+        :param grav: downwards acceleration
+        :return: None
+        """
+        count = self.m_count
+        self.m_accel[:count, 1] += (grav - self.m_grav.y) * self.m_applyGrav[:count]
+        self.m_grav = vec2d(0, grav)
+
+    def set_max_substeps(self, maxsteps: int) -> None:
+        if maxsteps <= 0:
+            return
+        self.m_max_substeps = maxsteps
+
+    def get_alpha(self) -> float:
+        return min(self.m_internal_lag / self.m_step_time, 1)
+
+    def get_interpolated_positions(self):
+        """
+        Gets the positions of every body interpolated between their previous and current step by get_alpha
+        :return: (n, 2) array of positions
+        """
+        count = self.m_count
+        return self.m_prevPos[:count] + (self.m_pos[:count] - self.m_prevPos[:count]) * self.get_alpha()
+
+    def create_component(self, _type: CollisionType, x: float, y: float, w: float, h: float, velx: float,
+                         vely: float, weight: float, apply_grav=True) -> ArrayBody:
+        """
+        Creates physics component (same parameters as Physics.create_component)
+        :return: handle to the body created
+        """
+        index = self.m_count
+        if index == self.m_capacity:
+            self._grow(self.m_capacity * 2)
+        self.m_type[index] = _type
+        self.m_pos[index] = (x, y)
+        self.m_prevPos[index] = (x, y)
+        self.m_dims[index] = (w, h)
+        self.m_vel[index] = (velx, vely)
+        self.m_weight[index] = weight
+        self.m_accel[index] = (self.m_grav.x * int(apply_grav), self.m_grav.y * int(apply_grav))
+        self.m_hasLastNewVel[index] = False
+        self.m_applyGrav[index] = apply_grav
+        self.m_count = index + 1
+        body = ArrayBody(self, index)
+        self.m_bodies.append(body)
+        return body
+
+    def remove_component(self, component: ArrayBody) -> None:
+        """
+        Removes a body by moving the last body into its slot. The handle of the moved body is updated to match
+        :param component: handle of the body to remove
+        :return: None
+        """
+        if component.m_world is not self:
+            return
+        index, last = component.m_index, self.m_count - 1
+        if index != last:
+            for column in (self.m_pos, self.m_prevPos, self.m_vel, self.m_accel, self.m_dims, self.m_lastNewVel,
+                           self.m_weight, self.m_type, self.m_hasLastNewVel, self.m_applyGrav):
+                column[index] = column[last]
+            moved = self.m_bodies[last]
+            moved.m_index = index
+            self.m_bodies[index] = moved
+        self.m_bodies.pop()
+        # detach the handle for good, any index could belong to a live body once more bodies are created
+        component.m_world = None
+        component.m_index = -1
+        self.m_count = last
+
+    def _collide_particles_planes(self) -> None:
+        """
+        Vectorised particle vs plane collision. Each particle is resolved against the first plane it overlaps
+        :return: None
+        """
+        count = self.m_count
+        types = self.m_type[:count]
+        particles = np.flatnonzero(types == CollisionType.PHYS_PARTICLE)
+        planes = np.flatnonzero(types == CollisionType.PHYS_PLANE)
+        if not len(particles) or not len(planes):
+            return
+        pPos, pDims, pVel = self.m_pos[particles], self.m_dims[particles], self.m_vel[particles]
+        qPos, qDims, qVel = self.m_pos[planes], self.m_dims[planes], self.m_vel[planes]
+        # (particles, planes) overlap matrix using the same tests as Physics._collision_particle_plane
+        overlap = (pPos[:, None, 0] + pDims[:, None, 0] > qPos[None, :, 0]) \
+            & (pPos[:, None, 0] - pDims[:, None, 0] < qPos[None, :, 0] + qDims[None, :, 0]) \
+            & (pPos[:, None, 1] + pDims[:, None, 1] > qPos[None, :, 1]) \
+            & (pPos[:, None, 1] - pDims[:, None, 1] < qPos[None, :, 1] + qDims[None, :, 1]) \
+            & (np.hypot(*(pVel[:, None, :] + qVel[None, :, :]).transpose(2, 0, 1)) != 0)
+        hit = overlap.any(axis=1)
+        if not hit.any():
+            return
+        rows = np.flatnonzero(hit)
+        bodies = particles[rows]
+        hitPlanes = overlap[rows].argmax(axis=1)
+        # particles that are not moving are pushed back along the direction the plane moved into them
+        relVel = np.where((pVel[rows] == 0).all(axis=1)[:, None], -qVel[hitPlanes], pVel[rows])
+        direction = relVel / np.hypot(relVel[:, 0], relVel[:, 1])[:, None]
+        sideways = direction[:, 1] == 0
+        safeDirY = np.where(sideways, 1, direction[:, 1])
+        # pushed back out of the top face when moving down and the bottom face when moving up
+        planeY = np.where(direction[:, 1] > 0, qPos[hitPlanes, 1], qPos[hitPlanes, 1] + qDims[hitPlanes, 1])
+        factor = (planeY - pPos[rows, 1]) / safeDirY
+        contact = np.column_stack((pPos[rows, 0] + direction[:, 0] * factor, planeY))
+        # sideways particles are pushed back out of the side of the plane they entered from
+        edgeX = np.where(direction[:, 0] > 0, qPos[hitPlanes, 0], qPos[hitPlanes, 0] + qDims[hitPlanes, 0])
+        contact[sideways] = np.column_stack((edgeX, pPos[rows, 1]))[sideways]
+        self.m_pos[bodies] = contact - direction * (pDims[rows, 0, None] + 1)
+
+        newVel = np.column_stack((pVel[rows, 0], -pVel[rows, 1] * 0.5))
+        newVel[sideways] = np.column_stack((-pVel[rows, 0] * 0.5, pVel[rows, 1]))[sideways]
+        lastNewVel = self.m_lastNewVel[bodies]
+        stable = self.m_hasLastNewVel[bodies] & \
+            (np.hypot(*(lastNewVel - newVel).T) < self.m_stable_thresh)
+        newVel[stable] = 0
+        self.m_lastNewVel[bodies] = newVel
+        self.m_hasLastNewVel[bodies] = True
+        self.m_vel[bodies] = newVel
+
+    def step(self) -> None:
+        """
+        Advances every body by one physics step
+        :return: None
+        """
+        count = self.m_count
+        self.m_pos[:count] += self.m_vel[:count] * self.m_step_mult
+        self.m_vel[:count] += self.m_accel[:count] * self.m_step_mult
+        self._collide_particles_planes()
+
+    def _physics_step(self, elapsedtime: float) -> int:
+        """
+        Steps the physics world (same accumulator as Physics._physics_step)
+        :param elapsedtime: time since the last call in miliseconds
+        :return: number of steps taken
+        """
+        self.m_internal_lag += elapsedtime
+        steps = min(int(self.m_internal_lag // self.m_step_time), self.m_max_substeps)
+        for step in range(steps):
+            if step == steps - 1:
+                self.m_prevPos[:self.m_count] = self.m_pos[:self.m_count]
+            self.step()
+        self.m_internal_lag -= steps * self.m_step_time
+        if self.m_internal_lag >= self.m_step_time:
+            self.m_internal_lag %= self.m_step_time
+        return steps
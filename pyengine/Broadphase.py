@@ -0,0 +1,72 @@
+"""
+Broadphase collision culling. Each function takes the axis aligned bounding boxes of the physics bodies as
+(left, top, right, bottom) tuples and returns the sorted (i, j) index pairs, i < j, whose boxes overlap
+"""
+
+
+def _overlaps(a: tuple, b: tuple) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def pairs_brute_force(bounds: list) -> list:
+    """
+    Tests every pair of boxes against each other, O(n^2)
+    :param bounds: bounding box of every body
+    :return: overlapping index pairs
+    """
+    pairs = []
+    count = len(bounds)
+    for i in range(count):
+        a = bounds[i]
+        for j in range(i + 1, count):
+            if _overlaps(a, bounds[j]):
+                pairs.append((i, j))
+    return pairs
+
+
+def pairs_grid(bounds: list, cellSize: float) -> list:
+    """
+    Buckets the boxes into a uniform spatial hash grid and only tests boxes that share a cell
+    :param bounds: bounding box of every body
+    :param cellSize: width and height of a grid cell
+    :return: overlapping index pairs
+    """
+    cells = {}
+    for index, (left, top, right, bottom) in enumerate(bounds):
+        for cellX in range(int(left // cellSize), int(right // cellSize) + 1):
+            for cellY in range(int(top // cellSize), int(bottom // cellSize) + 1):
+                cell = cells.get((cellX, cellY))
+                if cell is None:
+                    cells[(cellX, cellY)] = [index]
+                else:
+                    cell.append(index)
+    pairs = set()
+    for cell in cells.values():
+        count = len(cell)
+        for a in range(count):
+            i = cell[a]
+            for b in range(a + 1, count):
+                j = cell[b]
+                if _overlaps(bounds[i], bounds[j]):
+                    pairs.add((i, j))
+    return sorted(pairs)
+
+
+def pairs_sweep_and_prune(bounds: list) -> list:
+    """
+    Sorts the boxes along the x axis and sweeps across them, only testing boxes whose x extents overlap
+    :param bounds: bounding box of every body
+    :return: overlapping index pairs
+    """
+    pairs = []
+    active = []
+    for i in sorted(range(len(bounds)), key=lambda index: bounds[index][0]):
+        box = bounds[i]
+        active = [j for j in active if bounds[j][2] > box[0]]
+        for j in active:
+            other = bounds[j]
+            if box[1] < other[3] and other[1] < box[3]:
+                pairs.append((i, j) if i < j else (j, i))
+        active.append(i)
+    pairs.sort()
+    return pairs
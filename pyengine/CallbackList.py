@@ -0,0 +1,68 @@
+"""
+List of callbacks that does not keep the objects owning them alive
+"""
+import weakref
+
+
+class CallbackList:
+    """
+    Holds bound methods through weak references and any other callable directly. Once the object a method is bound
+    to is garbage collected the method is pruned from the list, so registering a method never leaks its object
+    """
+
+    def __init__(self, functs=()):
+        self.m_entries: list = []
+        self.m_hasDead: bool = False
+        for funct in functs:
+            self.append(funct)
+
+    def _on_dead(self, _) -> None:
+        self.m_hasDead = True
+
+    def _make_entry(self, funct: callable):
+        if hasattr(funct, "__self__") and hasattr(funct, "__func__"):
+            return weakref.WeakMethod(funct, self._on_dead)
+        # plain functions and lambdas are usually only referenced by the list, so they are held strongly
+        return lambda: funct
+
+    def prune(self) -> None:
+        """
+        Removes callbacks whose objects have been garbage collected
+        :return: None
+        """
+        self.m_entries = [entry for entry in self.m_entries if entry() is not None]
+        self.m_hasDead = False
+
+    def append(self, funct: callable) -> None:
+        self.m_entries.append(self._make_entry(funct))
+
+    def remove(self, funct: callable) -> bool:
+        """
+        Removes the first callback equal to funct
+        :param funct: callback to remove
+        :return: True if it was in the list
+        """
+        for index, entry in enumerate(self.m_entries):
+            if entry() == funct:
+                del self.m_entries[index]
+                return True
+        return False
+
+    def __contains__(self, funct: callable) -> bool:
+        return any(entry() == funct for entry in self.m_entries)
+
+    def __len__(self) -> int:
+        if self.m_hasDead:
+            self.prune()
+        return len(self.m_entries)
+
+    def __iter__(self):
+        """
+        Iterates over a snapshot of the live callbacks, so callbacks can add or remove callbacks while being called
+        """
+        if self.m_hasDead:
+            self.prune()
+        for entry in tuple(self.m_entries):
+            funct = entry()
+            if funct is not None:
+                yield funct
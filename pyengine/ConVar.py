@@ -1,31 +1,276 @@
+from bisect import bisect_left
+
+if __package__ is None or __package__ == '':
+    from CallbackList import CallbackList
+else:
+    from .CallbackList import CallbackList
+
 _convars = {}
+# every convar name in sorted order, for prefix lookups. New names are appended and the list is re-sorted on the next
+# lookup so registering many convars stays linear
+_m_sorted_names: list = []
+_m_names_dirty: bool = False
+_m_names_version: int = 0
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, str):
+        if value.strip().lower() in ("0", "false", "no", "off", ""):
+            return False
+        if value.strip().lower() in ("1", "true", "yes", "on"):
+            return True
+        raise ValueError(f"{value} is not a boolean")
+    return bool(value)
 
 
 class ConVar:
 
     def __init__(self, _type: type, _name: str, initial_value):
-        global _convars
+        global _convars, _m_names_dirty, _m_names_version
         self._m_value: _type = initial_value
         self._m_type: type = _type
+        self._m_name: str = _name
+        # incremented every time the value changes so cached reads can check if they are stale
+        self._m_version: int = 0
+        self._m_callbacks: CallbackList = CallbackList()
+        self._m_bindings: list = []
+        if _name not in _convars:
+            _m_sorted_names.append(_name)
+            _m_names_dirty = True
+            _m_names_version += 1
         _convars[_name] = self
 
-    def SetValue(self, newval):
+    def SetValue(self, newval) -> bool:
+        """
+        Sets the value, converting it to the convar's type if needed. Bindings and callbacks are only run if the value
+        actually changes. Bindings run before the value is stored and can reject it by returning False or raising
+        TypeError / ValueError, in which case bindings that already took the new value are given the old one back
+        :param newval: new value
+        :return: False if the value could not be converted to the convar's type or a binding rejected it
+        """
         if not isinstance(newval, self._m_type):
             try:
-                self._m_value = self._m_type(newval)
-            except TypeError:
-                pass
-            return
+                newval = _parse_bool(newval) if self._m_type is bool else self._m_type(newval)
+            except (TypeError, ValueError):
+                return False
+        if newval == self._m_value:
+            return True
+        oldval = self._m_value
+        for applied, setter in enumerate(self._m_bindings):
+            try:
+                accepted = setter(newval) is not False
+            except (TypeError, ValueError):
+                accepted = False
+            if not accepted:
+                for previous in self._m_bindings[:applied]:
+                    previous(oldval)
+                return False
         self._m_value = newval
+        self._m_version += 1
+        for callback in self._m_callbacks:
+            callback(self, oldval)
+        return True
 
     def GetValue(self):
         return self._m_value
 
+    def GetName(self) -> str:
+        return self._m_name
+
+    def GetType(self) -> type:
+        return self._m_type
+
+    def GetVersion(self) -> int:
+        """
+        Gets how many times the value has changed. Code that caches the value can compare versions instead of
+        re-reading it
+        :return: version of the value
+        """
+        return self._m_version
+
+    def AddCallback(self, callback: callable) -> None:
+        """
+        Adds a function that is called whenever the value changes
+        :param callback: function taking the convar and its previous value
+        :return: None
+        """
+        self._m_callbacks.append(callback)
+
+    def RemoveCallback(self, callback: callable) -> None:
+        if callback in self._m_callbacks:
+            self._m_callbacks.remove(callback)
+
+    def Bind(self, setter: callable, apply: bool = True) -> None:
+        """
+        Pushes the value into a setting whenever it changes, so the setting never needs to poll the convar
+        :param setter: function taking the new value, e.g. PhysicsWorld.set_gravity. Returning False (or raising
+        TypeError / ValueError) rejects the value and leaves the convar unchanged
+        :param apply: should the setter also be called with the current value straight away
+        :return: None
+        """
+        self._m_bindings.append(setter)
+        if apply:
+            setter(self._m_value)
+
+    def Unbind(self, setter: callable) -> None:
+        if setter in self._m_bindings:
+            self._m_bindings.remove(setter)
+
+
+def _get_sorted_names() -> list:
+    global _m_names_dirty
+    if _m_names_dirty:
+        _m_sorted_names.sort()
+        _m_names_dirty = False
+    return _m_sorted_names
+
+
+def _rebuild_names() -> None:
+    """
+    Rebuilds the sorted names from the registered convars, needed after _convars is modified directly
+    :return: None
+    """
+    global _m_names_dirty, _m_names_version
+    _m_sorted_names[:] = _convars.keys()
+    _m_names_dirty = True
+    _m_names_version += 1
+
+
+def _prefix_range(prefix: str, lo: int = 0, hi: int = None) -> tuple:
+    """
+    Finds the slice of the sorted names that start with a prefix
+    :param prefix: prefix to search for
+    :param lo: start of the slice of names to search within
+    :param hi: end of the slice of names to search within (default: all names)
+    :return: (start, end) indices into the sorted names
+    """
+    names = _get_sorted_names()
+    if hi is None:
+        hi = len(names)
+    if not prefix:
+        return lo, hi
+    start = bisect_left(names, prefix, lo, hi)
+    # every name starting with prefix sorts before prefix with its last character incremented
+    end = bisect_left(names, prefix[:-1] + chr(ord(prefix[-1]) + 1), start, hi)
+    return start, end
 
-def get_startswith(name: str) -> list:
-    return [(cvar, _convars[cvar].GetValue()) for cvar in _convars if cvar.startswith(name)]
+
+def _get_range(start: int, end: int, limit: int = None, offset: int = 0) -> list:
+    start = min(start + max(offset, 0), end)
+    if limit is not None:
+        end = min(start + max(limit, 0), end)
+    return [(cvar, _convars[cvar].GetValue()) for cvar in _m_sorted_names[start:end]]
+
+
+def get_startswith(name: str, limit: int = None, offset: int = 0) -> list:
+    """
+    Gets the convars whose names start with a prefix, in name order
+    :param name: prefix to search for
+    :param limit: most results to return (default: all)
+    :param offset: number of matching convars to skip, for paging through results
+    :return: list of (name, value) tuples
+    """
+    start, end = _prefix_range(name)
+    return _get_range(start, end, limit, offset)
+
+
+def count_startswith(name: str) -> int:
+    """
+    Counts the convars whose names start with a prefix
+    :param name: prefix to search for
+    :return: number of matching convars
+    """
+    start, end = _prefix_range(name)
+    return end - start
+
+
+class PrefixSearch:
+    """
+    Prefix search that is narrowed as characters are typed and widened again as they are removed. Typing only
+    searches the matches of the previous prefix and removing a character restores the previous matches without
+    searching at all
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.m_prefix: str = ""
+        self.m_ranges: list = []
+        self.m_version: int = -1
+        self.set(prefix)
+
+    def set(self, prefix: str) -> None:
+        """
+        Replaces the prefix being searched for
+        :param prefix: new prefix
+        :return: None
+        """
+        self.m_version = _m_names_version
+        self.m_prefix = ""
+        self.m_ranges = [_prefix_range("")]
+        self.append(prefix)
+
+    def get_prefix(self) -> str:
+        return self.m_prefix
+
+    def _validate(self) -> None:
+        # convars registered since the ranges were found shift every index so the search is redone
+        if self.m_version != _m_names_version:
+            self.set(self.m_prefix)
+
+    def append(self, text: str) -> None:
+        """
+        Narrows the search by adding characters to the end of the prefix
+        :param text: characters typed
+        :return: None
+        """
+        self._validate()
+        for char in text:
+            self.m_prefix += char
+            self.m_ranges.append(_prefix_range(self.m_prefix, *self.m_ranges[-1]))
+
+    def backspace(self, count: int = 1) -> None:
+        """
+        Widens the search by removing characters from the end of the prefix
+        :param count: number of characters to remove
+        :return: None
+        """
+        self._validate()
+        count = min(count, len(self.m_prefix))
+        if count <= 0:
+            return
+        self.m_prefix = self.m_prefix[:-count]
+        del self.m_ranges[-count:]
+
+    def get(self, limit: int = None, offset: int = 0) -> list:
+        """
+        Gets the convars matching the current prefix, in name order
+        :param limit: most results to return (default: all)
+        :param offset: number of matching convars to skip, for paging through results
+        :return: list of (name, value) tuples
+        """
+        self._validate()
+        return _get_range(*self.m_ranges[-1], limit, offset)
+
+    def count(self) -> int:
+        self._validate()
+        start, end = self.m_ranges[-1]
+        return end - start
 
 
 def get_convar(name: str) -> ConVar:
     if name in _convars:
         return _convars[name]
+
+
+def bind(name: str, setter: callable, apply: bool = True) -> bool:
+    """
+    Binds a setting to the convar with a name (see ConVar.Bind)
+    :param name: name of the convar
+    :param setter: function taking the new value
+    :param apply: should the setter also be called with the current value straight away
+    :return: False if there is no convar with that name
+    """
+    convar = get_convar(name)
+    if not convar:
+        return False
+    convar.Bind(setter, apply)
+    return True
@@ -25,7 +25,9 @@ def render_console(x: float, y: float) -> None:
     Engine.fill_rect(x, y, 200, 50, (100, 100, 100), 1)
 
 
-_m_current_search_string: str = ""
+_m_current_search: ConVar.PrefixSearch = ConVar.PrefixSearch()
+# most matching convars shown at once
+_m_max_suggestions: int = 10
 
 
 def handle_keystroke(event: pygame.event.Event) -> None:
@@ -33,19 +35,22 @@ def handle_keystroke(event: pygame.event.Event) -> None:
         return
     print("handling console")
     if event.type == pygame.KEYUP:
-        global _m_current_search_string
         if event.key == pygame.K_BACKSPACE:
             print("Removing letter :3")
-            _m_current_search_string = _m_current_search_string[:-1]
+            _m_current_search.backspace()
         elif event.key == pygame.K_ESCAPE or event.key == pygame.K_BACKQUOTE:
             set_shown(False)
         elif event.unicode != "":
-            _m_current_search_string += event.unicode
+            _m_current_search.append(event.unicode)
 
-        print(f"Current string: {_m_current_search_string}")
-        print(ConVar.get_startswith(_m_current_search_string))
+        print(f"Current string: {_m_current_search.get_prefix()}")
+        print(_m_current_search.get(_m_max_suggestions))
+
+
+def _draw_console() -> None:
+    render_console(0, 0)
 
 
 def init():
     Engine._m_eEngineLogger.info("Initialised Console!")
-    Engine.add_system("Console", )
+    Engine.add_system("Console", Engine._render_nothing, _draw_console)
@@ -10,3 +10,31 @@ C_GREEN = (0, 255, 0)
 RF_FULLSCREEN = (1 << 0)
 RF_BORDERLESS = (1 << 1)
 RF_VSYNC = (1 << 2)
+RF_BATCHED = (1 << 3)
+
+""" ------------ Physics broadphases -----------"""
+BP_BRUTE_FORCE = 0
+BP_GRID = 1
+BP_SWEEP = 2
+
+""" ------------ Log levels -----------"""
+LOG_INFO = 0
+LOG_WARNING = 1
+LOG_ERROR = 2
+LOG_NONE = 3
+
+""" ------------ Log queue policies -----------"""
+LOG_POLICY_DROP = 0
+LOG_POLICY_BLOCK = 1
+
+""" ------------ Headless modes -----------"""
+HM_WINDOWED = 0
+HM_OFFSCREEN = 1
+HM_NO_RENDER = 2
+
+""" ------------ Entity components -----------"""
+EC_POSITION = "position"
+EC_VELOCITY = "velocity"
+EC_PHYSICS = "physics"
+EC_RECT = "rect"
+EC_SPRITE = "sprite"
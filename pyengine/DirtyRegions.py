@@ -0,0 +1,91 @@
+"""
+Tracks which parts of the window changed between frames so only those parts are pushed to the display
+"""
+import pygame
+
+
+class DirtyRegions:
+    """
+    Tile bitmap of the window. Drawn rects mark the tiles they touch and each frame the marked tiles (plus the tiles
+    marked the frame before, which may need clearing) are turned back into a list of disjoint rects. Tiles are only
+    merged into larger rects where the result covers exactly the same tiles, so merging never adds update area
+    """
+
+    def __init__(self, resolution: tuple, tileSize: int = 32):
+        self.m_resolution: tuple = resolution
+        self.m_tileSize: int = max(tileSize, 1)
+        self.m_cols: int = -(-resolution[0] // self.m_tileSize)
+        self.m_rows: int = -(-resolution[1] // self.m_tileSize)
+        self.m_tiles: bytearray = bytearray(self.m_cols * self.m_rows)
+        self.m_prevTiles: bytearray = bytearray(self.m_cols * self.m_rows)
+        self.m_fullRow: bytes = b'\x01' * self.m_cols
+        self.dirtyFraction: float = 0
+
+    def add(self, rect: pygame.Rect) -> None:
+        """
+        Marks every tile touched by a rect as dirty
+        :param rect: area of the window that has changed
+        :return: None
+        """
+        left = max(rect.left, 0)
+        top = max(rect.top, 0)
+        right = min(rect.right, self.m_resolution[0])
+        bottom = min(rect.bottom, self.m_resolution[1])
+        if left >= right or top >= bottom:
+            return
+        size = self.m_tileSize
+        firstCol = left // size
+        lastCol = (right - 1) // size + 1
+        run = self.m_fullRow[:lastCol - firstCol]
+        for row in range(top // size, (bottom - 1) // size + 1):
+            base = row * self.m_cols
+            self.m_tiles[base + firstCol:base + lastCol] = run
+
+    def add_all(self) -> None:
+        """
+        Marks the whole window as dirty
+        :return: None
+        """
+        self.m_tiles[:] = self.m_fullRow * self.m_rows
+
+    def flush(self) -> list:
+        """
+        Builds the list of rects to update this frame and carries this frame's tiles forward to the next
+        :return: list of disjoint rects covering every dirty tile
+        """
+        tileCount = len(self.m_tiles)
+        combined = (int.from_bytes(self.m_tiles, "little") | int.from_bytes(self.m_prevTiles, "little")) \
+            .to_bytes(tileCount, "little")
+        self.m_prevTiles, self.m_tiles = self.m_tiles, self.m_prevTiles
+        self.m_tiles[:] = bytes(tileCount)
+
+        size = self.m_tileSize
+        width, height = self.m_resolution
+        regions = []
+        openRegions = {}
+        for row in range(self.m_rows):
+            rowStart = row * self.m_cols
+            rowEnd = rowStart + self.m_cols
+            rowRegions = {}
+            start = combined.find(1, rowStart, rowEnd)
+            while start != -1:
+                end = combined.find(0, start, rowEnd)
+                end = rowEnd if end == -1 else end
+                span = (start - rowStart, end - rowStart)
+                region = openRegions.pop(span, None)
+                if region:
+                    region.height += size
+                else:
+                    region = pygame.Rect(span[0] * size, row * size, (span[1] - span[0]) * size, size)
+                    regions.append(region)
+                rowRegions[span] = region
+                start = combined.find(1, end, rowEnd)
+            openRegions = rowRegions
+
+        dirtyPixels = 0
+        for region in regions:
+            region.width = min(region.right, width) - region.left
+            region.height = min(region.bottom, height) - region.top
+            dirtyPixels += region.width * region.height
+        self.dirtyFraction = dirtyPixels / (width * height)
+        return regions
@@ -6,20 +6,40 @@ import math
 import os.path
 import sys
 import time
+from itertools import compress, islice
+from operator import ne
 import pygame
 from pygame import gfxdraw as gx
 from typing import Optional, Union
 
 if __package__ is None or __package__ == '':
     import Scene
+    import ConVar
     import EngineLog
+    from CallbackList import CallbackList
+    import Physics
+    import Profiler
+    from Scheduler import SystemScheduler
+    from EntityStore import EntityStore
+    from PhysicsProcess import PhysicsProcess, PhysicsSnapshot
     from Constants import *
-    from RenderObject import RenderObject
+    from RenderQueue import RenderQueue
+    from TextureCache import TextureCache
+    from DirtyRegions import DirtyRegions
 else:
     from . import Scene
+    from . import ConVar
     from . import EngineLog
+    from .CallbackList import CallbackList
+    from . import Physics
+    from . import Profiler
+    from .Scheduler import SystemScheduler
+    from .EntityStore import EntityStore
+    from .PhysicsProcess import PhysicsProcess, PhysicsSnapshot
     from .Constants import *
-    from .RenderObject import RenderObject
+    from .RenderQueue import RenderQueue
+    from .TextureCache import TextureCache
+    from .DirtyRegions import DirtyRegions
 
 """ ------------- ENGINE PRIVATE VARIABLES ----------- """
 _m_e_IsInit: bool = False
@@ -87,7 +107,49 @@ def set_engine_debugmode(debugmode: bool) -> None:
     _m_eIsDebug = debugmode
 
 
-_m_eKeyCallback: list = []
+_m_eHeadless: int = HM_WINDOWED
+
+
+def set_headless(headlessMode: int) -> None:
+    """
+    Sets wether the engine opens a window. HM_OFFSCREEN renders every frame to a surface that is never shown and
+    HM_NO_RENDER skips drawing entirely. Both use SDL's dummy video driver so no display is needed. Must be set
+    before init and cannot be used if the engine is running
+    :param headlessMode: HM_WINDOWED, HM_OFFSCREEN or HM_NO_RENDER
+    :return: None
+    """
+    _check_safe()
+    global _m_eHeadless
+    _m_eHeadless = headlessMode
+
+
+def get_headless() -> int:
+    return _m_eHeadless
+
+
+_m_eUncapped: bool = False
+
+
+def set_uncapped(shouldUncap: bool) -> None:
+    """
+    Sets wether the engine runs as fast as possible. When uncapped every frame advances the game by exactly one tick
+    of simulated time instead of by the real time that has passed, so ticks per second measures how fast the scene
+    and physics can be stepped. Cannot be used if the engine is running
+    :param shouldUncap: should the engine run uncapped
+    :return: None
+    """
+    _check_safe()
+    global _m_eUncapped
+    _m_eUncapped = shouldUncap
+
+
+def get_uncapped() -> bool:
+    return _m_eUncapped
+
+
+# callbacks are held weakly where possible (see CallbackList) so registering a bound method does not keep its object
+# alive
+_m_eKeyCallback: CallbackList = CallbackList()
 
 
 def add_key_callback(newfunct) -> None:
@@ -113,7 +175,7 @@ def remove_key_callback(oldfunct) -> int:
     return 1
 
 
-_m_eMouseCallback: list = []
+_m_eMouseCallback: CallbackList = CallbackList()
 
 
 def add_mouse_callback(newfunct) -> None:
@@ -133,12 +195,96 @@ def remove_mouse_callback(oldfunct) -> int:
     :return: Was the removal successful (0 if yes otherwise 1)
     """
     global _m_eMouseCallback
-    if oldfunct in _m_eKeyCallback:
+    if oldfunct in _m_eMouseCallback:
         _m_eMouseCallback.remove(oldfunct)
         return 0
     return 1
 
 
+# event type -> handlers for every event of that type, and (event type, key) -> handlers for one key
+_m_eEventHandlers: dict = {}
+_m_eKeyHandlers: dict = {}
+_m_eFilterEvents: bool = True
+_m_eCoalesceMotion: bool = True
+
+
+def add_event_callback(eventType: int, newfunct, key: int = None) -> None:
+    """
+    Adds a callback function that is called for every event of a type, or only for events of that type for one key.
+    Takes an event as a parameter
+    :param eventType: pygame event type, e.g. pygame.MOUSEWHEEL
+    :param newfunct: callback function
+    :param key: only call the function for KEYDOWN / KEYUP events of this key code (optional)
+    :return: None
+    """
+    handlers = _m_eEventHandlers if key is None else _m_eKeyHandlers
+    entry = eventType if key is None else (eventType, key)
+    if entry not in handlers:
+        handlers[entry] = CallbackList()
+    handlers[entry].append(newfunct)
+    _update_allowed_events()
+
+
+def remove_event_callback(eventType: int, oldfunct, key: int = None) -> int:
+    """
+    Removes a callback function added with add_event_callback
+    :param eventType: pygame event type the function was added for
+    :param oldfunct: pointer to function to be removed
+    :param key: key code the function was added for (optional)
+    :return: Was the removal successful (0 if yes otherwise 1)
+    """
+    handlers = _m_eEventHandlers if key is None else _m_eKeyHandlers
+    entry = eventType if key is None else (eventType, key)
+    functs = handlers.get(entry)
+    if not functs or oldfunct not in functs:
+        return 1
+    functs.remove(oldfunct)
+    if not functs:
+        del handlers[entry]
+        _update_allowed_events()
+    return 0
+
+
+def set_event_filtering(shouldFilter: bool) -> None:
+    """
+    Sets wether event types nothing is listening for are blocked inside SDL, so they are never queued or converted
+    into pygame events
+    :param shouldFilter: should unused event types be blocked
+    :return: None
+    """
+    global _m_eFilterEvents
+    _m_eFilterEvents = shouldFilter
+    _update_allowed_events()
+
+
+def set_coalesce_mouse_motion(shouldCoalesce: bool) -> None:
+    """
+    Sets wether consecutive MOUSEMOTION events are merged into one event, with the final position and the summed
+    relative motion, before being passed to callbacks
+    :param shouldCoalesce: should mouse motion be coalesced
+    :return: None
+    """
+    global _m_eCoalesceMotion
+    _m_eCoalesceMotion = shouldCoalesce
+
+
+def _update_allowed_events() -> None:
+    """
+    Only allows the event types that have callbacks (and QUIT) into the SDL event queue when filtering is enabled
+    :return: None
+    """
+    if not pygame.display.get_init():
+        return
+    if not _m_eFilterEvents:
+        pygame.event.set_allowed(None)
+        return
+    allowed = {pygame.QUIT}
+    allowed.update(_m_eEventHandlers)
+    allowed.update(eventType for eventType, _ in _m_eKeyHandlers)
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(list(allowed))
+
+
 _m_eTickrate: float = 60
 _m_eTimePerTick: float = 1e3 / 60
 
@@ -151,16 +297,32 @@ def get_engine_tickrate() -> float:
     return _m_eTickrate
 
 
-def set_engine_tickrate(newTickrate: float) -> None:
+def set_engine_tickrate(newTickrate: float) -> bool:
     """
-    Sets the number of steps the engine takes in a second. Can only be called before engine is running
+    Sets the number of steps the engine takes in a second. Safe to call while the engine is running, the new tickrate
+    is used from the next frame. Goes through the e_tickrate convar so the two never disagree
     :param newTickrate: new tickrate. Values of 0 will be ignored retard :D
-    :return: None
+    :return: False if the tickrate was ignored
+    """
+    return _m_eTickrateVar.SetValue(newTickrate)
+
+
+def _apply_engine_tickrate(newTickrate: float) -> bool:
+    """
+    Binding of the e_tickrate convar, applies a new tickrate
+    :param newTickrate: new tickrate
+    :return: False if the tickrate is not positive
     """
-    _check_safe()
     global _m_eTickrate, _m_eTimePerTick
-    _m_eTickrate = newTickrate if newTickrate > 0 else _m_eTickrate
+    if newTickrate <= 0:
+        return False
+    _m_eTickrate = newTickrate
     _m_eTimePerTick = ticks_to_time(1)
+    return True
+
+
+_m_eTickrateVar: ConVar.ConVar = ConVar.ConVar(float, "e_tickrate", float(_m_eTickrate))
+_m_eTickrateVar.Bind(_apply_engine_tickrate, apply=False)
 
 
 _m_eTickbase: int = 0
@@ -222,12 +384,20 @@ _m_eCurrentScene: Optional[Scene.Scene] = None
 
 def set_scene(newScene: Scene.Scene) -> None:
     """
-    Sets the current scene which will be rendered and drawn
+    Sets the current scene which will be rendered and drawn. Calls on_exit on the previous scene and then on_enter on
+    the new one. The engine holds no other references to the previous scene so it is released unless the game keeps it
     :param newScene: new scene to be handled
     :return:
     """
     global _m_eCurrentScene
+    oldScene = _m_eCurrentScene
+    if oldScene is newScene:
+        return
+    if oldScene:
+        oldScene.on_exit()
     _m_eCurrentScene = newScene
+    if newScene:
+        newScene.on_enter()
 
 
 _m_eOverlays: list = []
@@ -250,11 +420,41 @@ def get_resolution() -> tuple:
 
 
 _m_rWindow: Optional[pygame.Surface] = None
-_m_rQueue: list = []
-_m_rPrevRect: Optional[pygame.Rect] = None
+# surface draw commands are currently rendered to (the window or the static layer)
+_m_rTarget: Optional[pygame.Surface] = None
+_m_rStaticLayer: Optional[pygame.Surface] = None
+_m_rStaticHash: Optional[int] = None
+_m_rQueue: RenderQueue = RenderQueue()
+_m_rDirtyRegions: Optional[DirtyRegions] = None
+_m_rDirtyTileSize: int = 32
+
+
+def set_dirty_tile_size(tileSize: int) -> None:
+    """
+    Sets the size of the tiles the window is split into when tracking which parts of it need updating. Smaller tiles
+    update less of the window but cost more to track. Cannot be used if the engine is running
+    :param tileSize: width and height of a tile in pixels
+    :return: None
+    """
+    _check_safe()
+    global _m_rDirtyTileSize, _m_rDirtyRegions
+    _m_rDirtyTileSize = tileSize if tileSize > 0 else _m_rDirtyTileSize
+    if _m_rDirtyRegions and _m_rDirtyRegions.m_tileSize != _m_rDirtyTileSize:
+        # the window already exists, so track it with the new tiles and push all of it on the next frame
+        _m_rDirtyRegions = DirtyRegions(_m_rResolution, _m_rDirtyTileSize)
+        _m_rDirtyRegions.add_all()
+
+
+def get_dirty_fraction() -> float:
+    """
+    Gets the fraction of the window's pixels that were pushed to the display last frame
+    :return: fraction between 0 and 1
+    """
+    return _m_rDirtyRegions.dirtyFraction if _m_rDirtyRegions else 0
 
 _m_rTextureBank: dict = {}
-_m_rTextureCache: dict = {}
+_m_rStaticTextures: set = set()
+_m_rTextureCache: TextureCache = TextureCache()
 _m_rToCleanup: list = []
 
 _m_rRenderFlags = 0
@@ -308,6 +508,20 @@ def get_vsync() -> bool:
     return _get_render_flag(RF_VSYNC)
 
 
+def set_render_batching(shouldBatch: bool) -> None:
+    """
+    Sets wether consecutive draw calls of the same texture are drawn together in one batch. Rects and ellipses are
+    drawn the same either way
+    :param shouldBatch: should the renderer batch draw calls
+    :return: None
+    """
+    _set_render_flag(RF_BATCHED, shouldBatch)
+
+
+def get_render_batching() -> bool:
+    return _get_render_flag(RF_BATCHED)
+
+
 _m_rLastRefresh: Optional[Union[tuple, str]] = None
 
 _m_eEngineLogger: Optional[EngineLog.Logger] = None
@@ -318,23 +532,234 @@ def get_client_logger() -> EngineLog.Logger:
     return _m_eClientLogger
 
 
-_m_eIncludeSystems: list[tuple[callable, callable]] = []
-_m_eSysNames: list[str] = []
+def set_log_level(level: int) -> None:
+    """
+    Sets the lowest level of message written by both the engine and client loggers
+    :param level: one of the LOG_ constants
+    :return: None
+    """
+    for logger in (_m_eEngineLogger, _m_eClientLogger):
+        if logger:
+            logger.set_level(level)
+
+
+# queue size and flush interval of the log sink are read when init creates the loggers
+_m_eLogQueueVar: ConVar.ConVar = ConVar.ConVar(int, "log_queue_size", 4096)
+_m_eLogFlushVar: ConVar.ConVar = ConVar.ConVar(float, "log_flush_interval", 0.5)
+
+
+def set_log_policy(policy: int) -> bool:
+    """
+    Sets what happens to log records pushed while the log queue is full. Safe to call while the engine is running
+    :param policy: LOG_POLICY_DROP to discard the record or LOG_POLICY_BLOCK to wait for space
+    :return: False if the policy is not one of the LOG_POLICY_ constants
+    """
+    if policy not in (LOG_POLICY_DROP, LOG_POLICY_BLOCK):
+        return False
+    for logger in (_m_eEngineLogger, _m_eClientLogger):
+        if logger:
+            logger.get_sink().set_policy(policy)
+    return True
+
+
+_m_eLogPolicyVar: ConVar.ConVar = ConVar.ConVar(int, "log_policy", LOG_POLICY_DROP)
+_m_eLogPolicyVar.Bind(set_log_policy, apply=False)
+
+
+_m_eSystems: SystemScheduler = SystemScheduler()
 
 
 def _render_nothing():
     pass
 
 
-def add_system(name: str, callback_update: callable, callback_render=_render_nothing):
-    _m_eIncludeSystems.append((callback_update, callback_render))
-    _m_eSysNames.append(name)
+def add_system(name: str, callback_update: callable, callback_render=_render_nothing, after=(), reads=(),
+               writes=()) -> None:
+    """
+    Adds a system that is updated every tick after the scene steps and rendered every frame after the scene draws.
+    Systems that do not depend on each other can update at the same time when system threads are enabled
+    :param name: unique name of the system
+    :param callback_update: called every tick
+    :param callback_render: called every frame (optional)
+    :param after: names of the systems that have to finish updating before this one starts (optional)
+    :param reads: names of the resources the update reads, e.g. "physics" (optional)
+    :param writes: names of the resources the update writes. Systems writing a resource never update at the same time
+    as other systems using it (optional)
+    :return: None
+    """
+    try:
+        _m_eSystems.add(name, callback_update, callback_render, after, reads, writes)
+    except ValueError as error:
+        _raise_engine_error(str(error), isfatal=False)
 
 
 def remove_system(name):
-    index = _m_eSysNames.index(name)
-    _m_eSysNames.remove(name)
-    del _m_eIncludeSystems[index]
+    if not _m_eSystems.remove(name):
+        _raise_engine_error(f"Attempting to remove system {name} when it does not exist!", isfatal=False)
+
+
+def set_system_threads(threads: int) -> None:
+    """
+    Sets how many worker threads system updates run on. Only systems whose work releases the GIL (NumPy, file or
+    network IO) gain from more than one thread
+    :param threads: number of threads, 0 or 1 updates every system one after the other on the main thread
+    :return: None
+    """
+    _m_eSystems.set_threads(threads)
+
+
+def get_system_threads() -> int:
+    return _m_eSystems.get_threads()
+
+
+def get_system_times() -> dict:
+    """
+    Gets how long each system's last update took
+    :return: dict of system name to time in miliseconds
+    """
+    return _m_eSystems.get_times()
+
+
+_m_ePhysicsProcess: Optional[PhysicsProcess] = None
+_m_ePhysicsSnapshot: Optional[PhysicsSnapshot] = None
+# worker steps already counted by the engine loop
+_m_ePhysicsProcessSteps: int = 0
+
+
+def set_physics_process(process: Optional[PhysicsProcess]) -> None:
+    """
+    Moves physics out of the engine loop into a PhysicsProcess. While one is set the default physics world is not
+    stepped and the process's latest snapshot can be read with get_physics_snapshot while the scene and systems draw
+    :param process: process to read from, None to step the default world in the engine loop again
+    :return: None
+    """
+    global _m_ePhysicsProcess, _m_ePhysicsProcessSteps
+    _m_ePhysicsProcess = process
+    _m_ePhysicsProcessSteps = process.get_steps() if process else 0
+
+
+def get_physics_process() -> Optional[PhysicsProcess]:
+    return _m_ePhysicsProcess
+
+
+def get_physics_snapshot() -> Optional[PhysicsSnapshot]:
+    """
+    Gets the physics process snapshot for the frame being drawn. Its positions are read in place from shared memory
+    and are only valid until the scene and systems have finished drawing
+    :return: PhysicsSnapshot, None outside of drawing, before the first snapshot or when no physics process is set
+    """
+    return _m_ePhysicsSnapshot
+
+
+def _engine_physics(elapsedTime: float) -> int:
+    """
+    Steps the default physics world, or counts the steps the physics process has taken since the last frame
+    :param elapsedTime: time since the last frame in miliseconds
+    :return: number of physics steps taken
+    """
+    global _m_ePhysicsProcess, _m_ePhysicsProcessSteps
+    if _m_ePhysicsProcess is None:
+        return Physics._physics_step(elapsedTime)
+    error = _m_ePhysicsProcess.get_error()
+    if error:
+        _m_ePhysicsProcess = None
+        _raise_engine_error(f"Physics process stopped: {error}")
+        return 0
+    steps = _m_ePhysicsProcess.get_steps()
+    taken = steps - _m_ePhysicsProcessSteps
+    _m_ePhysicsProcessSteps = steps
+    return taken
+
+
+_m_eProfiler: Profiler.Profiler = Profiler.Profiler()
+
+_PROFILER_OVERLAY_COLOURS = {
+    Profiler.PROF_INPUT: (200, 200, 60),
+    Profiler.PROF_STEP: (60, 160, 240),
+    Profiler.PROF_SYSTEMS: (160, 90, 220),
+    Profiler.PROF_PHYSICS: (240, 140, 40),
+    Profiler.PROF_DRAW: (60, 200, 90),
+    Profiler.PROF_PRESENT: (220, 60, 60)
+}
+_PROFILER_OVERLAY_LAYER = 1 << 16
+
+
+def set_profiling(shouldProfile: bool) -> None:
+    """
+    Turns frame profiling on or off. Turning it on clears any previously recorded frames
+    :param shouldProfile: should frames be profiled
+    :return: None
+    """
+    if shouldProfile and not _m_eProfiler.enabled:
+        _m_eProfiler.reset()
+    _m_eProfiler.enabled = shouldProfile
+
+
+def get_profiling() -> bool:
+    return _m_eProfiler.enabled
+
+
+def set_profiler_history(frames: int) -> None:
+    """
+    Sets how many of the most recent frames the profiler keeps
+    :param frames: number of frames
+    :return: None
+    """
+    _m_eProfiler.set_capacity(frames)
+
+
+def get_profiler_stats() -> dict:
+    """
+    Gets p50 / p95 / p99 / worst timings (in miliseconds) of whole frames, of each part of a frame (input, step,
+    systems, physics, draw and present) and of each system, plus the breakdown of the slowest recorded frame
+    :return: dict of profiler statistics
+    """
+    return _m_eProfiler.get_stats()
+
+
+def get_profiler_history(section: str = None) -> list:
+    """
+    Gets the recorded timings of a part of the frame or a system, oldest first
+    :param section: part of the frame or system name, None for whole frames
+    :return: list of timings in miliseconds
+    """
+    return _m_eProfiler.get_history(section)
+
+
+def _engine_draw_profiler_overlay() -> None:
+    """
+    Draws the recorded frame times as stacked bars, one per frame, in the top left of the window. The white line is
+    the time of one engine tick
+    :return: None
+    """
+    scale = 3
+    height = 80
+    history = {section: _m_eProfiler.get_history(section) for section in _PROFILER_OVERLAY_COLOURS}
+    frames = len(history[Profiler.PROF_INPUT])
+    fill_rect(0, 0, frames * 2, height, (30, 30, 30), layer=_PROFILER_OVERLAY_LAYER)
+    for frame in range(frames):
+        top = height
+        for section, colour in _PROFILER_OVERLAY_COLOURS.items():
+            barHeight = min(int(history[section][frame] * scale), top)
+            if barHeight > 0:
+                top -= barHeight
+                fill_rect(frame * 2, top, 2, barHeight, colour, layer=_PROFILER_OVERLAY_LAYER)
+    budget = max(height - int(_m_eTimePerTick * scale), 0)
+    fill_rect(0, budget, frames * 2, 1, C_WHITE, layer=_PROFILER_OVERLAY_LAYER)
+
+
+def set_profiler_overlay(shouldShow: bool) -> None:
+    """
+    Shows or hides the profiler overlay. Showing it also turns profiling on
+    :param shouldShow: should the overlay be drawn
+    :return: None
+    """
+    if shouldShow:
+        set_profiling(True)
+        if _engine_draw_profiler_overlay not in _m_eOverlays:
+            _m_eOverlays.append(_engine_draw_profiler_overlay)
+    elif _engine_draw_profiler_overlay in _m_eOverlays:
+        _m_eOverlays.remove(_engine_draw_profiler_overlay)
 
 
 """ ------------------ ENGINE PRIVATE FUNCTIONS -----------------"""
@@ -368,22 +793,6 @@ def _check_safe() -> None:
     _raise_engine_error("Attempting to change engine variable while the engine is still running")
 
 
-def _engine_combine_rect(rect1: Optional[pygame.Rect], rect2: Optional[pygame.Rect]) -> pygame.Rect:
-    """
-    Unionizes two pygame rectangles
-    :param rect1: first rectangle (if none rect2 is returned)
-    :param rect2: second rectangle (must be present)
-    :return: Union of the two rectangles (or rect 2 if rect 1 is null)
-    """
-    if not rect1:
-        return rect2
-    if not rect2:
-        return rect1
-    mLeft = min(rect1.left, rect2.left)
-    mTop = min(rect1.top, rect2.top)
-    return pygame.Rect(mLeft, mTop, max(rect1.right, rect2.right) - mLeft, max(rect1.bottom, rect2.bottom) - mTop)
-
-
 def _engine_quit():
     _m_eEngineLogger.info("Exiting from the engine")
     _set_running(False)
@@ -391,79 +800,255 @@ def _engine_quit():
 
 def _engine_step():
     _m_eCurrentScene.step_scene()
+    _m_eProfiler.mark(Profiler.PROF_STEP)
+    _m_eSystems.update()
+    _m_eProfiler.mark(Profiler.PROF_SYSTEMS)
+    if _m_eProfiler.enabled:
+        for name, elapsed in _m_eSystems.get_times().items():
+            _m_eProfiler.record_system(name, elapsed)
+
+
+def _engine_draw_unbatched(order) -> None:
+    """
+    Draws every queued render command with its own draw call
+    :param order: indices of the commands in the order they should be drawn
+    :return: None
+    """
+    rTypes = _m_rQueue.rType
+    affects = _m_rQueue.shouldAffect
+    for index in order:
+        drawFunct = _ENGINE_DRAW_FUNCTIONS.get(rTypes[index])
+        if not drawFunct:
+            _raise_engine_error(f"Invalid render type: {rTypes[index]}")
+            continue
+        newRect = drawFunct(index)
+        if _m_eIsDebug:
+            gx.rectangle(_m_rTarget, newRect, C_GREEN)
+        if affects[index]:
+            _m_rDirtyRegions.add(newRect)
+
+
+def _engine_draw_batched(order) -> None:
+    """
+    Draws the queued render commands in runs of consecutive commands sharing a render type and texture, drawing each
+    run of textures with one blit call
+    :param order: indices of the commands in the order they should be drawn
+    :return: None
+    """
+    count = len(order)
+    if not count:
+        return
+    q = _m_rQueue
+    keys = list(zip(map(q.rType.__getitem__, order), map(q.path.__getitem__, order)))
+    # positions in order where the render type or texture changes, found without a python level loop
+    bounds = [0, *compress(range(1, count), map(ne, keys, islice(keys, 1, None))), count]
+    affects = q.shouldAffect
+    addDirty = _m_rDirtyRegions.add
+    for start, end in zip(bounds, islice(bounds, 1, None)):
+        run = order[start:end]
+        rType = keys[start][0]
+        batchFunct = _ENGINE_BATCH_FUNCTIONS.get(rType)
+        if batchFunct:
+            drawnRects = batchFunct(run)
+        else:
+            # gfxdraw has no batched calls, so shapes are drawn one command at a time as when not batching
+            drawFunct = _ENGINE_DRAW_FUNCTIONS.get(rType)
+            if not drawFunct:
+                _raise_engine_error(f"Invalid render type: {rType}")
+                continue
+            drawnRects = list(map(drawFunct, run))
+        if _m_eIsDebug:
+            for newRect in drawnRects:
+                gx.rectangle(_m_rTarget, newRect, C_GREEN)
+        for newRect in compress(drawnRects, map(affects.__getitem__, run)):
+            addDirty(newRect)
+
+
+def _engine_draw_commands(order) -> None:
+    if _get_render_flag(RF_BATCHED):
+        _engine_draw_batched(order)
+    else:
+        _engine_draw_unbatched(order)
+
+
+def _engine_draw_static(staticOrder, transparent: bool) -> None:
+    """
+    Composites the static layer onto the window, first re-rendering it if the static commands queued this frame differ
+    from the ones it was rendered from
+    :param staticOrder: indices of the static commands in the order they should be drawn
+    :param transparent: should the parts of the layer no static command covers show what is already on the window
+    :return: None
+    """
+    global _m_rTarget, _m_rStaticLayer, _m_rStaticHash
+    staticHash = hash((_m_rQueue.staticHash, transparent))
+    if staticHash != _m_rStaticHash:
+        if not _m_rStaticLayer or transparent != bool(_m_rStaticLayer.get_flags() & pygame.SRCALPHA):
+            _m_rStaticLayer = pygame.Surface(_m_rResolution, pygame.SRCALPHA).convert_alpha() if transparent \
+                else pygame.Surface(_m_rResolution).convert()
+        _m_rStaticLayer.fill((0, 0, 0, 0) if transparent else C_BLACK)
+        _m_rTarget = _m_rStaticLayer
+        _engine_draw_commands(staticOrder)
+        _m_rTarget = _m_rWindow
+        _m_rStaticHash = staticHash
+        # anything previously drawn from the old layer may have moved so the whole window needs pushing
+        _m_rDirtyRegions.add_all()
+    _m_rWindow.blit(_m_rStaticLayer, (0, 0))
 
 
 def _engine_draw():
-    global _m_eCurrentScene, _m_rQueue, _m_rPrevRect
-    _m_eCurrentScene.draw_scene()
-    currentRect: Optional[pygame.Rect] = None
-    while _m_rQueue:
-        cObject: RenderObject = _m_rQueue.pop(0)
-        try:
-            newRect = _ENGINE_DRAW_FUNCTIONS[cObject.rType](cObject)
-            if _m_eIsDebug:
-                gx.rectangle(_m_rWindow, newRect, C_GREEN)
-            if cObject.shouldAffect:
-                currentRect = _engine_combine_rect(currentRect, newRect)
-        except KeyError:
-            _raise_engine_error(f"Invalid render type: {cObject.rType}")
-    drawRect = None
-    if currentRect:
-        drawRect = _engine_combine_rect(currentRect, _m_rPrevRect)
-    elif _m_rPrevRect:
-        drawRect = _m_rPrevRect
-    if drawRect:
-        pygame.display.update(drawRect)
-        # print(f"Updated {drawRect}")
-    _m_rPrevRect = currentRect
+    global _m_eCurrentScene, _m_rStaticHash, _m_ePhysicsSnapshot
+    process = _m_ePhysicsProcess
+    if process:
+        _m_ePhysicsSnapshot = process.acquire()
+    try:
+        _m_eCurrentScene.draw_scene()
+        _m_eProfiler.mark(Profiler.PROF_DRAW)
+        _m_eSystems.render()
+    finally:
+        if _m_ePhysicsSnapshot is not None:
+            # everything reading the snapshot has queued its draw calls (or failed to), let the physics process reuse
+            # the buffer
+            process.release()
+            _m_ePhysicsSnapshot = None
+    _m_eProfiler.mark(Profiler.PROF_SYSTEMS)
+    if _m_eProfiler.enabled:
+        for name, elapsed in _m_eSystems.get_times(render=True).items():
+            _m_eProfiler.record_system(name, elapsed)
+    for overlay in _m_eOverlays:
+        overlay()
+    order = _m_rQueue.draw_order()
+    if _m_rQueue.staticCount:
+        staticOrder, order = _m_rQueue.split_static(order)
+        # the static layer is drawn at the lowest layer of its commands (before dynamic commands on the same layer),
+        # so dynamic commands on lower layers are drawn first and show through it
+        layers = _m_rQueue.layer
+        staticLayer = layers[staticOrder[0]]
+        below = 0
+        while below < len(order) and layers[order[below]] < staticLayer:
+            below += 1
+        _engine_draw_commands(order[:below])
+        _engine_draw_static(staticOrder, below > 0)
+        order = order[below:]
+    elif _m_rStaticHash is not None:
+        _m_rStaticHash = None
+        _m_rDirtyRegions.add_all()
+    _engine_draw_commands(order)
+    _m_rQueue.reset()
+    _m_eProfiler.mark(Profiler.PROF_DRAW)
+    updateRects = _m_rDirtyRegions.flush()
+    if updateRects and _m_eHeadless == HM_WINDOWED:
+        pygame.display.update(updateRects)
+    _m_eProfiler.mark(Profiler.PROF_PRESENT)
+
+
+def _engine_dispatch_keys(event: pygame.event.Event) -> None:
+    for funct in _m_eKeyCallback:
+        funct(event)
+
+
+def _engine_dispatch_mouse(event: pygame.event.Event) -> None:
+    for funct in _m_eMouseCallback:
+        funct(event)
+
+
+def _engine_dispatch_quit(event: pygame.event.Event) -> None:
+    _engine_quit()
+
+
+def _engine_dispatch(event: pygame.event.Event) -> None:
+    """
+    Calls every callback registered for an event's type, then those registered for its key
+    :param event: event to dispatch
+    :return: None
+    """
+    functs = _m_eEventHandlers.get(event.type)
+    if functs:
+        for funct in functs:
+            funct(event)
+    if _m_eKeyHandlers and (event.type == pygame.KEYDOWN or event.type == pygame.KEYUP):
+        functs = _m_eKeyHandlers.get((event.type, event.key))
+        if functs:
+            for funct in functs:
+                funct(event)
+
+
+def _engine_merge_motion(pending: pygame.event.Event, event: pygame.event.Event) -> pygame.event.Event:
+    """
+    Merges two MOUSEMOTION events into one ending where the later one ends
+    :param pending: earlier event
+    :param event: later event
+    :return: merged event
+    """
+    merged = dict(event.dict)
+    merged["rel"] = (pending.rel[0] + event.rel[0], pending.rel[1] + event.rel[1])
+    return pygame.event.Event(pygame.MOUSEMOTION, merged)
 
 
 def _engine_gather_input():
+    pendingMotion = None
     for event in pygame.event.get():
-        functs = []
-        if event.type == pygame.MOUSEBUTTONDOWN or event.type == pygame.MOUSEBUTTONUP:
-            global _m_eMouseCallback
-            functs = _m_eMouseCallback
-        elif event.type == pygame.KEYDOWN or event.type == pygame.KEYUP:
-            global _m_eKeyCallback
-            functs = _m_eKeyCallback
-        elif event.type == pygame.QUIT:
-            _engine_quit()
+        if event.type == pygame.MOUSEMOTION and _m_eCoalesceMotion:
+            pendingMotion = _engine_merge_motion(pendingMotion, event) if pendingMotion else event
+            continue
+        if pendingMotion:
+            # keeps the motion in order with the events around it
+            _engine_dispatch(pendingMotion)
+            pendingMotion = None
+        _engine_dispatch(event)
+        if event.type == pygame.QUIT:
             return
-        for funct in functs:
-            funct(event)
+    if pendingMotion:
+        _engine_dispatch(pendingMotion)
+
+
+# the key and mouse callback lists are dispatched through the event table like any other callback
+_m_eEventHandlers.update({
+    pygame.KEYDOWN: CallbackList((_engine_dispatch_keys,)),
+    pygame.KEYUP: CallbackList((_engine_dispatch_keys,)),
+    pygame.MOUSEBUTTONDOWN: CallbackList((_engine_dispatch_mouse,)),
+    pygame.MOUSEBUTTONUP: CallbackList((_engine_dispatch_mouse,)),
+    pygame.QUIT: CallbackList((_engine_dispatch_quit,))
+})
 
 
 def _create_window():
-    global _m_rWindow
+    global _m_rWindow, _m_rTarget, _m_rDirtyRegions
     _m_rWindow = pygame.display.set_mode(_m_rResolution)
+    _m_rTarget = _m_rWindow
+    _m_rDirtyRegions = DirtyRegions(_m_rResolution, _m_rDirtyTileSize)
 
 
-def _engine_draw_rect(obj: RenderObject) -> pygame.Rect:
+def _engine_draw_rect(index: int) -> pygame.Rect:
     """
-    Performs drawing operations for all rect-like render objects
-    :param obj: RenderObject to draw
+    Performs drawing operations for all rect-like render commands
+    :param index: index of the command in the render queue
     :return: The bounding rectangle of the object
     """
-    rect = pygame.Rect(obj.x, obj.y, obj.w, obj.h)
-    if obj.col:
-        gx.box(_m_rWindow, rect, obj.col)
-    if obj.oWidth and obj.oCol:
-        gx.rectangle(_m_rWindow, rect, obj.oCol)
+    q = _m_rQueue
+    rect = pygame.Rect(q.x[index], q.y[index], q.w[index], q.h[index])
+    col = q.col[index]
+    oCol = q.oCol[index]
+    if col:
+        gx.box(_m_rTarget, rect, col)
+    if q.oWidth[index] and oCol:
+        gx.rectangle(_m_rTarget, rect, oCol)
     return rect
 
 
-def _engine_draw_ellipse(obj: RenderObject) -> pygame.Rect:
+def _engine_draw_ellipse(index: int) -> pygame.Rect:
     """
-    Performs drawing operations for all rect-like render objects
-    :param obj: RenderObject to draw
+    Performs drawing operations for all ellipse render commands
+    :param index: index of the command in the render queue
     :return: The bounding rectangle of the object
     """
-    rect = pygame.Rect(obj.x - obj.w - obj.oWidth, obj.y - obj.h - obj.oWidth,
-                       (obj.w + obj.oWidth) * 2, (obj.h + obj.oWidth) * 2)
-    gx.filled_ellipse(_m_rWindow, int(obj.x), int(obj.y), obj.w, obj.h, obj.col)
-    tCol = obj.oCol if obj.oCol != C_BLACK else obj.col
-    gx.aaellipse(_m_rWindow, int(obj.x), int(obj.y), obj.w, obj.h, tCol)
+    q = _m_rQueue
+    x, y, w, h, oWidth = int(q.x[index]), int(q.y[index]), int(q.w[index]), int(q.h[index]), q.oWidth[index]
+    col = q.col[index]
+    rect = pygame.Rect(x - w - oWidth, y - h - oWidth, (w + oWidth) * 2, (h + oWidth) * 2)
+    if col:
+        gx.filled_ellipse(_m_rTarget, x, y, w, h, col)
+    tCol = q.oCol[index] if q.oCol[index] != C_BLACK else col
+    gx.aaellipse(_m_rTarget, x, y, w, h, tCol)
     return rect
 
 
@@ -474,28 +1059,71 @@ def _engine_draw_default_texture(x: int, y: int) -> pygame.Rect:
     :param y: y position to draw to
     :return: the rect of the drawn texture
     """
-    gx.box(_m_rWindow, (x, y, 50, 50), C_BLACK)
-    gx.box(_m_rWindow, (x, y, 25, 25), (255, 16, 240))
-    gx.box(_m_rWindow, (x + 25, y + 25, 25, 25), (255, 16, 240))
+    gx.box(_m_rTarget, (x, y, 50, 50), C_BLACK)
+    gx.box(_m_rTarget, (x, y, 25, 25), (255, 16, 240))
+    gx.box(_m_rTarget, (x + 25, y + 25, 25, 25), (255, 16, 240))
     return pygame.Rect(x, y, 50, 50)
 
 
-def _engine_draw_texture(obj: RenderObject) -> pygame.Rect:
+def _engine_get_texture(index: int) -> pygame.Surface:
+    """
+    Gets the surface a texture command should blit, scaled to the size requested by the command. Scaled surfaces are
+    kept in the texture cache unless the command opted out of caching
+    :param index: index of the texture command in the render queue (its texture must be loaded)
+    :return: surface to draw
+    """
+    q = _m_rQueue
+    path = q.path[index]
+    texture = _m_rTextureBank[path]
+    w, h = int(q.w[index]), int(q.h[index])
+    if not (w or h):
+        return texture
+    size = (w or texture.get_width(), h or texture.get_height())
+    if not q.shouldCache[index]:
+        return pygame.transform.scale(texture, size)
+    drawTexture = _m_rTextureCache.get(path, size)
+    if drawTexture is None:
+        drawTexture = pygame.transform.scale(texture, size)
+        _m_rTextureCache.put(path, size, drawTexture)
+    return drawTexture
+
+
+def _engine_draw_texture(index: int) -> pygame.Rect:
     """
     Performs all the drawing operations for textures
-    :param obj: texture RenderObject
+    :param index: index of the texture command in the render queue
     :return: rectangle of the texture rendered
     """
-    if obj.path not in _m_rTextureBank:
-        return _engine_draw_default_texture(int(obj.x), int(obj.y))
-    drawTexture = _m_rTextureBank[obj.path]
-    cacheString = f"{obj.path}w{obj.w}h{obj.h}"
-    if (obj.w or obj.h) and cacheString in _m_rTextureBank:
-        drawTexture = _m_rTextureBank[cacheString]
-    elif obj.w or obj.h:
-        drawTexture = pygame.transform.scale(_m_rTextureBank[obj.path], (obj.w, obj.h))
-    _m_rWindow.blit(drawTexture, (obj.x, obj.y))
-    return drawTexture.get_rect()
+    q = _m_rQueue
+    if q.path[index] not in _m_rTextureBank:
+        return _engine_draw_default_texture(int(q.x[index]), int(q.y[index]))
+    return _m_rTarget.blit(_engine_get_texture(index), (q.x[index], q.y[index]))
+
+
+def _engine_batch_textures(run) -> list:
+    """
+    Draws a run of commands sharing one texture with a single Surface.blits call. The scaled surface is looked up once
+    per size in the run rather than once per command
+    :param run: indices of the texture commands in the render queue
+    :return: rectangles of the textures rendered
+    """
+    q = _m_rQueue
+    xs, ys = q.x, q.y
+    if q.path[run[0]] not in _m_rTextureBank:
+        return [_engine_draw_default_texture(int(xs[index]), int(ys[index])) for index in run]
+    ws, hs, caches = q.w, q.h, q.shouldCache
+    surfaces = {}
+    blits = []
+    for index in run:
+        if caches[index]:
+            size = (ws[index], hs[index])
+            surface = surfaces.get(size)
+            if surface is None:
+                surface = surfaces[size] = _engine_get_texture(index)
+        else:
+            surface = _engine_get_texture(index)
+        blits.append((surface, (xs[index], ys[index])))
+    return _m_rTarget.blits(blits)
 
 
 def _cleanup_textures():
@@ -503,17 +1131,17 @@ def _cleanup_textures():
         del _m_rTextureBank[texture]
 
 
-def _add_render_object(obj: RenderObject):
-    global _m_rQueue
-    _m_rQueue.append(obj)
-
-
 _ENGINE_DRAW_FUNCTIONS = {
     "rect": _engine_draw_rect,
     "ellipse": _engine_draw_ellipse,
     "texture": _engine_draw_texture
 }
 
+# render types with a draw call that takes a whole run of commands
+_ENGINE_BATCH_FUNCTIONS = {
+    "texture": _engine_batch_textures
+}
+
 
 def _engine_key_handle(event: pygame.event.Event):
     pass
@@ -549,17 +1177,24 @@ def time_to_ticks(_time: float) -> int:
 
 
 def refresh_window(refresh: [tuple, str] = C_BLACK):
+    """
+    Clears the window with a colour or texture. The clear is part of the static layer so it never covers static draw
+    calls, and only costs a re-render of the static layer when the colour or texture changes
+    :param refresh: colour or texture ID to clear the window with
+    :return: None
+    """
     global _m_rLastRefresh
     is_col = isinstance(refresh, tuple)
     render_type = "rect" if is_col else "texture"
     render_colour = refresh if is_col else None
     render_path = refresh if not is_col else None
-    _add_render_object(RenderObject(0, 0, _m_rResolution[0], _m_rResolution[1], render_type,
-                                    col=render_colour, path=render_path, shouldAffect=_m_rLastRefresh != refresh))
+    _m_rQueue.push(0, 0, _m_rResolution[0], _m_rResolution[1], render_type,
+                   col=render_colour, path=render_path, shouldAffect=_m_rLastRefresh != refresh, isStatic=True)
     _m_rLastRefresh = refresh
 
 
-def draw_rect(x: float, y: float, w: int, h: int, colour: tuple = C_BLACK, outlineWidth: int = 1) -> None:
+def draw_rect(x: float, y: float, w: int, h: int, colour: tuple = C_BLACK, outlineWidth: int = 1,
+              layer: int = 0) -> None:
     """
     Draws an outline of a rectangle
     :param x: x coordinate of the top left corner
@@ -568,13 +1203,14 @@ def draw_rect(x: float, y: float, w: int, h: int, colour: tuple = C_BLACK, outli
     :param h: height of the rectangle
     :param colour: colour of the outline (default black)
     :param outlineWidth: width of the rectangle outline (default 1)
+    :param layer: draw layer, higher layers are drawn on top (default 0)
     :return: None
     """
-    _add_render_object(RenderObject(x, y, w, h, "rect", oCol=colour, oWidth=outlineWidth))
+    _m_rQueue.push(x, y, w, h, "rect", oCol=colour, oWidth=outlineWidth, layer=layer)
 
 
 def fill_rect(x: float, y: float, w: int, h: int, colour: tuple,
-              outlineWidth: int = 0, outlineColour: tuple = C_BLACK) -> None:
+              outlineWidth: int = 0, outlineColour: tuple = C_BLACK, layer: int = 0) -> None:
     """
     Draws a filled rectangle
     :param x: x coordinate of the top left corner
@@ -584,12 +1220,14 @@ def fill_rect(x: float, y: float, w: int, h: int, colour: tuple,
     :param colour: colour of the fill
     :param outlineWidth: width of the outline (optional)
     :param outlineColour: colour of the outline (optional, default black)
+    :param layer: draw layer, higher layers are drawn on top (default 0)
     :return: None
     """
-    _add_render_object(RenderObject(x, y, w, h, "rect", col=colour, oCol=outlineColour, oWidth=outlineWidth))
+    _m_rQueue.push(x, y, w, h, "rect", col=colour, oCol=outlineColour, oWidth=outlineWidth, layer=layer)
 
 
-def draw_square(x: float, y: float, length: int, colour: tuple = C_BLACK, outlineWidth: int = 1) -> None:
+def draw_square(x: float, y: float, length: int, colour: tuple = C_BLACK, outlineWidth: int = 1,
+                layer: int = 0) -> None:
     """
     Draws an outline of a square
     :param x: x coordinate of the top-left corner
@@ -597,13 +1235,14 @@ def draw_square(x: float, y: float, length: int, colour: tuple = C_BLACK, outlin
     :param length: length of the sides of the square
     :param colour: colour of the outline (default black)
     :param outlineWidth: outline width of the square (default 1)
+    :param layer: draw layer, higher layers are drawn on top (default 0)
     :return:
     """
-    draw_rect(x, y, length, length, colour, outlineWidth)
+    draw_rect(x, y, length, length, colour, outlineWidth, layer)
 
 
 def fill_square(x: float, y: float, length: int, colour: tuple,
-                outlineWidth: int = 0, outlineColour: tuple = C_BLACK) -> None:
+                outlineWidth: int = 0, outlineColour: tuple = C_BLACK, layer: int = 0) -> None:
     """
     Draws a filled square
     :param x: x coordinate of top-left corner
@@ -612,32 +1251,84 @@ def fill_square(x: float, y: float, length: int, colour: tuple,
     :param colour: fill colour
     :param outlineWidth: outline width (optional)
     :param outlineColour: outline colour (default black)
+    :param layer: draw layer, higher layers are drawn on top (default 0)
     :return: None
     """
-    fill_rect(x, y, length, length, colour, outlineWidth, outlineColour)
+    fill_rect(x, y, length, length, colour, outlineWidth, outlineColour, layer)
 
 
-def draw_ellipse(x: float, y: float, rX: int, rY: int, colour: tuple, outlineWidth: int = 1) -> None:
-    _add_render_object(RenderObject(x, y, rX, rY, "ellipse", oCol=colour, oWidth=outlineWidth))
+def draw_ellipse(x: float, y: float, rX: int, rY: int, colour: tuple, outlineWidth: int = 1,
+                 layer: int = 0) -> None:
+    _m_rQueue.push(x, y, rX, rY, "ellipse", oCol=colour, oWidth=outlineWidth, layer=layer)
 
 
 def fill_ellipse(x: float, y: float, rX: int, rY: int, colour: tuple,
-                 outlineWidth: int = 1, outlineColour: tuple = C_BLACK) -> None:
-    _add_render_object(RenderObject(x, y, rX, rY, "ellipse", col=colour, oWidth=outlineWidth, oCol=outlineColour))
+                 outlineWidth: int = 1, outlineColour: tuple = C_BLACK, layer: int = 0) -> None:
+    _m_rQueue.push(x, y, rX, rY, "ellipse", col=colour, oWidth=outlineWidth, oCol=outlineColour, layer=layer)
 
 
-def draw_circle(x: float, y: float, r: int, colour: tuple, outlineWidth: int = 1) -> None:
-    draw_ellipse(x, y, r, r, colour, outlineWidth)
+def draw_circle(x: float, y: float, r: int, colour: tuple, outlineWidth: int = 1, layer: int = 0) -> None:
+    draw_ellipse(x, y, r, r, colour, outlineWidth, layer)
 
 
 def fill_circle(x: float, y: float, r: int, colour: tuple,
-                outlineWidth: int = 1, outlineColour: tuple = C_BLACK) -> None:
-    fill_ellipse(x, y, r, r, colour, outlineWidth, outlineColour)
+                outlineWidth: int = 1, outlineColour: tuple = C_BLACK, layer: int = 0) -> None:
+    fill_ellipse(x, y, r, r, colour, outlineWidth, outlineColour, layer)
 
 
 def draw_texture(x: float, y: float, textureID: str, width: int = None, height: int = None,
-                 shouldCache: bool = True) -> None:
-    _add_render_object(RenderObject(x, y, width, height, "texture", path=textureID, shouldCache=shouldCache))
+                 shouldCache: bool = True, layer: int = 0) -> None:
+    _m_rQueue.push(x, y, width, height, "texture", path=textureID, shouldCache=shouldCache, layer=layer,
+                   isStatic=textureID in _m_rStaticTextures)
+
+
+def draw_entities(store: EntityStore, layer: int = 0) -> None:
+    """
+    Queues a draw call for every entity with a position and a rect (filled) or sprite component. Each archetype's
+    component columns are copied into the render queue at once rather than pushing one command per entity
+    :param store: entities to draw
+    :param layer: draw layer, higher layers are drawn on top (default 0)
+    :return: None
+    """
+    for archetype in store.query(EC_POSITION, EC_RECT):
+        position = archetype.columns[EC_POSITION]
+        rect = archetype.columns[EC_RECT]
+        _m_rQueue.push_many(position["x"], position["y"], rect["w"], rect["h"], "rect", col=rect["colour"],
+                            layer=layer)
+    for archetype in store.query(EC_POSITION, EC_SPRITE):
+        position = archetype.columns[EC_POSITION]
+        sprite = archetype.columns[EC_SPRITE]
+        textures = sprite["texture"]
+        if not textures:
+            continue
+        if textures.count(textures[0]) == len(textures):
+            _m_rQueue.push_many(position["x"], position["y"], sprite["w"], sprite["h"], "texture", path=textures[0],
+                                layer=layer, isStatic=textures[0] in _m_rStaticTextures)
+            continue
+        # mixed textures are queued one texture at a time so batching still sees runs of the same texture
+        for texture in dict.fromkeys(textures):
+            rows = [row for row, rowTexture in enumerate(textures) if rowTexture == texture]
+            _m_rQueue.push_many([position["x"][row] for row in rows], [position["y"][row] for row in rows],
+                                [sprite["w"][row] for row in rows], [sprite["h"][row] for row in rows], "texture",
+                                path=texture, layer=layer, isStatic=texture in _m_rStaticTextures)
+
+
+def begin_static() -> None:
+    """
+    Marks every draw call made until end_static as static. Static draw calls are rendered once into a layer which is
+    only re-rendered when the static draw calls of a frame change. The layer is drawn at the lowest draw layer of the
+    static draw calls, beneath dynamic draw calls on that layer and above those on lower layers
+    :return: None
+    """
+    _m_rQueue.staticMode = True
+
+
+def end_static() -> None:
+    """
+    Stops marking draw calls as static (see begin_static)
+    :return: None
+    """
+    _m_rQueue.staticMode = False
 
 
 def load_texture(path: str, texID: str, newwidth: int = 0, newheight: int = 0, isstatic=False) -> False:
@@ -647,14 +1338,24 @@ def load_texture(path: str, texID: str, newwidth: int = 0, newheight: int = 0, i
     :param texID: ID used to reference the texture
     :param newwidth: new width of the image (must be used in conjunctuion with newheight
     :param newheight: new height of the image (must be used in conjunction with newidth)
-    :param isstatic: An image is static if it will never change position / size
+    :param isstatic: An image is static if it will never change position / size. Static images are drawn into the
+    static layer (see begin_static)
     :return: None
     """
     if not os.path.isfile(path):
-        _m_eEngineLogger.warning(f"Could not find texture ID {texID} at {path}")
+        _m_eEngineLogger.warning("Could not find texture ID %s at %s", texID, path)
         return
     if texID in _m_rTextureBank:
-        _m_eEngineLogger.warning(f"Texture ID {texID} is being overwritten with the image at {path}")
+        _m_eEngineLogger.warning("Texture ID %s is being overwritten with the image at %s", texID, path)
+    _m_rTextureCache.invalidate(texID)
+    global _m_rStaticHash
+    if texID in _m_rTextureBank:
+        # the static layer may contain the old image
+        _m_rStaticHash = None
+    if isstatic:
+        _m_rStaticTextures.add(texID)
+    else:
+        _m_rStaticTextures.discard(texID)
     _m_rTextureBank[texID] = pygame.image.load(path).convert()
     # rescale to new width
     tWidth = newwidth if newwidth else _m_rTextureBank[texID].get_width()
@@ -664,22 +1365,45 @@ def load_texture(path: str, texID: str, newwidth: int = 0, newheight: int = 0, i
 
 def mark_texture_for_cleanup(texID: str) -> None:
     if texID not in _m_rTextureBank:
-        _m_eEngineLogger.warning(f"Attempting to mark {texID} for cleanup when it does not exist!")
+        _m_eEngineLogger.warning("Attempting to mark %s for cleanup when it does not exist!", texID)
         return
     global _m_rToCleanup
     _m_rToCleanup.append(texID)
+    _m_rTextureCache.invalidate(texID)
+
+
+def set_texture_cache_budget(budget: int) -> None:
+    """
+    Sets how much memory the cache of scaled textures may use, evicting the least recently drawn textures if needed
+    :param budget: budget in bytes
+    :return: None
+    """
+    _m_rTextureCache.set_budget(budget)
+
+
+def get_texture_cache_stats() -> dict:
+    """
+    Gets the hit / miss / eviction counters of the scaled texture cache
+    :return: dict of cache statistics
+    """
+    return _m_rTextureCache.get_stats()
 
 
 def init():
+    if _m_eHeadless != HM_WINDOWED and not pygame.display.get_init():
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
     if not pygame.get_init():
         pygame.init()
     global _m_eClientLogger, _m_eEngineLogger
     logfile = f"logs/{EngineLog.Logger.get_date_time()}.log"
-    _m_eClientLogger = EngineLog.Logger(logfile, "CLIENT")
-    _m_eEngineLogger = EngineLog.Logger(logfile, "ENGINE")
+    sinkOptions = (_m_eLogQueueVar.GetValue(), _m_eLogPolicyVar.GetValue(), _m_eLogFlushVar.GetValue())
+    _m_eClientLogger = EngineLog.Logger(logfile, "CLIENT", LOG_INFO, *sinkOptions)
+    _m_eEngineLogger = EngineLog.Logger(logfile, "ENGINE", LOG_INFO, *sinkOptions)
     _m_eEngineLogger.info("Initialised engine!")
     add_key_callback(_engine_key_handle)
     _create_window()
+    _update_allowed_events()
     _set_init(True)
 
 
@@ -688,11 +1412,107 @@ def _exit():
     sys.exit(0)
 
 
-def run(initialScene: Scene.Scene) -> None:
+""" ------------------ FRAME PACING -----------------"""
+
+_m_eTargetFPS: float = 0
+_m_eSkipIdleRedraws: bool = True
+# waits longer than this (in miliseconds) sleep for all but this long and spin for the rest, as sleep can wake late
+_m_eSpinThreshold: float = 2
+_m_ePacingStats: dict = {}
+
+
+def set_target_fps(fps: float) -> None:
+    """
+    Caps how many frames the engine runs per second. The engine sleeps between frames instead of spinning
+    :param fps: frames per second, 0 for no cap
+    :return: None
+    """
+    global _m_eTargetFPS
+    _m_eTargetFPS = max(fps, 0)
+
+
+def get_target_fps() -> float:
+    return _m_eTargetFPS
+
+
+def set_skip_idle_redraws(shouldSkip: bool) -> None:
+    """
+    Sets wether frames in which no tick or physics step ran are skipped. When skipping, the engine sleeps until the next
+    tick or physics step is due instead of redrawing the same frame
+    :param shouldSkip: should idle frames be skipped
+    :return: None
+    """
+    global _m_eSkipIdleRedraws
+    _m_eSkipIdleRedraws = shouldSkip
+
+
+def set_spin_threshold(threshold: float) -> None:
+    """
+    Sets how long before a frame deadline the engine stops sleeping and spins instead. Larger values hit deadlines
+    more accurately on platforms with coarse sleep timers at the cost of more CPU time
+    :param threshold: time in miliseconds
+    :return: None
+    """
+    global _m_eSpinThreshold
+    _m_eSpinThreshold = max(threshold, 0)
+
+
+def reset_pacing_stats() -> None:
+    _m_ePacingStats.update(waits=0, sleep=0.0, spin=0.0, overshoot=0.0, max_overshoot=0.0, skipped_redraws=0)
+
+
+def get_pacing_stats() -> dict:
+    """
+    Gets how the engine has spent the time between frames since the stats were last reset. Times are in miliseconds
+    :return: dict with the number of waits, total time slept and spun, mean and worst time woken after a deadline and
+    the number of skipped redraws
+    """
+    waits = _m_ePacingStats["waits"]
+    return {
+        "waits": waits,
+        "sleep": _m_ePacingStats["sleep"],
+        "spin": _m_ePacingStats["spin"],
+        "mean_overshoot": _m_ePacingStats["overshoot"] / waits if waits else 0,
+        "max_overshoot": _m_ePacingStats["max_overshoot"],
+        "skipped_redraws": _m_ePacingStats["skipped_redraws"]
+    }
+
+
+reset_pacing_stats()
+
+
+def _engine_wait_until(deadline: float) -> None:
+    """
+    Waits until an engine time, sleeping for most of the wait and spinning for the last _m_eSpinThreshold
+    :param deadline: engine time to wait until in miliseconds
+    :return: None
+    """
+    now = get_engine_time()
+    if now >= deadline:
+        return
+    stats = _m_ePacingStats
+    stats["waits"] += 1
+    if deadline - now > _m_eSpinThreshold:
+        time.sleep((deadline - now - _m_eSpinThreshold) / 1e3)
+        woken = get_engine_time()
+        stats["sleep"] += woken - now
+        now = woken
+    spinStart = now
+    while now < deadline:
+        now = get_engine_time()
+    stats["spin"] += now - spinStart
+    stats["overshoot"] += now - deadline
+    stats["max_overshoot"] = max(stats["max_overshoot"], now - deadline)
+
+
+def run(initialScene: Scene.Scene, maxTicks: int = None, maxFrames: int = None) -> Optional[dict]:
     """
     Actually runs the engine
     :param initialScene: the initial scene that the engine should run
-    :return: None
+    :param maxTicks: stop after this many ticks (optional)
+    :param maxFrames: stop after this many frames (optional)
+    :return: if the engine is headless or a tick / frame limit was given, returns the number of ticks and frames run
+    and the real time taken in miliseconds once the engine stops. Otherwise the application exits
     """
     _set_running(True)
     if not get_init():
@@ -701,21 +1521,34 @@ def run(initialScene: Scene.Scene) -> None:
         _exit()
     _m_eEngineLogger.info("Starting Engine...")
     set_scene(initialScene)
-    pTime = 0
+    pTime = 0 if _m_eUncapped else get_engine_time()
+    nextFrame = pTime
     lag = 0
     frames = 0
     phys_steps = 0
     ticks = 0
+    totalTicks = 0
+    totalFrames = 0
+    startTime = time.perf_counter()
     global _m_eTimePerTick, _m_eFPS, _m_eTPS
     while get_running():
-        cTime = get_engine_time()
-        elapsedTime = cTime - pTime
+        if _m_eUncapped:
+            cTime = pTime + _m_eTimePerTick
+            elapsedTime = _m_eTimePerTick
+        else:
+            cTime = get_engine_time()
+            elapsedTime = cTime - pTime
         lag += elapsedTime
+        _m_eProfiler.begin_frame()
         _engine_gather_input()
+        _m_eProfiler.mark(Profiler.PROF_INPUT)
+        frameTicks = 0
         while lag >= _m_eTimePerTick:
             _engine_step()
             step_client_tickbase(1)
             ticks += 1
+            totalTicks += 1
+            frameTicks += 1
             if get_client_tickbase() % get_engine_tickrate() == 0:
                 _m_eFPS = frames
                 _m_eTPS = ticks
@@ -726,7 +1559,43 @@ def run(initialScene: Scene.Scene) -> None:
                 frames = 0
                 ticks = 0
             lag -= _m_eTimePerTick
-        _engine_draw()
-        frames += 1
+            if maxTicks is not None and totalTicks >= maxTicks:
+                _set_running(False)
+                break
+        _m_eProfiler.mark(Profiler.PROF_STEP)
+        frameSteps = _engine_physics(elapsedTime)
+        phys_steps += frameSteps
+        _m_eProfiler.mark(Profiler.PROF_PHYSICS)
+        idle = not frameTicks and not frameSteps
+        if idle and _m_eSkipIdleRedraws:
+            # nothing has changed since the last frame so there is nothing new to draw
+            _m_eProfiler.discard_frame()
+            _m_ePacingStats["skipped_redraws"] += 1
+        else:
+            if _m_eHeadless != HM_NO_RENDER:
+                _engine_draw()
+            _m_eProfiler.end_frame()
+            frames += 1
+            totalFrames += 1
+            if maxFrames is not None and totalFrames >= maxFrames:
+                _set_running(False)
         pTime = cTime
-    _exit()
+        if _m_eUncapped or not get_running():
+            continue
+        deadline = 0
+        if _m_eTargetFPS > 0:
+            # a late frame starts the schedule again from now rather than rushing to catch up
+            nextFrame = max(nextFrame + 1e3 / _m_eTargetFPS, cTime)
+            deadline = nextFrame
+        if idle and _m_eSkipIdleRedraws:
+            nextUpdate = _m_eTimePerTick - lag
+            if _m_ePhysicsProcess is None:
+                nextUpdate = min(nextUpdate, Physics.get_world().get_time_to_step())
+            deadline = max(deadline, cTime + nextUpdate)
+        if deadline:
+            _engine_wait_until(deadline)
+    if _m_eHeadless == HM_WINDOWED and maxTicks is None and maxFrames is None:
+        _exit()
+    # leave the scene now rather than at interpreter shutdown, when the engine's globals may already be gone
+    set_scene(None)
+    return {"ticks": totalTicks, "frames": totalFrames, "time": (time.perf_counter() - startTime) * 1e3}
@@ -1,23 +1,184 @@
+from __future__ import annotations
 import os
-import inspect
+import sys
+import time
+import queue
+import atexit
 import datetime
+import threading
 
+if __package__ is None or __package__ == '':
+    from Constants import *
+else:
+    from .Constants import *
 
-class Logger:
 
-    def __init__(self, logFile: str, entity: str):
-        if not os.path.isdir("logs"):
-            os.mkdir("logs")
+class LogSink:
+    """
+    Owns one log file and a background thread that writes to it. Records are pushed onto a bounded queue by the
+    loggers and written in batches, so a slow disk never stalls the thread that is logging. Every logger writing to
+    the same path shares one sink
+    """
+    _m_sinks: dict = {}
+    _m_sinksLock = threading.Lock()
+
+    def __init__(self, logFile: str, maxQueued: int = 4096, policy: int = LOG_POLICY_DROP,
+                 flushInterval: float = 0.5, batchSize: int = 256):
         if not os.path.isfile(logFile):
             print(f"Creating file: {logFile}")
-            with open(logFile, "w", encoding='utf-8'):
+        self.m_logPath: str = logFile
+        self.m_file = open(logFile, "a", encoding='utf-8')
+        self.m_queue: queue.Queue = queue.Queue(maxQueued)
+        self.m_policy: int = policy
+        self.m_flushInterval: float = flushInterval
+        self.m_batchSize: int = batchSize
+        self.m_refCount: int = 0
+        self.dropped: int = 0
+        self.m_thread = threading.Thread(target=self._writer, name=f"LogSink({logFile})", daemon=True)
+        self.m_thread.start()
+
+    @staticmethod
+    def acquire(logFile: str, maxQueued: int = 4096, policy: int = LOG_POLICY_DROP,
+                flushInterval: float = 0.5) -> LogSink:
+        """
+        Gets the sink writing to a path, creating it if no logger is using that path yet. The queue settings only
+        apply when the sink is created, a sink that already exists keeps its own
+        :param logFile: path of the log file
+        :param maxQueued: most records waiting to be written
+        :param policy: LOG_POLICY_DROP or LOG_POLICY_BLOCK, what happens to records pushed while the queue is full
+        :param flushInterval: seconds between flushes of the file
+        :return: the shared sink
+        """
+        key = os.path.abspath(logFile)
+        with LogSink._m_sinksLock:
+            sink = LogSink._m_sinks.get(key)
+            if sink is None:
+                sink = LogSink(logFile, maxQueued, policy, flushInterval)
+                LogSink._m_sinks[key] = sink
+            sink.m_refCount += 1
+        return sink
+
+    def release(self) -> None:
+        """
+        Drops one reference to the sink, closing it once no logger is using it
+        :return: None
+        """
+        with LogSink._m_sinksLock:
+            self.m_refCount -= 1
+            if self.m_refCount > 0:
+                return
+            LogSink._m_sinks.pop(os.path.abspath(self.m_logPath), None)
+        self.close()
+
+    def set_policy(self, policy: int) -> None:
+        """
+        Sets what happens to records pushed while the queue is full
+        :param policy: LOG_POLICY_DROP to discard the record or LOG_POLICY_BLOCK to wait for space
+        :return: None
+        """
+        self.m_policy = policy
+
+    def push(self, record: tuple) -> None:
+        """
+        Queues a record to be written by the writer thread
+        :param record: (elevation, entity, caller module, timestamp, message)
+        :return: None
+        """
+        if self.m_policy == LOG_POLICY_BLOCK:
+            self.m_queue.put(record)
+            return
+        try:
+            self.m_queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    @staticmethod
+    def _format(record: tuple) -> str:
+        elevation, entity, caller_module, timestamp, message = record
+        return f"[{elevation}][{entity}:{caller_module}][{time.strftime('%H:%M:%S', time.localtime(timestamp))}] : " \
+               f"{message}\n"
+
+    def _writer(self) -> None:
+        """
+        Writer thread loop, writes whatever is queued in batches and flushes the file every flush interval
+        :return: None
+        """
+        lastFlush = time.monotonic()
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                record = self.m_queue.get(timeout=self.m_flushInterval)
+                while True:
+                    if record is None:
+                        stopping = True
+                        break
+                    batch.append(self._format(record))
+                    if len(batch) >= self.m_batchSize:
+                        break
+                    record = self.m_queue.get_nowait()
+            except queue.Empty:
                 pass
-        self.m_logFile = open(logFile, "a", encoding='utf-8')
+            if batch:
+                self.m_file.write("".join(batch))
+            now = time.monotonic()
+            if stopping or now - lastFlush >= self.m_flushInterval:
+                self.m_file.flush()
+                lastFlush = now
+
+    def close(self) -> None:
+        """
+        Writes everything still queued, then stops the writer thread and closes the file
+        :return: None
+        """
+        if not self.m_thread.is_alive():
+            return
+        # None is the stop marker and always waits for space so no queued records are lost
+        self.m_queue.put(None)
+        self.m_thread.join()
+        self.m_file.close()
+
+    @staticmethod
+    def close_all() -> None:
+        with LogSink._m_sinksLock:
+            sinks = list(LogSink._m_sinks.values())
+            LogSink._m_sinks.clear()
+        for sink in sinks:
+            sink.close()
+
+
+atexit.register(LogSink.close_all)
+
+
+class Logger:
+    # basename of the file each calling code object belongs to, shared between every logger
+    _m_callerModules: dict = {}
+
+    def __init__(self, logFile: str, entity: str, level: int = LOG_INFO, maxQueued: int = 4096,
+                 policy: int = LOG_POLICY_DROP, flushInterval: float = 0.5):
+        """
+        :param logFile: path of the log file, loggers writing to the same path share one sink
+        :param entity: name written with every record
+        :param level: lowest level of message written
+        :param maxQueued: queue size of the sink, used if this logger creates it (see LogSink.acquire)
+        :param policy: full queue policy of the sink, used if this logger creates it
+        :param flushInterval: seconds between flushes of the sink, used if this logger creates it
+        """
+        if not os.path.isdir("logs"):
+            os.mkdir("logs")
+        self.m_sink: LogSink = LogSink.acquire(logFile, maxQueued, policy, flushInterval)
         self.m_logPath = logFile
         self.m_entity = entity
+        self.m_level: int = level
 
     def __del__(self):
-        self.m_logFile.close()
+        sink = getattr(self, "m_sink", None)
+        if sink:
+            self.m_sink = None
+            sink.release()
+
+    def get_sink(self) -> LogSink:
+        return self.m_sink
 
     @staticmethod
     def get_log_time() -> str:
@@ -35,6 +196,39 @@ class Logger:
         """
         return datetime.datetime.now().strftime('%d-%m-%Y-%H-%M-%S')
 
+    def set_level(self, level: int) -> None:
+        """
+        Sets the lowest level of message that gets written, anything below it is discarded before being formatted
+        :param level: one of the LOG_ constants
+        :return: None
+        """
+        self.m_level = level
+
+    def get_level(self) -> int:
+        return self.m_level
+
+    def is_enabled(self, level: int) -> bool:
+        """
+        Checks whether messages of a level would be written, for callers that need to do work to build a message
+        :param level: one of the LOG_ constants
+        :return: True if the message would be written
+        """
+        return level >= self.m_level
+
+    @staticmethod
+    def _get_caller_module(depth: int) -> str:
+        """
+        Gets the file name of the function that called into the logger, cached per code object
+        :param depth: number of frames between this function and the caller
+        :return: file name of the caller
+        """
+        code = sys._getframe(depth + 1).f_code
+        module = Logger._m_callerModules.get(code)
+        if module is None:
+            module = os.path.basename(code.co_filename)
+            Logger._m_callerModules[code] = module
+        return module
+
     def _write_log_message(self, elevation: str, message: str, caller_module: str) -> None:
         """
         Used internally to structure and format log messages
@@ -43,34 +237,49 @@ class Logger:
         :param caller_module: module the log is being called from
         :return: None
         """
-        self.m_logFile.write(f"[{elevation}][{self.m_entity}:{caller_module}][{Logger.get_log_time()}] : {message}\n")
+        self.m_sink.push((elevation, self.m_entity, caller_module, time.time(), message))
 
-    def info(self, message: str) -> None:
+    def _log(self, elevation: str, message: str, args: tuple) -> None:
+        """
+        Formats any lazy arguments into the message and writes it, attributed to the caller of info / warning / error
+        :param elevation: level of log to log
+        :param message: message to log, formatted with % if args are given
+        :param args: arguments for the message
+        :return: None
+        """
+        if args:
+            message = message % args
+        self._write_log_message(elevation, message, Logger._get_caller_module(2))
+
+    def info(self, message: str, *args) -> None:
         """
         Log an informational message
-        :param message: message to log
+        :param message: message to log, may contain % style placeholders that are only filled in if it is written
+        :param args: arguments for the placeholders
         :return: None
         """
-        caller_stackframe = inspect.stack()[1]
-        caller_module = os.path.basename(caller_stackframe.filename)
-        self._write_log_message("INFO", message, caller_module)
+        if self.m_level > LOG_INFO:
+            return
+        self._log("INFO", message, args)
 
-    def warning(self, message: str) -> None:
+    def warning(self, message: str, *args) -> None:
         """
         Log a warning message
-        :param message: message to log
+        :param message: message to log, may contain % style placeholders that are only filled in if it is written
+        :param args: arguments for the placeholders
         :return: None
         """
-        caller_stackframe = inspect.stack()[1]
-        caller_module = os.path.basename(caller_stackframe.filename)
-        self._write_log_message("WARN", message, caller_module)
+        if self.m_level > LOG_WARNING:
+            return
+        self._log("WARN", message, args)
 
-    def error(self, message: str) -> None:
+    def error(self, message: str, *args) -> None:
         """
         Log that an error has occured
-        :param message: message to log
+        :param message: message to log, may contain % style placeholders that are only filled in if it is written
+        :param args: arguments for the placeholders
         :return: None
         """
-        caller_stackframe = inspect.stack()[1]
-        caller_module = os.path.basename(caller_stackframe.filename)
-        self._write_log_message("ERROR", message, caller_module)
+        if self.m_level > LOG_ERROR:
+            return
+        self._log("ERROR", message, args)
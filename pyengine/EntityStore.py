@@ -0,0 +1,267 @@
+"""
+Archetype based entity component storage. Entities with the same set of components share an archetype whose
+components are stored as one contiguous column per field, so systems work through whole arrays instead of one Python
+object per entity
+"""
+from array import array
+from itertools import repeat
+from operator import add, mul
+
+if __package__ is None or __package__ == '':
+    from Constants import *
+else:
+    from .Constants import *
+
+# typecode of fields holding arbitrary Python objects, stored in a list instead of an array
+OBJECT_FIELD = 'O'
+
+
+def _new_column(typecode: str):
+    return [] if typecode == OBJECT_FIELD else array(typecode)
+
+
+class Archetype:
+    """
+    Every entity that has exactly one set of components. Row i of every column belongs to entities[i]
+    """
+
+    def __init__(self, components: frozenset, schemas: dict):
+        self.components: frozenset = components
+        self.entities: array = array('q')
+        self.columns: dict = {component: {field: _new_column(typecode)
+                                          for field, typecode in schemas[component].items()}
+                              for component in components}
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def column(self, component: str, field: str):
+        """
+        Gets the storage of one field of a component. Write back into it with slice assignment (column[:] = ...) so
+        the archetype keeps the same column
+        :param component: component name
+        :param field: field name
+        :return: array of the field for every entity, or a list for object fields
+        """
+        return self.columns[component][field]
+
+    def _append(self, entity: int, values: dict) -> int:
+        for component, fields in self.columns.items():
+            componentValues = values[component]
+            for field, column in fields.items():
+                column.append(componentValues[field])
+        self.entities.append(entity)
+        return len(self.entities) - 1
+
+    def _read(self, row: int) -> dict:
+        return {component: {field: column[row] for field, column in fields.items()}
+                for component, fields in self.columns.items()}
+
+    def _remove(self, row: int):
+        """
+        Removes a row by moving the last row into it
+        :param row: row to remove
+        :return: the entity moved into the row, None if the last row was removed
+        """
+        last = len(self.entities) - 1
+        for fields in self.columns.values():
+            for column in fields.values():
+                column[row] = column[last]
+                column.pop()
+        moved = self.entities[last]
+        self.entities[row] = moved
+        self.entities.pop()
+        return moved if row != last else None
+
+
+class EntityStore:
+    """
+    Creates entities and stores their components by archetype. The standard components (see the EC_ constants) are
+    registered by default: position and velocity (x, y), physics (body, a physics component), rect (w, h, colour) and
+    sprite (texture, w, h)
+    """
+
+    def __init__(self):
+        self.m_schemas: dict = {}
+        self.m_archetypes: dict = {}
+        # entity -> archetype it is stored in and its row within that archetype
+        self.m_locations: dict = {}
+        self.m_rows: dict = {}
+        self.m_nextEntity: int = 0
+        self.m_queries: dict = {}
+        self.register_component(EC_POSITION, x='d', y='d')
+        self.register_component(EC_VELOCITY, x='d', y='d')
+        self.register_component(EC_PHYSICS, body=OBJECT_FIELD)
+        self.register_component(EC_RECT, w='d', h='d', colour=OBJECT_FIELD)
+        self.register_component(EC_SPRITE, texture=OBJECT_FIELD, w='d', h='d')
+
+    def __len__(self) -> int:
+        return len(self.m_locations)
+
+    def register_component(self, name: str, **fields) -> None:
+        """
+        Registers a component type
+        :param name: component name
+        :param fields: field name to array typecode ('d', 'i', ...) or OBJECT_FIELD
+        :return: None
+        """
+        if name in self.m_schemas:
+            if self.m_schemas[name] != fields:
+                raise ValueError(f"Component {name} is already registered with different fields")
+            return
+        for field, typecode in fields.items():
+            if typecode != OBJECT_FIELD:
+                # raises ValueError for unknown typecodes
+                array(typecode)
+        self.m_schemas[name] = dict(fields)
+
+    def _get_archetype(self, components: frozenset) -> Archetype:
+        archetype = self.m_archetypes.get(components)
+        if archetype is None:
+            unknown = [component for component in components if component not in self.m_schemas]
+            if unknown:
+                raise KeyError(f"Unregistered components: {', '.join(unknown)}")
+            archetype = Archetype(components, self.m_schemas)
+            self.m_archetypes[components] = archetype
+            for query, matches in self.m_queries.items():
+                if query <= components:
+                    matches.append(archetype)
+        return archetype
+
+    def _normalise(self, component: str, values) -> dict:
+        """
+        Accepts component values as a dict or as a tuple in the order the fields were registered
+        """
+        if isinstance(values, dict):
+            return values
+        return dict(zip(self.m_schemas[component], values))
+
+    def create(self, **components) -> int:
+        """
+        Creates an entity
+        :param components: component name to its values, as a dict or a tuple in field order
+        :return: id of the entity
+        """
+        values = {component: self._normalise(component, value) for component, value in components.items()}
+        archetype = self._get_archetype(frozenset(values))
+        entity = self.m_nextEntity
+        self.m_nextEntity += 1
+        self.m_rows[entity] = archetype._append(entity, values)
+        self.m_locations[entity] = archetype
+        return entity
+
+    def destroy(self, entity: int) -> None:
+        """
+        Destroys an entity. Physics bodies of the entity are not removed from the physics engine
+        :param entity: id of the entity
+        :return: None
+        """
+        archetype = self.m_locations.pop(entity)
+        row = self.m_rows.pop(entity)
+        moved = archetype._remove(row)
+        if moved is not None:
+            self.m_rows[moved] = row
+
+    def has(self, entity: int, component: str) -> bool:
+        return entity in self.m_locations and component in self.m_locations[entity].components
+
+    def get(self, entity: int, component: str) -> dict:
+        """
+        Gets a copy of one component of an entity
+        :param entity: id of the entity
+        :param component: component name
+        :return: dict of field name to value
+        """
+        archetype = self.m_locations[entity]
+        row = self.m_rows[entity]
+        return {field: column[row] for field, column in archetype.columns[component].items()}
+
+    def set(self, entity: int, component: str, **values) -> None:
+        """
+        Sets fields of one component of an entity
+        :param entity: id of the entity
+        :param component: component name
+        :param values: field name to new value
+        :return: None
+        """
+        archetype = self.m_locations[entity]
+        row = self.m_rows[entity]
+        columns = archetype.columns[component]
+        for field, value in values.items():
+            columns[field][row] = value
+
+    def _move(self, entity: int, components: dict) -> None:
+        archetype = self.m_locations[entity]
+        row = self.m_rows[entity]
+        moved = archetype._remove(row)
+        if moved is not None:
+            self.m_rows[moved] = row
+        newArchetype = self._get_archetype(frozenset(components))
+        self.m_rows[entity] = newArchetype._append(entity, components)
+        self.m_locations[entity] = newArchetype
+
+    def add_component(self, entity: int, component: str, values) -> None:
+        """
+        Adds a component to an entity (or replaces its values), moving the entity to the matching archetype
+        :param entity: id of the entity
+        :param component: component name
+        :param values: component values as a dict or a tuple in field order
+        :return: None
+        """
+        archetype = self.m_locations[entity]
+        if component in archetype.components:
+            self.set(entity, component, **self._normalise(component, values))
+            return
+        components = archetype._read(self.m_rows[entity])
+        components[component] = self._normalise(component, values)
+        self._move(entity, components)
+
+    def remove_component(self, entity: int, component: str) -> None:
+        archetype = self.m_locations[entity]
+        if component not in archetype.components:
+            return
+        components = archetype._read(self.m_rows[entity])
+        del components[component]
+        self._move(entity, components)
+
+    def query(self, *components) -> list:
+        """
+        Gets every archetype whose entities have all of a set of components. The result is cached and kept up to date
+        as new archetypes are created, so it is cheap to call every tick
+        :param components: component names
+        :return: list of archetypes
+        """
+        key = frozenset(components)
+        matches = self.m_queries.get(key)
+        if matches is None:
+            matches = [archetype for archetype in self.m_archetypes.values() if key <= archetype.components]
+            self.m_queries[key] = matches
+        return matches
+
+
+def integrate(store: EntityStore, step: float) -> None:
+    """
+    Moves every entity with a position and velocity by velocity * step
+    :param store: entities to move
+    :param step: time step in seconds
+    :return: None
+    """
+    for archetype in store.query(EC_POSITION, EC_VELOCITY):
+        position = archetype.columns[EC_POSITION]
+        velocity = archetype.columns[EC_VELOCITY]
+        for axis in ("x", "y"):
+            column = position[axis]
+            column[:] = array('d', map(add, column, map(mul, velocity[axis], repeat(step))))
+
+
+def sync_physics(store: EntityStore) -> None:
+    """
+    Copies the position of the physics body of every entity with a physics component into its position component
+    :param store: entities to update
+    :return: None
+    """
+    for archetype in store.query(EC_POSITION, EC_PHYSICS):
+        bodies = archetype.columns[EC_PHYSICS]["body"]
+        position = archetype.columns[EC_POSITION]
+        position["x"][:] = array('d', [body.pos.x for body in bodies])
+        position["y"][:] = array('d', [body.pos.y for body in bodies])
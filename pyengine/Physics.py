@@ -1,10 +1,19 @@
 import copy
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
-
-from vector import vec2d
 from enum import IntEnum
 
+if __package__ is None or __package__ == '':
+    import Broadphase
+    import ConVar
+    from Constants import *
+    from vector import vec2d
+else:
+    from . import Broadphase
+    from . import ConVar
+    from .Constants import *
+    from .vector import vec2d
+
 
 class CollisionType(IntEnum):
     PHYS_PARTICLE = 0
@@ -19,97 +28,85 @@ class _PhysicsObject:
     vel: vec2d
     weight: float
     apply_grav: bool = False
-    accel: vec2d = vec2d(0, 0)
+    accel: vec2d = field(default_factory=vec2d)
     _last_newvel: vec2d = None
+    prev_pos: vec2d = None
+    sleeping: bool = False
+    _uid: int = 0
+    _sleep_counter: int = 0
+    _sleep_anchor: vec2d = None
+    ccd: bool = False
+    _sleep_bounds: tuple = None
 
 
-""" ----------------- PHYSICS VARIABLES ------------"""
-
-_m_physics_steps: int = 32
-_m_step_time: float = 1e3 / _m_physics_steps
-_m_step_mult = 1 / _m_physics_steps
-
-
-def set_physics_steps(newsteps: int):
-    if newsteps <= 0:
-        return
-    global _m_physics_steps, _m_step_time, _m_step_mult
-    _m_physics_steps = newsteps
-    _m_step_time = 1e3 / newsteps
-    _m_step_mult = 1 / _m_physics_steps
-
-
-_m_grav: vec2d = vec2d(0, 120)
-
-
-def set_gravity(grav: float):
-    global _m_grav
-    _m_grav = vec2d(0, grav)
-
-
-_m_physObjects = []
-
-
-def create_component(_type: CollisionType, x: float, y: float, w: float, h: float, velx: float, vely: float,
-                     weight: float, apply_grav=True) -> _PhysicsObject:
-    """
-    Creates physics component
-    :param _type: Type of physics component
-    :param x: initial x value (depends on type)
-    :param y: initial y value (depends on type)
-    :param w: initial width / radius in x direction
-    :param h: initial height / radius in y dimensions
-    :param velx: initial velocity in x direction
-    :param vely: initial velocity in y direction
-    :param weight: weight
-    :param apply_grav: should gravity apply to this phys object
-    :return: Physics Object Created
-    """
-    _m_physObjects.append(_PhysicsObject(_type, vec2d(x, y),
-                                         vec2d(w, h),
-                                         vec2d(velx, vely),
-                                         weight,
-                                         apply_grav,
-                                         _m_grav * int(apply_grav)))
-    return _m_physObjects[-1]
-
-
-def remove_component(component: _PhysicsObject):
-    if component in _m_physObjects:
-        _m_physObjects.remove(component)
-
+""" ----------------- COLLISION RESPONSE ------------"""
 
-_m_internal_lag: float = 0
 _m_coeff_rest: float = 0.7
 _m_stable_thresh = 1
-""" -------------- ENGINE FUNCTIONS ------------"""
 
 
 def _collision_particle_particle(obj1: _PhysicsObject, obj2: _PhysicsObject) -> Optional[vec2d]:
-    pass
-
-
-def _collision_particle_plane(plane: _PhysicsObject, particle: _PhysicsObject):
+    """
+    Resolves a collision between two particles, treating each as a circle with the mean of its radii. The particles
+    are pushed apart in proportion to their inverse weights and exchange an impulse scaled by _m_coeff_rest
+    :return: point of collision or None if the particles are not touching
+    """
+    dx = obj2.pos.x - obj1.pos.x
+    dy = obj2.pos.y - obj1.pos.y
+    r1 = (obj1.dimensions.x + obj1.dimensions.y) / 2
+    r2 = (obj2.dimensions.x + obj2.dimensions.y) / 2
+    dist_sq = dx * dx + dy * dy
+    if dist_sq >= (r1 + r2) ** 2 or dist_sq == 0:
+        return None
+    inv1 = 1 / obj1.weight if obj1.weight > 0 else 0
+    inv2 = 1 / obj2.weight if obj2.weight > 0 else 0
+    inv_sum = inv1 + inv2
+    if inv_sum == 0:
+        return None
+    dist = dist_sq ** 0.5
+    nx, ny = dx / dist, dy / dist
+    # move the particles out of each other
+    correction = (r1 + r2 - dist) / inv_sum
+    obj1.pos.x -= nx * correction * inv1
+    obj1.pos.y -= ny * correction * inv1
+    obj2.pos.x += nx * correction * inv2
+    obj2.pos.y += ny * correction * inv2
+    # exchange an impulse along the collision normal if they are moving towards each other
+    closing_vel = (obj2.vel.x - obj1.vel.x) * nx + (obj2.vel.y - obj1.vel.y) * ny
+    if closing_vel < 0:
+        impulse = -(1 + _m_coeff_rest) * closing_vel / inv_sum
+        obj1.vel = vec2d(obj1.vel.x - nx * impulse * inv1, obj1.vel.y - ny * impulse * inv1)
+        obj2.vel = vec2d(obj2.vel.x + nx * impulse * inv2, obj2.vel.y + ny * impulse * inv2)
+    return vec2d(obj1.pos.x + nx * r1, obj1.pos.y + ny * r1)
+
+
+def _collision_particle_plane(plane: _PhysicsObject, particle: _PhysicsObject) -> Optional[vec2d]:
     if abs(particle.vel + plane.vel) == 0:
-        return
+        return None
     if particle.pos.x + particle.dimensions.x <= plane.pos.x or particle.pos.x - particle.dimensions.x >= plane.pos.x + plane.dimensions.x:
-        return
+        return None
     if particle.pos.y + particle.dimensions.y <= plane.pos.y or particle.pos.y - particle.dimensions.y >= plane.pos.y + plane.dimensions.y:
-        return
-    # Determine point of collision and move particle back
-    m_dir = particle.vel.to_unit()
-    factor = (plane.pos.y - particle.pos.y) / m_dir.y
-    point_of_collision = vec2d(particle.pos.x + m_dir.x * factor, plane.pos.y)
-    final_point = point_of_collision - m_dir * (particle.dimensions.x + 1)
-    particle.pos = final_point
-    new_vel = vec2d(particle.vel.x, -particle.vel.y * 0.5)
-    if particle._last_newvel:
-        print(f"New velocity: {new_vel} Last new velocity: {particle._last_newvel}")
+        return None
+    # Determine point of collision and move particle back along the direction it moved in relative to the plane
+    m_dir = (particle.vel if abs(particle.vel) else plane.vel * -1).to_unit()
+    if m_dir.y == 0:
+        # moving sideways into the plane so push it back out of the side it entered from
+        edge = plane.pos.x if m_dir.x > 0 else plane.pos.x + plane.dimensions.x
+        point_of_collision = vec2d(edge, particle.pos.y)
+        particle.pos = point_of_collision - m_dir * (particle.dimensions.x + 1)
+        new_vel = vec2d(-particle.vel.x * 0.5, particle.vel.y)
+    else:
+        # push it back out of the face it entered through, the top when moving down and the bottom when moving up
+        face = plane.pos.y if m_dir.y > 0 else plane.pos.y + plane.dimensions.y
+        factor = (face - particle.pos.y) / m_dir.y
+        point_of_collision = vec2d(particle.pos.x + m_dir.x * factor, face)
+        particle.pos = point_of_collision - m_dir * (particle.dimensions.x + 1)
+        new_vel = vec2d(particle.vel.x, -particle.vel.y * 0.5)
     if particle._last_newvel and abs(particle._last_newvel - new_vel) < _m_stable_thresh:
-        print("Culling velocity")
         new_vel = vec2d(0, 0)
     particle._last_newvel = vec2d(new_vel.x, new_vel.y)
     particle.vel = new_vel
+    return point_of_collision
 
 
 def _collision_particle_plane_i(particle: _PhysicsObject, plane: _PhysicsObject):
@@ -121,38 +118,549 @@ _COLLIDE_FUNCT = {(CollisionType.PHYS_PARTICLE, CollisionType.PHYS_PARTICLE): _c
                   (CollisionType.PHYS_PARTICLE, CollisionType.PHYS_PLANE): _collision_particle_plane_i}
 
 
-def _collision(obj1: _PhysicsObject, obj2: _PhysicsObject):
+def _physics_aabb(obj: _PhysicsObject) -> tuple:
     """
-    Simulates a collision between obj1 and obj2 at point-of-collision
-    :param obj1: Physics object being collided with
-    :param obj2: Physics object doing collision
-    :return:
+    Gets the axis aligned bounding box of a physics object
+    :param obj: physics object
+    :return: (left, top, right, bottom)
     """
-    point_of_collision = _COLLIDE_FUNCT[(obj1.obj_type, obj2.obj_type)](obj1, obj2)
-    if not point_of_collision:
-        return
-    # TODO simulate collision at point of collision
-    print(f"Collision detected at: {point_of_collision}")
-    pass
+    if obj.obj_type == CollisionType.PHYS_PLANE:
+        return obj.pos.x, obj.pos.y, obj.pos.x + obj.dimensions.x, obj.pos.y + obj.dimensions.y
+    return (obj.pos.x - obj.dimensions.x, obj.pos.y - obj.dimensions.y,
+            obj.pos.x + obj.dimensions.x, obj.pos.y + obj.dimensions.y)
 
 
-def _physics_step(elapsedtime: float) -> bool:
+def _sweep_particle_planes(particle: _PhysicsObject, planes: list, step_mult: float) -> bool:
     """
-    Steps the physics engine
-    :param elapsedtime: current lagtime of the engine
-    :return: wether the physics engine was stepped this tick
+    Continuous collision detection. Sweeps a particle's bounding box along its movement this step against every plane
+    and, if it would hit one, moves it to the time of impact and bounces it off the plane
+    :param particle: particle about to be integrated
+    :param planes: every plane in the world
+    :param step_mult: length of a physics step in seconds
+    :return: wether the particle hit a plane (and so has already been moved this step)
     """
-    global _m_internal_lag
-    _m_internal_lag += elapsedtime
-    if _m_internal_lag < _m_step_time:
+    first_hit = 2
+    hit_axis = 0
+    for plane in planes:
+        # movement relative to the plane against the plane expanded by the particle's extents
+        moves = ((particle.vel.x - plane.vel.x) * step_mult, (particle.vel.y - plane.vel.y) * step_mult)
+        starts = (particle.pos.x, particle.pos.y)
+        mins = (plane.pos.x - particle.dimensions.x, plane.pos.y - particle.dimensions.y)
+        maxs = (plane.pos.x + plane.dimensions.x + particle.dimensions.x,
+                plane.pos.y + plane.dimensions.y + particle.dimensions.y)
+        t_enter, t_exit, enter_axis = -1, 2, 0
+        for axis in (0, 1):
+            if moves[axis] == 0:
+                if starts[axis] <= mins[axis] or starts[axis] >= maxs[axis]:
+                    break
+                continue
+            t1 = (mins[axis] - starts[axis]) / moves[axis]
+            t2 = (maxs[axis] - starts[axis]) / moves[axis]
+            if t1 > t2:
+                t1, t2 = t2, t1
+            if t1 > t_enter:
+                t_enter, enter_axis = t1, axis
+            t_exit = min(t_exit, t2)
+        else:
+            # only count hits that start this step (bodies already overlapping are left to _collision)
+            if 0 <= t_enter <= t_exit and t_enter < first_hit and t_enter <= 1:
+                first_hit, hit_axis = t_enter, enter_axis
+    if first_hit > 1:
         return False
-    phys_object: _PhysicsObject
-    for phys_object in _m_physObjects:
-        phys_object.pos += phys_object.vel * _m_step_mult
-        phys_object.vel += phys_object.accel * _m_step_mult
-    for index, phys_object in enumerate(_m_physObjects):
-        for c_phys_object in _m_physObjects[index + 1::]:
-            _collision(phys_object, c_phys_object)
-
-    _m_internal_lag -= _m_step_time
+    particle.pos.x += particle.vel.x * step_mult * first_hit
+    particle.pos.y += particle.vel.y * step_mult * first_hit
+    if hit_axis == 0:
+        new_vel = vec2d(-particle.vel.x * 0.5, particle.vel.y)
+    else:
+        new_vel = vec2d(particle.vel.x, -particle.vel.y * 0.5)
+    if particle._last_newvel and abs(particle._last_newvel - new_vel) < _m_stable_thresh:
+        new_vel = vec2d(0, 0)
+    particle._last_newvel = vec2d(new_vel.x, new_vel.y)
+    particle.vel = new_vel
     return True
+
+
+_BROADPHASE_FUNCT = {BP_BRUTE_FORCE: lambda bounds, cellSize: Broadphase.pairs_brute_force(bounds),
+                     BP_GRID: Broadphase.pairs_grid,
+                     BP_SWEEP: lambda bounds, cellSize: Broadphase.pairs_sweep_and_prune(bounds)}
+
+
+""" ----------------- PHYSICS WORLDS ------------"""
+
+
+class PhysicsWorld:
+    """
+    One independent simulation. A world owns its bodies, gravity, step settings, broadphase, sleep grid and time
+    accumulator, so any number of worlds can be stepped in the same process. The module level functions act on the
+    default world (see get_world) which the engine steps every frame
+    """
+
+    def __init__(self, steps: int = 32, gravity: float = 120):
+        self.m_physics_steps: int = 32
+        self.m_step_time: float = 1e3 / self.m_physics_steps
+        self.m_step_mult: float = 1 / self.m_physics_steps
+        self.set_physics_steps(steps)
+        self.m_grav: vec2d = vec2d(0, gravity)
+
+        self.m_physObjects: list = []
+        self.m_next_uid: int = 0
+
+        self.m_broadphase: int = BP_GRID
+        self.m_cell_size: float = 64
+        self.m_pair_count: int = 0
+
+        self.m_sleep_thresh: float = 4
+        self.m_sleep_steps: int = 32
+        # spatial hash of the sleeping bodies, only updated when a body falls asleep or wakes up
+        self.m_sleep_grid: dict = {}
+
+        self.m_internal_lag: float = 0
+        self.m_max_substeps: int = 8
+
+    def __len__(self) -> int:
+        return len(self.m_physObjects)
+
+    def set_physics_steps(self, newsteps: int) -> bool:
+        """
+        Sets how many physics steps are taken per second
+        :param newsteps: steps per second
+        :return: False if the value was ignored
+        """
+        if newsteps <= 0:
+            return False
+        self.m_physics_steps = newsteps
+        self.m_step_time = 1e3 / newsteps
+        self.m_step_mult = 1 / newsteps
+        return True
+
+    def get_physics_steps(self) -> int:
+        return self.m_physics_steps
+
+    def set_gravity(self, grav: float) -> None:
+        """
+        Sets the gravity of the world, updating the acceleration of every existing body that gravity applies to (any
+        other acceleration given to them is kept) and waking them
+        :param grav: downwards acceleration
+        :return: None
+        """
+        change = grav - self.m_grav.y
+        self.m_grav = vec2d(0, grav)
+        if not change:
+            return
+        for phys_object in self.m_physObjects:
+            if phys_object.apply_grav:
+                phys_object.accel.y += change
+                # resting bodies have to start moving again under the new gravity
+                self.wake_component(phys_object)
+
+    def set_broadphase(self, broadphase: int) -> None:
+        """
+        Sets the broadphase used to find the pairs of bodies that may be colliding
+        :param broadphase: BP_BRUTE_FORCE, BP_GRID or BP_SWEEP (defined in Constants.py)
+        :return: None
+        """
+        if broadphase not in _BROADPHASE_FUNCT:
+            return
+        self.m_broadphase = broadphase
+
+    def get_broadphase(self) -> int:
+        return self.m_broadphase
+
+    def set_broadphase_cell_size(self, cellSize: float) -> None:
+        """
+        Sets the size of the cells used by the grid broadphase. Should be around the size of a typical body
+        :param cellSize: width and height of a grid cell
+        :return: None
+        """
+        if cellSize <= 0:
+            return
+        self.m_cell_size = cellSize
+        self._rebuild_sleep_grid()
+
+    def get_pair_count(self) -> int:
+        """
+        Gets the number of candidate pairs the broadphase passed on to collision testing in the last physics step
+        :return: number of pairs
+        """
+        return self.m_pair_count
+
+    def get_components(self) -> list:
+        """
+        Gets every body in the world, in creation order. The list is the world's own and must not be modified
+        :return: list of physics objects
+        """
+        return self.m_physObjects
+
+    def create_component(self, _type: CollisionType, x: float, y: float, w: float, h: float, velx: float,
+                         vely: float, weight: float, apply_grav=True, ccd=False) -> _PhysicsObject:
+        """
+        Creates physics component
+        :param _type: Type of physics component
+        :param x: initial x value (depends on type)
+        :param y: initial y value (depends on type)
+        :param w: initial width / radius in x direction
+        :param h: initial height / radius in y dimensions
+        :param velx: initial velocity in x direction
+        :param vely: initial velocity in y direction
+        :param weight: weight
+        :param apply_grav: should gravity apply to this phys object
+        :param ccd: should particles be swept against planes each step so they cannot tunnel through them when moving
+        fast
+        :return: Physics Object Created
+        """
+        component = _PhysicsObject(_type, vec2d(x, y), vec2d(w, h), vec2d(velx, vely), weight, apply_grav,
+                                   self.m_grav * int(apply_grav), prev_pos=vec2d(x, y), _uid=self.m_next_uid,
+                                   ccd=ccd)
+        self.m_next_uid += 1
+        self.m_physObjects.append(component)
+        return component
+
+    def remove_component(self, component: _PhysicsObject) -> None:
+        """
+        Removes a physics object, waking every sleeping object resting on or against it
+        :param component: physics object to remove
+        :return: None
+        """
+        if component in self.m_physObjects:
+            self.wake_component(component)
+            self.m_physObjects.remove(component)
+            self._wake_touching(_physics_aabb(component))
+
+    def _wake_touching(self, bounds: tuple) -> None:
+        """
+        Wakes every sleeping object touching a bounding box. Resting objects settle slightly apart from what they rest
+        on, so each sleeper counts as touching if it is within its own size (capped at a grid cell) of the box
+        :param bounds: (left, top, right, bottom)
+        :return: None
+        """
+        if not self.m_sleep_grid:
+            return
+        cellSize = self.m_cell_size
+        searched = (bounds[0] - cellSize, bounds[1] - cellSize, bounds[2] + cellSize, bounds[3] + cellSize)
+        touching = {}
+        for cell in self._sleep_cells(searched):
+            for sleeper in self.m_sleep_grid.get(cell, ()):
+                margin = min(max(sleeper.dimensions.x, sleeper.dimensions.y), cellSize)
+                other = sleeper._sleep_bounds
+                if bounds[0] < other[2] + margin and other[0] - margin < bounds[2] and \
+                        bounds[1] < other[3] + margin and other[1] - margin < bounds[3]:
+                    touching[sleeper._uid] = sleeper
+        for sleeper in touching.values():
+            self.wake_component(sleeper)
+
+    def clear(self) -> None:
+        """
+        Removes every body from the world and empties its time accumulator
+        :return: None
+        """
+        self.m_physObjects.clear()
+        self.m_sleep_grid.clear()
+        self.m_internal_lag = 0
+        self.m_pair_count = 0
+
+    """ ----------------- SLEEPING ------------"""
+
+    def set_sleep_threshold(self, velocity: float, steps: int) -> None:
+        """
+        Sets when bodies fall asleep. Sleeping bodies are not integrated and are only collision tested against awake
+        bodies, until a collision (or wake_component) wakes them up. The speed is measured from how far a body has
+        moved over the steps rather than its instantaneous velocity, as bodies resting on a plane keep bouncing in place
+        :param velocity: average speed a body has to stay under to fall asleep
+        :param steps: number of consecutive physics steps the body has to stay under that speed (0 disables sleeping)
+        :return: None
+        """
+        self.m_sleep_thresh = velocity
+        self.m_sleep_steps = max(steps, 0)
+        if not self.m_sleep_steps:
+            for phys_object in self.m_physObjects:
+                self.wake_component(phys_object)
+
+    def _sleep_cells(self, bounds: tuple):
+        """
+        Gets the sleep grid cells covered by a bounding box
+        :param bounds: (left, top, right, bottom)
+        :return: generator of (x, y) cells
+        """
+        cellSize = self.m_cell_size
+        for cellX in range(int(bounds[0] // cellSize), int(bounds[2] // cellSize) + 1):
+            for cellY in range(int(bounds[1] // cellSize), int(bounds[3] // cellSize) + 1):
+                yield cellX, cellY
+
+    def _put_to_sleep(self, component: _PhysicsObject) -> None:
+        component.sleeping = True
+        component.vel = vec2d(0, 0)
+        component.prev_pos = vec2d(component.pos.x, component.pos.y)
+        component._sleep_bounds = _physics_aabb(component)
+        for cell in self._sleep_cells(component._sleep_bounds):
+            self.m_sleep_grid.setdefault(cell, []).append(component)
+
+    def wake_component(self, component: _PhysicsObject) -> None:
+        """
+        Wakes a sleeping physics object. Must be called after moving or pushing a sleeping object from outside the
+        physics engine
+        :param component: physics object to wake
+        :return: None
+        """
+        component._sleep_counter = 0
+        if not component.sleeping:
+            return
+        component.sleeping = False
+        for cell in self._sleep_cells(component._sleep_bounds):
+            sleepers = self.m_sleep_grid[cell]
+            sleepers.remove(component)
+            if not sleepers:
+                del self.m_sleep_grid[cell]
+
+    def _rebuild_sleep_grid(self) -> None:
+        self.m_sleep_grid.clear()
+        for phys_object in self.m_physObjects:
+            if phys_object.sleeping:
+                for cell in self._sleep_cells(phys_object._sleep_bounds):
+                    self.m_sleep_grid.setdefault(cell, []).append(phys_object)
+
+    """ ----------------- STEPPING ------------"""
+
+    def set_max_substeps(self, maxsteps: int) -> None:
+        """
+        Sets the most physics steps that can be taken in one call to _physics_step. Any lag beyond that is dropped so
+        a slow frame cannot snowball into ever longer catch-up frames
+        :param maxsteps: maximum steps per call
+        :return: None
+        """
+        if maxsteps <= 0:
+            return
+        self.m_max_substeps = maxsteps
+
+    def get_alpha(self) -> float:
+        """
+        Gets how far between the previous and current physics state the world currently is, used to interpolate
+        rendering when frames are drawn more often than physics steps
+        :return: value between 0 and 1
+        """
+        return min(self.m_internal_lag / self.m_step_time, 1)
+
+    def get_interpolated_pos(self, component: _PhysicsObject) -> vec2d:
+        """
+        Gets the position of a physics object interpolated between its previous and current step by get_alpha
+        :param component: physics object
+        :return: interpolated position
+        """
+        alpha = self.get_alpha()
+        return vec2d(component.prev_pos.x + (component.pos.x - component.prev_pos.x) * alpha,
+                     component.prev_pos.y + (component.pos.y - component.prev_pos.y) * alpha)
+
+    def get_time_to_step(self) -> float:
+        """
+        Gets how much more time has to be added to the accumulator before the world takes its next step
+        :return: time in miliseconds
+        """
+        return self.m_step_time - self.m_internal_lag
+
+    def _collision(self, obj1: _PhysicsObject, obj2: _PhysicsObject) -> None:
+        """
+        Simulates a collision between obj1 and obj2, waking either of them if they were asleep and actually collided
+        :param obj1: Physics object being collided with
+        :param obj2: Physics object doing collision
+        :return: None
+        """
+        collide_funct = _COLLIDE_FUNCT.get((obj1.obj_type, obj2.obj_type))
+        if not collide_funct:
+            return
+        point_of_collision = collide_funct(obj1, obj2)
+        if point_of_collision is None:
+            return
+        if obj1.sleeping:
+            self.wake_component(obj1)
+        if obj2.sleeping:
+            self.wake_component(obj2)
+
+    def _physics_pairs(self, awake: list) -> list:
+        """
+        Finds the pairs of physics objects that may be colliding. The broadphase only runs over the awake objects,
+        which are then looked up in the sleep grid to find any sleeping objects they touch
+        :param awake: awake physics objects, in creation order
+        :return: (obj1, obj2) pairs ordered by creation
+        """
+        bounds = [_physics_aabb(phys_object) for phys_object in awake]
+        pairs = [(awake[i], awake[j]) for i, j in _BROADPHASE_FUNCT[self.m_broadphase](bounds, self.m_cell_size)]
+        sleep_grid = self.m_sleep_grid
+        if not sleep_grid:
+            return pairs
+        for phys_object, box in zip(awake, bounds):
+            touching = {}
+            for cell in self._sleep_cells(box):
+                for sleeper in sleep_grid.get(cell, ()):
+                    other = sleeper._sleep_bounds
+                    if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                        touching[sleeper._uid] = sleeper
+            for sleeper in touching.values():
+                pairs.append((phys_object, sleeper) if phys_object._uid < sleeper._uid else (sleeper, phys_object))
+        pairs.sort(key=lambda pair: (pair[0]._uid, pair[1]._uid))
+        return pairs
+
+    def _physics_single_step(self) -> None:
+        """
+        Advances every awake physics object by one physics step
+        :return: None
+        """
+        phys_object: _PhysicsObject
+        step_mult = self.m_step_mult
+        awake = [phys_object for phys_object in self.m_physObjects if not phys_object.sleeping]
+        planes = None
+        for phys_object in awake:
+            if phys_object.ccd and phys_object.obj_type == CollisionType.PHYS_PARTICLE:
+                if planes is None:
+                    planes = [plane for plane in self.m_physObjects if plane.obj_type == CollisionType.PHYS_PLANE]
+                if _sweep_particle_planes(phys_object, planes, step_mult):
+                    phys_object.vel.add_scaled(phys_object.accel, step_mult)
+                    continue
+            phys_object.pos.add_scaled(phys_object.vel, step_mult)
+            phys_object.vel.add_scaled(phys_object.accel, step_mult)
+        pairs = self._physics_pairs(awake)
+        self.m_pair_count = len(pairs)
+        for obj1, obj2 in pairs:
+            self._collision(obj1, obj2)
+        sleep_steps = self.m_sleep_steps
+        if not sleep_steps:
+            return
+        # distance a body moving at the sleep threshold would cover over the whole sleep window
+        max_drift_sq = (self.m_sleep_thresh * sleep_steps * step_mult) ** 2
+        for phys_object in awake:
+            if phys_object.sleeping:
+                continue
+            if not phys_object._sleep_counter:
+                phys_object._sleep_anchor = vec2d(phys_object.pos.x, phys_object.pos.y)
+            dx = phys_object.pos.x - phys_object._sleep_anchor.x
+            dy = phys_object.pos.y - phys_object._sleep_anchor.y
+            if dx * dx + dy * dy > max_drift_sq:
+                phys_object._sleep_counter = 0
+                continue
+            phys_object._sleep_counter += 1
+            if phys_object._sleep_counter >= sleep_steps:
+                self._put_to_sleep(phys_object)
+
+    def _physics_step(self, elapsedtime: float) -> int:
+        """
+        Adds the elapsed time to the physics accumulator and takes as many fixed steps as fit in it (at most
+        m_max_substeps, dropping the remaining whole steps of lag)
+        :param elapsedtime: time since the last call in miliseconds
+        :return: number of steps taken
+        """
+        self.m_internal_lag += elapsedtime
+        steps = min(int(self.m_internal_lag // self.m_step_time), self.m_max_substeps)
+        for step in range(steps):
+            if step == steps - 1:
+                for phys_object in self.m_physObjects:
+                    if not phys_object.sleeping:
+                        phys_object.prev_pos.set(phys_object.pos.x, phys_object.pos.y)
+            self._physics_single_step()
+        self.m_internal_lag -= steps * self.m_step_time
+        if self.m_internal_lag >= self.m_step_time:
+            self.m_internal_lag %= self.m_step_time
+        return steps
+
+
+def step_worlds(worlds, elapsedtime: float) -> list:
+    """
+    Advances many worlds by the same elapsed time in one call. Worlds without an awake body only have their
+    accumulator advanced, so idle worlds (finished matches, sleeping piles) cost almost nothing
+    :param worlds: iterable of PhysicsWorld
+    :param elapsedtime: time since the last call in miliseconds
+    :return: number of steps each world took, in the same order as worlds
+    """
+    taken = []
+    for world in worlds:
+        if any(not phys_object.sleeping for phys_object in world.m_physObjects):
+            taken.append(world._physics_step(elapsedtime))
+            continue
+        world.m_internal_lag += elapsedtime
+        steps = min(int(world.m_internal_lag // world.m_step_time), world.m_max_substeps)
+        world.m_internal_lag -= steps * world.m_step_time
+        if world.m_internal_lag >= world.m_step_time:
+            world.m_internal_lag %= world.m_step_time
+        if steps:
+            world.m_pair_count = 0
+        taken.append(steps)
+    return taken
+
+
+""" ----------------- DEFAULT WORLD ------------"""
+
+_m_world: PhysicsWorld = PhysicsWorld()
+
+
+def get_world() -> PhysicsWorld:
+    """
+    Gets the default world, the one the module level functions act on and the engine steps every frame
+    :return: the default PhysicsWorld
+    """
+    return _m_world
+
+
+# console variables pushing into the default world's settings whenever they are changed. The module level setters
+# go through them so the convars always hold the default world's settings
+_m_steps_var: ConVar.ConVar = ConVar.ConVar(int, "phys_steps", _m_world.m_physics_steps)
+_m_steps_var.Bind(_m_world.set_physics_steps, apply=False)
+_m_grav_var: ConVar.ConVar = ConVar.ConVar(float, "phys_gravity", float(_m_world.m_grav.y))
+_m_grav_var.Bind(_m_world.set_gravity, apply=False)
+
+
+def set_physics_steps(newsteps: int) -> bool:
+    return _m_steps_var.SetValue(newsteps)
+
+
+def set_gravity(grav: float):
+    _m_grav_var.SetValue(grav)
+
+
+def set_broadphase(broadphase: int) -> None:
+    _m_world.set_broadphase(broadphase)
+
+
+def get_broadphase() -> int:
+    return _m_world.get_broadphase()
+
+
+def set_broadphase_cell_size(cellSize: float) -> None:
+    _m_world.set_broadphase_cell_size(cellSize)
+
+
+def get_pair_count() -> int:
+    return _m_world.get_pair_count()
+
+
+def create_component(_type: CollisionType, x: float, y: float, w: float, h: float, velx: float, vely: float,
+                     weight: float, apply_grav=True, ccd=False) -> _PhysicsObject:
+    """
+    Creates physics component in the default world (see PhysicsWorld.create_component)
+    :return: Physics Object Created
+    """
+    return _m_world.create_component(_type, x, y, w, h, velx, vely, weight, apply_grav, ccd)
+
+
+def remove_component(component: _PhysicsObject):
+    _m_world.remove_component(component)
+
+
+def set_sleep_threshold(velocity: float, steps: int) -> None:
+    _m_world.set_sleep_threshold(velocity, steps)
+
+
+def wake_component(component: _PhysicsObject) -> None:
+    _m_world.wake_component(component)
+
+
+def set_max_substeps(maxsteps: int) -> None:
+    _m_world.set_max_substeps(maxsteps)
+
+
+def get_alpha() -> float:
+    return _m_world.get_alpha()
+
+
+def get_interpolated_pos(component: _PhysicsObject) -> vec2d:
+    return _m_world.get_interpolated_pos(component)
+
+
+def _physics_step(elapsedtime: float) -> int:
+    return _m_world._physics_step(elapsedtime)
@@ -0,0 +1,276 @@
+"""
+Runs a physics world in its own process so stepping it does not compete with rendering for the GIL. The worker
+publishes the position of every body into one of two buffers in a shared memory block after each step, and the render
+process reads the latest complete buffer in place. Neither side ever waits for the other: the render process marks the
+buffer it is reading, and the worker skips publishing rather than overwrite it
+"""
+import multiprocessing
+import queue
+import time
+import traceback
+from array import array
+from multiprocessing import shared_memory
+
+if __package__ is None or __package__ == '':
+    import Physics
+else:
+    from . import Physics
+
+# int64 header slots
+_HDR_FRONT = 0      # buffer holding the latest complete snapshot, -1 before the first one
+_HDR_HOLD = 1       # buffer the render process is reading, -1 if none
+_HDR_STOP = 2       # set by the render process to stop the worker
+_HDR_STEPS = 3      # physics steps taken by the worker
+_HDR_SKIPPED = 4    # snapshots not published because the back buffer was being read
+_HDR_SEQUENCE = 5   # sequence number of each buffer (2 slots)
+_HDR_COUNT = 7      # number of bodies in each buffer (2 slots)
+_HDR_SIZE = 9
+
+# float64 slots at the start of each buffer, followed by every x then every y
+_BUF_TIME = 0       # simulation time of the snapshot in miliseconds
+_BUF_ALPHA = 1      # Physics.get_alpha of the world when it was published
+_BUF_SIZE = 2
+
+
+class PhysicsSnapshot:
+    """
+    Body positions at the end of one physics step. x and y are views straight into shared memory, with body i of the
+    world (in creation order) at index i. They are only valid until PhysicsProcess.release is called
+    """
+    __slots__ = ("sequence", "count", "time", "alpha", "x", "y")
+
+    def __init__(self, sequence: int, count: int, time: float, alpha: float, x: memoryview, y: memoryview):
+        self.sequence: int = sequence
+        self.count: int = count
+        self.time: float = time
+        self.alpha: float = alpha
+        self.x: memoryview = x
+        self.y: memoryview = y
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get_pos(self, index: int) -> tuple:
+        return self.x[index], self.y[index]
+
+
+def _publish(header: memoryview, buffers: list, capacity: int, world: Physics.PhysicsWorld, sequence: int,
+             simTime: float) -> bool:
+    """
+    Writes the world's body positions into the back buffer and makes it the front buffer
+    :return: False if the back buffer was being read so nothing was published
+    """
+    front = header[_HDR_FRONT]
+    back = 1 - front if front >= 0 else 0
+    if header[_HDR_HOLD] == back:
+        header[_HDR_SKIPPED] += 1
+        return False
+    bodies = world.get_components()[:capacity]
+    count = len(bodies)
+    values = buffers[back]
+    values[_BUF_TIME] = simTime
+    values[_BUF_ALPHA] = world.get_alpha()
+    values[_BUF_SIZE:_BUF_SIZE + count] = array('d', [body.pos.x for body in bodies])
+    values[_BUF_SIZE + capacity:_BUF_SIZE + capacity + count] = array('d', [body.pos.y for body in bodies])
+    header[_HDR_COUNT + back] = count
+    header[_HDR_SEQUENCE + back] = sequence
+    header[_HDR_FRONT] = back
+    return True
+
+
+def _physics_main(build: callable, capacity: int, memory: shared_memory.SharedMemory, commands, errors) -> None:
+    """
+    Entry point of the physics process. Builds the world then steps it in real time, running commands sent by
+    PhysicsProcess.call between steps, until told to stop
+    """
+    header = memory.buf[:_HDR_SIZE * 8].cast('q')
+    data = memory.buf[_HDR_SIZE * 8:].cast('d')
+    bufferSize = _BUF_SIZE + capacity * 2
+    buffers = [data[:bufferSize], data[bufferSize:bufferSize * 2]]
+    try:
+        world = build()
+        sequence = 0
+        simTime = 0
+        _publish(header, buffers, capacity, world, sequence, simTime)
+        last = time.perf_counter()
+        while not header[_HDR_STOP]:
+            try:
+                while True:
+                    funct, args = commands.get_nowait()
+                    funct(world, *args)
+            except queue.Empty:
+                pass
+            now = time.perf_counter()
+            steps = world._physics_step((now - last) * 1e3)
+            last = now
+            if not steps:
+                time.sleep(max(world.get_time_to_step(), 0) / 1e3)
+                continue
+            header[_HDR_STEPS] += steps
+            simTime += steps * world.m_step_time
+            sequence += 1
+            _publish(header, buffers, capacity, world, sequence, simTime)
+    except Exception:
+        errors.send(traceback.format_exc())
+    finally:
+        # the block is unmapped when the process exits. It is not closed here as a forked worker also inherits the
+        # render process's views of it
+        for view in buffers + [data, header]:
+            view.release()
+
+
+class PhysicsProcess:
+    """
+    Physics world stepped in real time in a worker process. build() is called in the worker to create the world and
+    must be picklable (a module level function) when the spawn start method is used. Bodies are only known by their
+    index in the world, so create and remove them from build or from functions passed to call
+    """
+
+    def __init__(self, build: callable, capacity: int, context=None):
+        """
+        :param build: creates the PhysicsWorld in the worker process
+        :param capacity: most bodies published, bodies past it are simulated but not published
+        :param context: multiprocessing context or start method name (default: the platform default)
+        """
+        if capacity <= 0:
+            raise ValueError("PhysicsProcess needs room for at least one body")
+        if not isinstance(context, multiprocessing.context.BaseContext):
+            context = multiprocessing.get_context(context)
+        self.m_capacity: int = capacity
+        bufferSize = _BUF_SIZE + capacity * 2
+        self.m_memory = shared_memory.SharedMemory(create=True, size=(_HDR_SIZE + bufferSize * 2) * 8)
+        self.m_header = self.m_memory.buf[:_HDR_SIZE * 8].cast('q')
+        self.m_data = self.m_memory.buf[_HDR_SIZE * 8:].cast('d')
+        self.m_buffers: list = [self.m_data[:bufferSize], self.m_data[bufferSize:bufferSize * 2]]
+        self.m_header[_HDR_FRONT] = -1
+        self.m_header[_HDR_HOLD] = -1
+        self.m_commands = context.Queue()
+        self.m_errors, workerErrors = context.Pipe(duplex=False)
+        self.m_error: str = None
+        self.m_views: list = []
+        self.m_process = context.Process(target=_physics_main, name="pyengine-physics", daemon=True,
+                                         args=(build, capacity, self.m_memory, self.m_commands, workerErrors))
+        self.m_process.start()
+        workerErrors.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback) -> None:
+        self.close()
+
+    def get_capacity(self) -> int:
+        return self.m_capacity
+
+    def call(self, funct: callable, *args) -> None:
+        """
+        Runs funct(world, *args) in the physics process before its next step, e.g. to push a body or create one
+        :param funct: picklable function to run
+        :param args: picklable arguments
+        :return: None
+        """
+        self.m_commands.put((funct, args))
+
+    def get_steps(self) -> int:
+        """
+        Gets the number of physics steps the worker has taken
+        :return: number of steps
+        """
+        return self.m_header[_HDR_STEPS]
+
+    def get_skipped(self) -> int:
+        """
+        Gets how many snapshots were not published because the render process was still reading the back buffer
+        :return: number of skipped snapshots
+        """
+        return self.m_header[_HDR_SKIPPED]
+
+    def get_error(self) -> str:
+        """
+        Checks if the physics process has stopped because of an exception
+        :return: traceback of the exception, None if it is still running (or was closed without one)
+        """
+        # after close the pipe is gone, the error (if any) was read by close
+        if self.m_error is None and self.m_memory is not None and self.m_errors.poll():
+            try:
+                self.m_error = self.m_errors.recv()
+            except EOFError:
+                # the process has exited without an exception, which is only expected once it was told to stop
+                if not self.m_header[_HDR_STOP]:
+                    self.m_error = "physics process exited unexpectedly"
+        return self.m_error
+
+    def acquire(self):
+        """
+        Gets the latest complete snapshot without copying it. The worker will not write into the snapshot's buffer
+        until release is called, so release it as soon as the frame no longer needs it
+        :return: PhysicsSnapshot, None before the first snapshot is published
+        """
+        header = self.m_header
+        front = header[_HDR_FRONT]
+        if front < 0:
+            return None
+        while True:
+            header[_HDR_HOLD] = front
+            # the worker may have flipped buffers before seeing the hold, read whichever buffer is now the front
+            current = header[_HDR_FRONT]
+            if current == front:
+                break
+            front = current
+        self.release_views()
+        values = self.m_buffers[front]
+        count = header[_HDR_COUNT + front]
+        x = values[_BUF_SIZE:_BUF_SIZE + count]
+        y = values[_BUF_SIZE + self.m_capacity:_BUF_SIZE + self.m_capacity + count]
+        self.m_views = [x, y]
+        return PhysicsSnapshot(header[_HDR_SEQUENCE + front], count, values[_BUF_TIME], values[_BUF_ALPHA], x, y)
+
+    def release(self) -> None:
+        """
+        Lets the worker write into the buffer of the last acquired snapshot again
+        :return: None
+        """
+        self.m_header[_HDR_HOLD] = -1
+
+    def release_views(self) -> None:
+        """
+        Releases the memoryviews handed out by acquire, after which reading them raises ValueError
+        :return: None
+        """
+        for view in self.m_views:
+            view.release()
+        self.m_views = []
+
+    def get_positions(self) -> tuple:
+        """
+        Copies the positions out of the latest snapshot
+        :return: (x list, y list), both empty before the first snapshot
+        """
+        snapshot = self.acquire()
+        if snapshot is None:
+            return [], []
+        positions = snapshot.x.tolist(), snapshot.y.tolist()
+        self.release()
+        return positions
+
+    def close(self) -> None:
+        """
+        Stops the physics process and frees the shared memory
+        :return: None
+        """
+        if self.m_memory is None:
+            return
+        self.m_header[_HDR_STOP] = 1
+        self.m_process.join(5)
+        if self.m_process.is_alive():
+            self.m_process.terminate()
+            self.m_process.join()
+        self.get_error()
+        self.m_commands.close()
+        self.m_errors.close()
+        self.release_views()
+        for view in self.m_buffers + [self.m_data, self.m_header]:
+            view.release()
+        self.m_memory.close()
+        self.m_memory.unlink()
+        self.m_memory = None
@@ -0,0 +1,191 @@
+"""
+Frame time profiler. The engine marks the end of each part of a frame and the time since the previous mark is charged
+to that part, so every part of a frame is timed without nesting timers
+"""
+import math
+import time
+from array import array
+
+PROF_INPUT = "input"
+PROF_STEP = "step"
+PROF_SYSTEMS = "systems"
+PROF_PHYSICS = "physics"
+PROF_DRAW = "draw"
+PROF_PRESENT = "present"
+
+PROF_SECTIONS = (PROF_INPUT, PROF_STEP, PROF_SYSTEMS, PROF_PHYSICS, PROF_DRAW, PROF_PRESENT)
+
+
+def _percentile(ordered: list, percent: float) -> float:
+    """
+    Nearest rank percentile of an already sorted list
+    :param ordered: sorted values
+    :param percent: percentile to get (0 - 100)
+    :return: the percentile, 0 if there are no values
+    """
+    if not ordered:
+        return 0
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Profiler:
+    """
+    Keeps the last capacity frames of timings (in miliseconds) for every section and every system in ring buffers.
+    All buffers share one write index so the same slot of each buffer describes the same frame
+    """
+
+    def __init__(self, capacity: int = 240):
+        self.enabled: bool = False
+        self.m_capacity: int = max(capacity, 1)
+        self.m_index: int = 0
+        self.m_count: int = 0
+        self.m_frames: array = array('d')
+        self.m_sections: dict = {}
+        self.m_systems: dict = {}
+        self.m_current: dict = {}
+        self.m_currentSystems: dict = {}
+        self.m_frameStart: float = 0
+        self.m_last: float = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears every recorded frame
+        :return: None
+        """
+        self.m_index = 0
+        self.m_count = 0
+        self.m_frames = array('d', bytes(8 * self.m_capacity))
+        self.m_sections = {section: array('d', bytes(8 * self.m_capacity)) for section in PROF_SECTIONS}
+        self.m_systems = {}
+        self.m_current = dict.fromkeys(PROF_SECTIONS, 0.0)
+        self.m_currentSystems = {}
+
+    def set_capacity(self, capacity: int) -> None:
+        """
+        Sets how many frames are kept, clearing the recorded frames
+        :param capacity: number of frames
+        :return: None
+        """
+        if capacity <= 0:
+            return
+        self.m_capacity = capacity
+        self.reset()
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        self.m_frameStart = self.m_last = time.perf_counter()
+
+    def mark(self, section: str) -> None:
+        """
+        Charges the time since the previous mark to a section of the current frame
+        :param section: one of the PROF_ sections
+        :return: None
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.m_current[section] += (now - self.m_last) * 1e3
+        self.m_last = now
+
+    def record_system(self, name: str, elapsed: float) -> None:
+        """
+        Adds time spent in a system to the current frame. The time is also part of the systems section, which is
+        charged separately with mark as systems may run in parallel
+        :param name: name the system was added with
+        :param elapsed: time in miliseconds
+        :return: None
+        """
+        if not self.enabled:
+            return
+        self.m_currentSystems[name] = self.m_currentSystems.get(name, 0) + elapsed
+
+    def discard_frame(self) -> None:
+        """
+        Throws away the timings of the current frame, used for frames that are skipped without being drawn
+        :return: None
+        """
+        if not self.enabled:
+            return
+        for section in self.m_current:
+            self.m_current[section] = 0.0
+        self.m_currentSystems.clear()
+
+    def end_frame(self) -> None:
+        """
+        Stores the current frame's timings in the ring buffers
+        :return: None
+        """
+        if not self.enabled:
+            return
+        index = self.m_index
+        self.m_frames[index] = (time.perf_counter() - self.m_frameStart) * 1e3
+        current = self.m_current
+        for section, buffer in self.m_sections.items():
+            buffer[index] = current[section]
+            current[section] = 0.0
+        for name in self.m_currentSystems.keys() - self.m_systems.keys():
+            self.m_systems[name] = array('d', bytes(8 * self.m_capacity))
+        for name, buffer in self.m_systems.items():
+            buffer[index] = self.m_currentSystems.get(name, 0)
+        self.m_currentSystems.clear()
+        self.m_index = (index + 1) % self.m_capacity
+        self.m_count = min(self.m_count + 1, self.m_capacity)
+
+    def _recorded(self, buffer: array) -> list:
+        """
+        Gets the recorded values of a ring buffer from oldest to newest
+        :param buffer: ring buffer to read
+        :return: list of values
+        """
+        if self.m_count < self.m_capacity:
+            return buffer[:self.m_count].tolist()
+        return buffer[self.m_index:].tolist() + buffer[:self.m_index].tolist()
+
+    def get_history(self, section: str = None) -> list:
+        """
+        Gets the recorded timings of a section, or of whole frames, from oldest to newest
+        :param section: PROF_ section or system name, None for whole frames
+        :return: list of timings in miliseconds
+        """
+        if section is None:
+            return self._recorded(self.m_frames)
+        buffer = self.m_sections.get(section, self.m_systems.get(section))
+        return self._recorded(buffer) if buffer is not None else []
+
+    @staticmethod
+    def _summarise(values: list) -> dict:
+        ordered = sorted(values)
+        return {
+            "mean": sum(ordered) / len(ordered) if ordered else 0,
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "p99": _percentile(ordered, 99),
+            "worst": ordered[-1] if ordered else 0
+        }
+
+    def get_stats(self) -> dict:
+        """
+        Summarises the recorded frames. Every timing is in miliseconds
+        :return: dict with the number of frames, a summary of whole frames, a summary of each section and system, and
+        the breakdown of the slowest recorded frame
+        """
+        frames = self._recorded(self.m_frames)
+        worst = {}
+        if frames:
+            slot = (self.m_index - self.m_count + frames.index(max(frames))) % self.m_capacity
+            worst = {
+                "frame": self.m_frames[slot],
+                "sections": {section: buffer[slot] for section, buffer in self.m_sections.items()},
+                "systems": {name: buffer[slot] for name, buffer in self.m_systems.items()}
+            }
+        return {
+            "frames": self.m_count,
+            "frame": self._summarise(frames),
+            "sections": {section: self._summarise(self._recorded(buffer))
+                         for section, buffer in self.m_sections.items()},
+            "systems": {name: self._summarise(self._recorded(buffer)) for name, buffer in self.m_systems.items()},
+            "worst_frame": worst
+        }
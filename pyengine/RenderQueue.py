@@ -0,0 +1,183 @@
+"""
+Array-backed command buffer that the engine queues draw calls into between frames
+"""
+from array import array
+
+
+def _column(typecode: str, values, count: int) -> array:
+    """
+    Turns a single value or a sequence of values into an array that can be slice assigned into a column
+    :param typecode: typecode of the column
+    :param values: one value used for every command, or one value per command
+    :param count: number of commands
+    :return: array of count values
+    """
+    if isinstance(values, (int, float)) or values is None:
+        return array(typecode, [values or 0]) * count
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    return array(typecode, values)
+
+
+def _list_column(values, count: int, isSingle: bool) -> list:
+    return [values] * count if isSingle else list(values)
+
+
+class RenderQueue:
+    """
+    Stores render commands as parallel arrays (struct-of-arrays) instead of one object per draw call.
+    The buffer is reset rather than reallocated every frame and only grows when a frame issues more
+    commands than any frame before it
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.count: int = 0
+        self.capacity: int = 0
+        self.layered: bool = False
+        self.staticMode: bool = False
+        self.staticCount: int = 0
+        self.staticHash: int = 0
+        self.x: array = array('d')
+        self.y: array = array('d')
+        self.w: array = array('d')
+        self.h: array = array('d')
+        self.oWidth: array = array('i')
+        self.layer: array = array('i')
+        self.shouldCache: array = array('b')
+        self.shouldAffect: array = array('b')
+        self.isStatic: array = array('b')
+        self.rType: list = []
+        self.path: list = []
+        self.col: list = []
+        self.oCol: list = []
+        self._grow(max(capacity, 1))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _grow(self, newCapacity: int) -> None:
+        """
+        Extends every column of the buffer to hold newCapacity commands
+        :param newCapacity: total number of commands the buffer should be able to hold
+        :return: None
+        """
+        extra = newCapacity - self.capacity
+        if extra <= 0:
+            return
+        for column in (self.x, self.y, self.w, self.h):
+            column.extend(array('d', bytes(8 * extra)))
+        self.oWidth.extend(array('i', bytes(self.oWidth.itemsize * extra)))
+        self.layer.extend(array('i', bytes(self.layer.itemsize * extra)))
+        self.shouldCache.extend(array('b', bytes(extra)))
+        self.shouldAffect.extend(array('b', bytes(extra)))
+        self.isStatic.extend(array('b', bytes(extra)))
+        for column in (self.rType, self.path, self.col, self.oCol):
+            column.extend([None] * extra)
+        self.capacity = newCapacity
+
+    def push(self, x: float, y: float, w: int, h: int, rType: str, path: str = None, col: tuple = None,
+             oCol: tuple = (0, 0, 0), oWidth: int = 0, shouldCache: bool = True, shouldAffect: bool = True,
+             layer: int = 0, isStatic: bool = False) -> int:
+        """
+        Appends a render command to the buffer: its bounds, render type, texture path, colours, outline width,
+        caching and dirty region flags and draw layer. Commands pushed while the queue is in static mode are always
+        static
+        :return: index of the command within the buffer
+        """
+        index = self.count
+        if index == self.capacity:
+            self._grow(self.capacity * 2)
+        self.x[index] = x
+        self.y[index] = y
+        self.w[index] = w or 0
+        self.h[index] = h or 0
+        self.rType[index] = rType
+        self.path[index] = path
+        self.col[index] = col
+        self.oCol[index] = oCol
+        self.oWidth[index] = oWidth
+        self.shouldCache[index] = shouldCache
+        self.shouldAffect[index] = shouldAffect
+        self.layer[index] = layer
+        if layer:
+            self.layered = True
+        isStatic = isStatic or self.staticMode
+        self.isStatic[index] = isStatic
+        if isStatic:
+            self.staticCount += 1
+            self.staticHash = hash((self.staticHash, x, y, w, h, rType, path, col, oCol, oWidth, layer))
+        self.count = index + 1
+        return index
+
+    def push_many(self, x, y, w, h, rType: str, path: str = None, col=None, oCol: tuple = (0, 0, 0),
+                  oWidth: int = 0, shouldCache: bool = True, shouldAffect: bool = True, layer: int = 0,
+                  isStatic: bool = False) -> range:
+        """
+        Appends many render commands of one render type at once, copying whole columns instead of pushing each
+        command separately
+        :param x: x coordinate of every command
+        :param y: y coordinate of every command
+        :param w: one width for every command or a width per command
+        :param h: one height for every command or a height per command
+        :param col: one colour for every command or a colour per command
+        :return: indices of the commands within the buffer
+        """
+        count = len(x)
+        start = self.count
+        end = start + count
+        if not count:
+            return range(start, end)
+        if end > self.capacity:
+            self._grow(max(self.capacity * 2, end))
+        self.x[start:end] = _column('d', x, count)
+        self.y[start:end] = _column('d', y, count)
+        self.w[start:end] = _column('d', w, count)
+        self.h[start:end] = _column('d', h, count)
+        self.oWidth[start:end] = _column('i', oWidth, count)
+        self.layer[start:end] = _column('i', layer, count)
+        self.shouldCache[start:end] = _column('b', int(shouldCache), count)
+        self.shouldAffect[start:end] = _column('b', int(shouldAffect), count)
+        self.rType[start:end] = [rType] * count
+        self.path[start:end] = [path] * count
+        self.col[start:end] = _list_column(col, count, col is None or isinstance(col[0], int))
+        self.oCol[start:end] = [oCol] * count
+        if layer:
+            self.layered = True
+        isStatic = isStatic or self.staticMode
+        self.isStatic[start:end] = _column('b', int(isStatic), count)
+        if isStatic and count:
+            self.staticCount += count
+            self.staticHash = hash((self.staticHash, self.x[start:end].tobytes(), self.y[start:end].tobytes(),
+                                    self.w[start:end].tobytes(), self.h[start:end].tobytes(), rType, path,
+                                    tuple(self.col[start:end]), oCol, oWidth, layer))
+        self.count = end
+        return range(start, end)
+
+    def reset(self) -> None:
+        """
+        Empties the buffer while keeping its storage for the next frame
+        :return: None
+        """
+        self.count = 0
+        self.layered = False
+        self.staticCount = 0
+        self.staticHash = 0
+
+    def draw_order(self):
+        """
+        Gets the order the queued commands should be drawn in. Commands are drawn by ascending layer and, within a
+        layer, in the order they were queued
+        :return: sequence of command indices
+        """
+        if not self.layered:
+            return range(self.count)
+        return sorted(range(self.count), key=self.layer.__getitem__)
+
+    def split_static(self, order) -> tuple:
+        """
+        Splits a draw order into its static and dynamic commands, keeping the relative order of each
+        :param order: indices of the commands in the order they should be drawn
+        :return: (static indices, dynamic indices)
+        """
+        isStatic = self.isStatic
+        return [index for index in order if isStatic[index]], [index for index in order if not isStatic[index]]
@@ -6,9 +6,13 @@ class Scene:
     def __init__(self):
         if __package__ is None or __package__ == '':
             import Engine
+            from EntityStore import EntityStore
         else:
             from . import Engine
+            from .EntityStore import EntityStore
         self.engine = Engine
+        # entities of the scene, drawn in bulk with engine.draw_entities(self.entities)
+        self.entities = EntityStore()
         self.engine.add_key_callback(self.on_key_event)
         self.engine.add_mouse_callback(self.on_mouse_event)
 
@@ -26,6 +30,20 @@ class Scene:
         """
         self.engine._raise_engine_error("step_scene must be implemented by all scenes")
 
+    def on_enter(self):
+        """
+        Called when the engine switches to this scene
+        :return:
+        """
+        pass
+
+    def on_exit(self):
+        """
+        Called when the engine switches away from this scene, release anything only needed while the scene is shown
+        :return:
+        """
+        pass
+
     def on_key_event(self, event: pygame.event.Event):
         pass
 
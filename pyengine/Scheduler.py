@@ -0,0 +1,202 @@
+"""
+Runs the systems added to the engine in dependency order, running systems that do not depend on each other at the same
+time on a thread pool
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class _System:
+    __slots__ = ("name", "update", "render", "after", "reads", "writes", "index", "time", "renderTime")
+
+    def __init__(self, name: str, update: callable, render: callable, after: tuple, reads: frozenset,
+                 writes: frozenset, index: int):
+        self.name: str = name
+        self.update: callable = update
+        self.render: callable = render
+        self.after: tuple = after
+        self.reads: frozenset = reads
+        self.writes: frozenset = writes
+        self.index: int = index
+        # time taken by the last update and render in miliseconds
+        self.time: float = 0
+        self.renderTime: float = 0
+
+    def conflicts(self, other) -> bool:
+        """
+        Checks if two systems cannot run at the same time because one writes a resource the other uses
+        :param other: system to check against
+        :return: True if they conflict
+        """
+        return bool(self.writes & (other.reads | other.writes) or other.writes & self.reads)
+
+
+class SystemScheduler:
+    """
+    Systems declare the systems they run after and the resources (any hashable names) they read and write. Systems
+    that write a resource another system reads or writes never run at the same time, and run in the order they were
+    added unless an after declaration says otherwise. Update callbacks may run on worker threads, render callbacks
+    always run on the calling thread as the render queue is not thread safe
+    """
+
+    def __init__(self, threads: int = 0):
+        self.m_systems: dict = {}
+        self.m_nextIndex: int = 0
+        # execution graph, rebuilt when systems are added or removed
+        self.m_order: list = []
+        self.m_dependents: dict = {}
+        self.m_dependencyCounts: dict = {}
+        self.m_dirty: bool = False
+        self.m_threads: int = 0
+        self.m_pool = None
+        self.set_threads(threads)
+
+    def set_threads(self, threads: int) -> None:
+        """
+        Sets how many worker threads run system updates
+        :param threads: number of threads, 0 or 1 runs every system on the calling thread
+        :return: None
+        """
+        threads = max(threads, 0)
+        if threads == self.m_threads:
+            return
+        if self.m_pool:
+            self.m_pool.shutdown()
+            self.m_pool = None
+        self.m_threads = threads
+        if threads > 1:
+            self.m_pool = ThreadPoolExecutor(threads, thread_name_prefix="pyengine-system")
+
+    def get_threads(self) -> int:
+        return self.m_threads
+
+    def add(self, name: str, update: callable, render: callable, after=(), reads=(), writes=()) -> None:
+        """
+        Adds a system
+        :param name: unique name of the system
+        :param update: called every tick
+        :param render: called every frame
+        :param after: names of systems that must finish updating before this one starts, names of systems that do not
+        exist are ignored
+        :param reads: resources the update reads
+        :param writes: resources the update writes
+        :return: None
+        """
+        if name in self.m_systems:
+            raise ValueError(f"A system named {name} already exists")
+        self.m_systems[name] = _System(name, update, render, tuple(after), frozenset(reads), frozenset(writes),
+                                       self.m_nextIndex)
+        self.m_nextIndex += 1
+        self.m_dirty = True
+        try:
+            self._build()
+        except ValueError:
+            del self.m_systems[name]
+            self._build()
+            raise
+
+    def remove(self, name: str) -> bool:
+        """
+        Removes a system
+        :param name: name of the system
+        :return: False if there is no system with that name
+        """
+        if self.m_systems.pop(name, None) is None:
+            return False
+        self.m_dirty = True
+        return True
+
+    def _build(self) -> None:
+        """
+        Builds the execution graph. The after declarations are sorted topologically, keeping the order systems were
+        added in where they allow it, then every pair of conflicting systems is ordered the same way
+        :return: None
+        """
+        systems = self.m_systems
+        dependencies = {name: {other for other in system.after if other in systems}
+                        for name, system in systems.items()}
+        remaining = {name: len(deps) for name, deps in dependencies.items()}
+        waiting = {name: [] for name in systems}
+        for name, deps in dependencies.items():
+            for other in deps:
+                waiting[other].append(name)
+        ready = sorted((name for name, count in remaining.items() if not count), key=lambda n: systems[n].index)
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in waiting[name]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    ready.append(dependent)
+            ready.sort(key=lambda n: systems[n].index)
+        if len(order) != len(systems):
+            cycle = sorted(name for name, count in remaining.items() if count)
+            raise ValueError(f"Systems {', '.join(cycle)} depend on each other")
+
+        for position, name in enumerate(order):
+            system = systems[name]
+            for earlier in order[:position]:
+                if system.conflicts(systems[earlier]):
+                    dependencies[name].add(earlier)
+        self.m_order = order
+        self.m_dependents = {name: [] for name in systems}
+        for name, deps in dependencies.items():
+            for other in deps:
+                self.m_dependents[other].append(name)
+        self.m_dependencyCounts = {name: len(deps) for name, deps in dependencies.items()}
+        self.m_dirty = False
+
+    def _run_system(self, system: _System) -> None:
+        start = time.perf_counter()
+        system.update()
+        system.time = (time.perf_counter() - start) * 1e3
+
+    def update(self) -> None:
+        """
+        Runs the update of every system, in parallel where the execution graph and thread count allow it
+        :return: None
+        """
+        if self.m_dirty:
+            self._build()
+        systems = self.m_systems
+        if not self.m_pool or len(systems) < 2:
+            for name in self.m_order:
+                self._run_system(systems[name])
+            return
+        remaining = dict(self.m_dependencyCounts)
+        running = {self.m_pool.submit(self._run_system, systems[name]): name
+                   for name in self.m_order if not remaining[name]}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                # re-raises any exception from the system's update
+                future.result()
+                for dependent in self.m_dependents[name]:
+                    remaining[dependent] -= 1
+                    if not remaining[dependent]:
+                        running[self.m_pool.submit(self._run_system, systems[dependent])] = dependent
+
+    def render(self) -> None:
+        """
+        Runs the render of every system on the calling thread, in the same order as updates
+        :return: None
+        """
+        if self.m_dirty:
+            self._build()
+        for name in self.m_order:
+            system = self.m_systems[name]
+            start = time.perf_counter()
+            system.render()
+            system.renderTime = (time.perf_counter() - start) * 1e3
+
+    def get_times(self, render: bool = False) -> dict:
+        """
+        Gets how long the last update or render of each system took
+        :param render: get render times instead of update times
+        :return: dict of system name to time in miliseconds
+        """
+        if render:
+            return {name: system.renderTime for name, system in self.m_systems.items()}
+        return {name: system.time for name, system in self.m_systems.items()}
@@ -0,0 +1,273 @@
+"""
+Runs many independent simulations across worker processes. Each worker builds its own share (shard) of the
+simulations once and keeps them for its whole life, so body state never crosses a process boundary. Per simulation
+results and per shard timings are written into one shared memory block that the runner reads directly
+"""
+import multiprocessing
+import time
+import traceback
+from array import array
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+
+if __package__ is None or __package__ == '':
+    import Physics
+else:
+    from . import Physics
+
+# doubles stored for each shard after the results: build time, time spent stepping in the last run (both in
+# miliseconds), total ticks taken and number of simulations
+_SHARD_FIELDS = 4
+_SHARD_BUILD, _SHARD_STEP, _SHARD_TICKS, _SHARD_COUNT = range(_SHARD_FIELDS)
+
+
+def summarise_world(world: Physics.PhysicsWorld) -> tuple:
+    """
+    Default result of a physics world
+    :param world: world to summarise
+    :return: (number of bodies, number of awake bodies, broadphase pairs in the last step)
+    """
+    bodies = world.get_components()
+    return len(bodies), sum(not body.sleeping for body in bodies), world.get_pair_count()
+
+
+def _step_shard(worlds: list, scenes: list, tickTime: float) -> None:
+    Physics.step_worlds(worlds, tickTime)
+    for scene in scenes:
+        scene.step_scene()
+
+
+def _collect_shard(values, simulations: list, start: int, collect: callable, resultSize: int) -> None:
+    for index, simulation in enumerate(simulations, start):
+        result = collect(simulation) if collect else summarise_world(simulation)
+        result = array('d', result)[:resultSize]
+        if len(result) < resultSize:
+            # pad short results so no values are left over from a longer one
+            result.extend(array('d', bytes(8 * (resultSize - len(result)))))
+        offset = index * resultSize
+        values[offset:offset + resultSize] = result
+
+
+def _shard_main(shard: int, start: int, stop: int, build: callable, collect: callable, resultSize: int,
+                statsOffset: int, memory: shared_memory.SharedMemory, barrier, connection) -> None:
+    """
+    Entry point of a worker process. Builds the simulations of one shard then runs commands sent by the runner until
+    told to stop
+    """
+    values = memory.buf.cast('d')
+    stats = statsOffset + shard * _SHARD_FIELDS
+    try:
+        try:
+            buildStart = time.perf_counter()
+            simulations = [build(index) for index in range(start, stop)]
+            values[stats + _SHARD_BUILD] = (time.perf_counter() - buildStart) * 1e3
+            values[stats + _SHARD_COUNT] = len(simulations)
+            worlds = [simulation for simulation in simulations if isinstance(simulation, Physics.PhysicsWorld)]
+            scenes = [simulation for simulation in simulations if not isinstance(simulation, Physics.PhysicsWorld)]
+            _collect_shard(values, simulations, start, collect, resultSize)
+            connection.send(("ready",))
+        except Exception:
+            connection.send(("error", traceback.format_exc()))
+            return
+        while True:
+            command = connection.recv()
+            if command is None:
+                return
+            ticks, tickTime, lockstep, collectEvery = command
+            try:
+                elapsed = 0
+                for tick in range(ticks):
+                    stepStart = time.perf_counter()
+                    _step_shard(worlds, scenes, tickTime)
+                    elapsed += time.perf_counter() - stepStart
+                    if lockstep:
+                        if collectEvery:
+                            _collect_shard(values, simulations, start, collect, resultSize)
+                        # every shard has finished the tick, then wait for the runner to read the results
+                        barrier.wait()
+                        barrier.wait()
+                values[stats + _SHARD_STEP] = elapsed * 1e3
+                values[stats + _SHARD_TICKS] += ticks
+                _collect_shard(values, simulations, start, collect, resultSize)
+                connection.send(("done",))
+            except BrokenBarrierError:
+                connection.send(("error", "another shard failed"))
+            except Exception:
+                barrier.abort()
+                connection.send(("error", traceback.format_exc()))
+    finally:
+        # the block is unmapped when the process exits. It is not closed here as a forked worker also inherits the
+        # runner's own view of it
+        values.release()
+
+
+class ShardRunner:
+    """
+    Splits count simulations into contiguous shards, one per worker process. build(index) is called in the worker to
+    create simulation index and must return a Physics.PhysicsWorld or an object with a step_scene() method (such as a
+    Scene that owns its own PhysicsWorld). Physics worlds are stepped together with Physics.step_worlds.
+    build and collect must be picklable (module level functions) when the spawn start method is used
+    """
+
+    def __init__(self, build: callable, count: int, shards: int = None, resultSize: int = 3, collect: callable = None,
+                 context=None):
+        """
+        :param build: creates simulation index in the worker process
+        :param count: number of simulations
+        :param shards: number of worker processes (default: one per cpu, at most count)
+        :param resultSize: number of floats stored for each simulation
+        :param collect: collect(simulation) returns up to resultSize floats describing it. Default: summarise_world
+        :param context: multiprocessing context or start method name (default: the platform default)
+        """
+        if count <= 0 or resultSize <= 0:
+            raise ValueError("ShardRunner needs at least one simulation and one result per simulation")
+        if not isinstance(context, multiprocessing.context.BaseContext):
+            context = multiprocessing.get_context(context)
+        self.m_count: int = count
+        self.m_shards: int = max(min(shards or multiprocessing.cpu_count(), count), 1)
+        self.m_resultSize: int = resultSize
+        self.m_statsOffset: int = count * resultSize
+        self.m_memory = shared_memory.SharedMemory(create=True,
+                                                   size=(self.m_statsOffset + self.m_shards * _SHARD_FIELDS) * 8)
+        self.m_values = self.m_memory.buf.cast('d')
+        self.m_barrier = context.Barrier(self.m_shards + 1)
+        self.m_connections: list = []
+        self.m_processes: list = []
+        self.m_ranges: list = []
+        for shard in range(self.m_shards):
+            start = shard * count // self.m_shards
+            stop = (shard + 1) * count // self.m_shards
+            connection, workerConnection = context.Pipe()
+            process = context.Process(target=_shard_main, name=f"pyengine-shard-{shard}", daemon=True,
+                                      args=(shard, start, stop, build, collect, resultSize, self.m_statsOffset,
+                                            self.m_memory, self.m_barrier, workerConnection))
+            process.start()
+            workerConnection.close()
+            self.m_connections.append(connection)
+            self.m_processes.append(process)
+            self.m_ranges.append(range(start, stop))
+        self._wait_for("ready")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback) -> None:
+        self.close()
+
+    def get_shards(self) -> int:
+        return self.m_shards
+
+    def _wait_for(self, reply: str) -> None:
+        """
+        Waits for every shard to send a reply, closing the runner and raising if any of them failed
+        :param reply: reply expected from every shard
+        :return: None
+        """
+        errors = []
+        for shard, connection in enumerate(self.m_connections):
+            try:
+                message = connection.recv()
+            except EOFError:
+                message = ("error", "worker process exited")
+            if message[0] != reply:
+                errors.append(f"shard {shard}: {message[1]}")
+        if errors:
+            self.close()
+            raise RuntimeError("Simulation shards failed\n" + "\n".join(errors))
+
+    def run(self, ticks: int, tickTime: float = 1e3 / 60, lockstep: bool = False, onTick: callable = None) -> dict:
+        """
+        Advances every simulation by a number of ticks. Independent shards run all their ticks without waiting for
+        each other, lockstep shards all finish a tick before any of them starts the next one
+        :param ticks: number of ticks
+        :param tickTime: time added to each physics world per tick in miliseconds
+        :param lockstep: keep the shards on the same tick
+        :param onTick: only used in lockstep, onTick(runner, tick) is called after every tick while the shards wait,
+        with get_results showing the state at the end of that tick
+        :return: dict with the wall time of the run and each shard's stepping time (both in miliseconds) and the
+        number of simulation ticks per second across all shards
+        """
+        if not self.m_processes:
+            raise RuntimeError("ShardRunner has been closed")
+        start = time.perf_counter()
+        for connection in self.m_connections:
+            connection.send((ticks, tickTime, lockstep, onTick is not None))
+        if lockstep:
+            try:
+                for tick in range(ticks):
+                    self.m_barrier.wait()
+                    if onTick:
+                        onTick(self, tick)
+                    self.m_barrier.wait()
+            except BrokenBarrierError:
+                pass
+            except BaseException:
+                self.m_barrier.abort()
+                self.close()
+                raise
+        self._wait_for("done")
+        wall = (time.perf_counter() - start) * 1e3
+        return {
+            "time": wall,
+            "shards": [self.m_values[self._stat(shard, _SHARD_STEP)] for shard in range(self.m_shards)],
+            "ticks_per_second": self.m_count * ticks / wall * 1e3 if wall else 0
+        }
+
+    def _stat(self, shard: int, field: int) -> int:
+        return self.m_statsOffset + shard * _SHARD_FIELDS + field
+
+    def get_result(self, index: int) -> tuple:
+        """
+        Gets the result of one simulation, as of the end of the last run (or tick when called from onTick)
+        :param index: simulation index
+        :return: tuple of resultSize floats
+        """
+        offset = index * self.m_resultSize
+        return tuple(self.m_values[offset:offset + self.m_resultSize])
+
+    def get_results(self) -> list:
+        """
+        Gets the result of every simulation
+        :return: list of tuples of resultSize floats, in simulation order
+        """
+        values = self.m_values[:self.m_statsOffset].tolist()
+        size = self.m_resultSize
+        return [tuple(values[offset:offset + size]) for offset in range(0, self.m_statsOffset, size)]
+
+    def get_shard_stats(self) -> list:
+        """
+        Gets the timings of every shard
+        :return: list of dicts with the simulation range, build and last run stepping time in miliseconds and the
+        total ticks taken
+        """
+        return [{
+            "simulations": self.m_ranges[shard],
+            "build": self.m_values[self._stat(shard, _SHARD_BUILD)],
+            "step": self.m_values[self._stat(shard, _SHARD_STEP)],
+            "ticks": int(self.m_values[self._stat(shard, _SHARD_TICKS)])
+        } for shard in range(self.m_shards)]
+
+    def close(self) -> None:
+        """
+        Stops the worker processes and frees the shared memory. The results can not be read after closing
+        :return: None
+        """
+        if not self.m_processes:
+            return
+        for connection in self.m_connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.m_processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for connection in self.m_connections:
+            connection.close()
+        self.m_processes = []
+        self.m_connections = []
+        self.m_values.release()
+        self.m_memory.close()
+        self.m_memory.unlink()
@@ -0,0 +1,113 @@
+"""
+Least-recently-used cache of scaled texture surfaces, bounded by a memory budget
+"""
+from collections import OrderedDict
+
+
+class TextureCache:
+    """
+    Caches surfaces keyed by (texture ID, size). Once the cached surfaces would take up more than the byte budget the
+    least recently drawn entries are evicted
+    """
+
+    def __init__(self, budget: int = 64 * 1024 * 1024):
+        self.m_budget: int = budget
+        self.m_size: int = 0
+        self.m_entries: OrderedDict = OrderedDict()
+        self.m_textureKeys: dict = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    @staticmethod
+    def _surface_bytes(surface) -> int:
+        """
+        Gets the amount of memory used by the pixels of a surface
+        :param surface: surface to measure
+        :return: size in bytes
+        """
+        return surface.get_pitch() * surface.get_height()
+
+    def get(self, texID: str, size: tuple):
+        """
+        Looks up a cached surface, marking it as the most recently used entry
+        :param texID: ID of the texture the surface was scaled from
+        :param size: (w, h) the texture was scaled to
+        :return: the cached surface or None on a miss
+        """
+        key = (texID, size)
+        surface = self.m_entries.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.m_entries.move_to_end(key)
+        self.hits += 1
+        return surface
+
+    def put(self, texID: str, size: tuple, surface) -> None:
+        """
+        Stores a scaled surface, evicting old entries until it fits in the budget. Surfaces larger than the whole
+        budget are not stored
+        :param texID: ID of the texture the surface was scaled from
+        :param size: (w, h) the texture was scaled to
+        :param surface: the scaled surface
+        :return: None
+        """
+        surfaceBytes = TextureCache._surface_bytes(surface)
+        if surfaceBytes > self.m_budget:
+            return
+        key = (texID, size)
+        if key in self.m_entries:
+            self._remove(key)
+        self.m_entries[key] = surface
+        self.m_textureKeys.setdefault(texID, set()).add(key)
+        self.m_size += surfaceBytes
+        self._evict()
+
+    def _remove(self, key: tuple) -> None:
+        surface = self.m_entries.pop(key)
+        self.m_size -= TextureCache._surface_bytes(surface)
+        keys = self.m_textureKeys[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self.m_textureKeys[key[0]]
+
+    def _evict(self) -> None:
+        """
+        Evicts least recently used entries until the cache is within its budget
+        :return: None
+        """
+        while self.m_size > self.m_budget and self.m_entries:
+            self._remove(next(iter(self.m_entries)))
+            self.evictions += 1
+
+    def invalidate(self, texID: str) -> None:
+        """
+        Removes every scaled copy of a texture from the cache
+        :param texID: ID of the texture that has changed or been removed
+        :return: None
+        """
+        for key in list(self.m_textureKeys.get(texID, ())):
+            self._remove(key)
+
+    def clear(self) -> None:
+        self.m_entries.clear()
+        self.m_textureKeys.clear()
+        self.m_size = 0
+
+    def set_budget(self, budget: int) -> None:
+        """
+        Sets the maximum number of bytes the cached surfaces may use
+        :param budget: new budget in bytes
+        :return: None
+        """
+        self.m_budget = max(budget, 0)
+        self._evict()
+
+    def get_stats(self) -> dict:
+        """
+        Gets the cache counters
+        :return: dict containing the hits, misses, evictions, entries, bytes used and byte budget of the cache
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.m_entries), "bytes": self.m_size, "budget": self.m_budget}
@@ -1,12 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from array import array
+from itertools import repeat
+from operator import add, mul
 import math
 
 
-@dataclass()
 class vec2d:
-    x: float = 0
-    y: float = 0
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float = 0, y: float = 0):
+        self.x = x
+        self.y = y
 
     def __add__(self, other: vec2d) -> vec2d:
         return vec2d(self.x + other.x, self.y + other.y)
@@ -38,7 +42,7 @@ class vec2d:
     def __truediv__(self, other: float) -> vec2d:
         return vec2d(self.x / other, self.y / other)
 
-    def __itruediv__(self, other: vec2d) -> vec2d:
+    def __itruediv__(self, other: float) -> vec2d:
         self.x /= other
         self.y /= other
         return self
@@ -50,9 +54,7 @@ class vec2d:
         return not self.__eq__(other)
 
     def __neg__(self) -> vec2d:
-        self.x = -self.x
-        self.y = -self.y
-        return self
+        return vec2d(-self.x, -self.y)
 
     def __repr__(self) -> str:
         return f"({self.x}, {self.y})"
@@ -68,12 +70,41 @@ class vec2d:
         factor = abs(self)
         return vec2d(self.x / factor, self.y / factor)
 
+    # allocation free operations for hot paths
+
+    def set(self, x: float, y: float) -> vec2d:
+        self.x = x
+        self.y = y
+        return self
+
+    def copy(self) -> vec2d:
+        return vec2d(self.x, self.y)
+
+    def add_scaled(self, other: vec2d, scale: float) -> vec2d:
+        """
+        Adds other * scale to this vector in place (self += other * scale without the temporary vector)
+        :param other: vector to add
+        :param scale: amount to scale other by
+        :return: self
+        """
+        self.x += other.x * scale
+        self.y += other.y * scale
+        return self
+
+    def dot(self, other: vec2d) -> float:
+        return self.x * other.x + self.y * other.y
+
+    def length_sq(self) -> float:
+        return self.x * self.x + self.y * self.y
+
 
-@dataclass()
 class vec3d:
-    x: (int, float) = 0
-    y: (int, float) = 0
-    z: (int, float) = 0
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x: (int, float) = 0, y: (int, float) = 0, z: (int, float) = 0):
+        self.x = x
+        self.y = y
+        self.z = z
 
     def __add__(self, other: vec3d) -> vec3d:
         return vec3d(self.x + other.x, self.y + other.y, self.z + other.z)
@@ -102,10 +133,13 @@ class vec3d:
         self.z *= other
         return self
 
-    def __rtruediv__(self, other: (int, float)) -> vec3d:
+    def __rmul__(self, other: (int, float)) -> vec3d:
+        return vec3d(self.x * other, self.y * other, self.z * other)
+
+    def __truediv__(self, other: (int, float)) -> vec3d:
         return vec3d(self.x / other, self.y / other, self.z / other)
 
-    def __itruediv__(self, other: vec3d) -> vec3d:
+    def __itruediv__(self, other: (int, float)) -> vec3d:
         self.x /= other
         self.y /= other
         self.z /= other
@@ -118,13 +152,113 @@ class vec3d:
         return not self.__eq__(other)
 
     def __neg__(self) -> vec3d:
-        self.x = -self.x
-        self.y = -self.y
-        self.z = -self.z
-        return self
+        return vec3d(-self.x, -self.y, -self.z)
 
     def __repr__(self) -> str:
         return f"({self.x}, {self.y}, {self.z})"
 
     def __abs__(self) -> float:
         return math.sqrt(self.x ** 2 + self.y ** 2 + self.z ** 2)
+
+    # allocation free operations for hot paths
+
+    def set(self, x: (int, float), y: (int, float), z: (int, float)) -> vec3d:
+        self.x = x
+        self.y = y
+        self.z = z
+        return self
+
+    def copy(self) -> vec3d:
+        return vec3d(self.x, self.y, self.z)
+
+    def add_scaled(self, other: vec3d, scale: (int, float)) -> vec3d:
+        """
+        Adds other * scale to this vector in place (self += other * scale without the temporary vector)
+        :param other: vector to add
+        :param scale: amount to scale other by
+        :return: self
+        """
+        self.x += other.x * scale
+        self.y += other.y * scale
+        self.z += other.z * scale
+        return self
+
+    def dot(self, other: vec3d) -> float:
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+
+class Vec2Array:
+    """
+    Many 2d vectors stored interleaved (x0, y0, x1, y1, ...) in one array of doubles. Batch operations run over the
+    whole buffer at C speed instead of touching one vec2d at a time. Each one builds its result in one temporary array
+    and copies it into m_data, which stays the same object. Writing the values one at a time from python would avoid
+    that buffer but is slower
+    """
+    __slots__ = ("m_data",)
+
+    def __init__(self, count: int = 0):
+        self.m_data: array = array('d', bytes(16 * count))
+
+    @staticmethod
+    def from_vectors(vectors) -> Vec2Array:
+        result = Vec2Array()
+        for vector in vectors:
+            result.m_data.append(vector.x)
+            result.m_data.append(vector.y)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.m_data) // 2
+
+    def __getitem__(self, index: int) -> vec2d:
+        return vec2d(self.m_data[2 * index], self.m_data[2 * index + 1])
+
+    def __setitem__(self, index: int, value: vec2d) -> None:
+        self.m_data[2 * index] = value.x
+        self.m_data[2 * index + 1] = value.y
+
+    def __iter__(self):
+        data = self.m_data
+        for index in range(0, len(data), 2):
+            yield vec2d(data[index], data[index + 1])
+
+    def append(self, x: float, y: float) -> None:
+        self.m_data.append(x)
+        self.m_data.append(y)
+
+    def _check_length(self, other: Vec2Array) -> None:
+        if len(other.m_data) != len(self.m_data):
+            raise ValueError(f"Vec2Array of length {len(other)} does not match length {len(self)}")
+
+    def add(self, other: Vec2Array) -> Vec2Array:
+        """
+        Adds every vector of other to the matching vector of this array, copying the results into this array's buffer
+        :param other: array of the same length
+        :return: self
+        :raises ValueError: if other is not the same length
+        """
+        self._check_length(other)
+        self.m_data[:] = array('d', map(add, self.m_data, other.m_data))
+        return self
+
+    def add_scaled(self, other: Vec2Array, scale: float) -> Vec2Array:
+        """
+        Adds every vector of other scaled by scale to the matching vector of this array, copying the results into this
+        array's buffer
+        :param other: array of the same length
+        :param scale: amount to scale other by
+        :return: self
+        :raises ValueError: if other is not the same length
+        """
+        self._check_length(other)
+        self.m_data[:] = array('d', map(add, self.m_data, map(mul, other.m_data, repeat(scale))))
+        return self
+
+    def scale(self, scale: float) -> Vec2Array:
+        """
+        Multiplies every vector by scale, copying the results into this array's buffer
+        :param scale: amount to scale by
+        :return: self
+        """
+        self.m_data[:] = array('d', map(mul, self.m_data, repeat(scale)))
+        return self
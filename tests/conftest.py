@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from pyengine import Engine
+from pyengine.Constants import HM_OFFSCREEN
+
+
+@pytest.fixture(scope="session")
+def engine(tmp_path_factory):
+    """
+    The engine initialised once for the whole session, offscreen and in debug mode so engine errors raise. Log files
+    are written to a temporary directory
+    """
+    os.chdir(tmp_path_factory.mktemp("engine"))
+    if not Engine.get_init():
+        Engine.set_engine_debugmode(True)
+        Engine.set_headless(HM_OFFSCREEN)
+        Engine.init()
+    return Engine
@@ -0,0 +1,53 @@
+import pytest
+
+from pyengine import Physics
+from pyengine.Physics import CollisionType
+
+ArrayPhysics = pytest.importorskip("pyengine.ArrayPhysics")
+pytest.importorskip("numpy")
+
+# particles spaced far enough apart that only particle vs plane collisions happen, which both backends simulate
+_PLANES = [(0, 400, 800, 20), (300, 100, 200, 30)]
+_PARTICLES = [(60 + i * 70, 200 + (i % 3) * 40, 4, 4, (i - 5) * 4, (i % 4 - 2) * 100) for i in range(11)]
+
+
+def _build(world):
+    for x, y, w, h in _PLANES:
+        world.create_component(CollisionType.PHYS_PLANE, x, y, w, h, 0, 0, 0, apply_grav=False)
+    return [world.create_component(CollisionType.PHYS_PARTICLE, x, y, w, h, vx, vy, 1)
+            for x, y, w, h, vx, vy in _PARTICLES]
+
+
+def test_array_backend_matches_reference_in_plane_only_scenes():
+    reference = Physics.PhysicsWorld()
+    reference.set_sleep_threshold(0, 0)
+    arrays = ArrayPhysics.ArrayPhysicsWorld()
+    referenceBodies = _build(reference)
+    arrayBodies = _build(arrays)
+    for frame in range(240):
+        reference._physics_step(1e3 / 60)
+        arrays._physics_step(1e3 / 60)
+    for expected, actual in zip(referenceBodies, arrayBodies):
+        assert actual.pos.x == pytest.approx(expected.pos.x, abs=1e-6)
+        assert actual.pos.y == pytest.approx(expected.pos.y, abs=1e-6)
+        assert actual.vel.x == pytest.approx(expected.vel.x, abs=1e-6)
+        assert actual.vel.y == pytest.approx(expected.vel.y, abs=1e-6)
+
+
+def test_removed_handle_stays_detached_after_the_world_grows():
+    world = ArrayPhysics.ArrayPhysicsWorld(capacity=1)
+    removed = world.create_component(CollisionType.PHYS_PARTICLE, 1, 1, 2, 2, 0, 0, 1)
+    world.remove_component(removed)
+    kept = world.create_component(CollisionType.PHYS_PARTICLE, 2, 2, 2, 2, 0, 0, 1)
+    last = world.create_component(CollisionType.PHYS_PARTICLE, 3, 3, 2, 2, 0, 0, 1)
+    assert removed.is_removed()
+    with pytest.raises(ReferenceError):
+        removed.pos
+    with pytest.raises(ReferenceError):
+        removed.vel = kept.vel
+    world.remove_component(removed)
+    assert world.m_count == 2
+    assert (kept.pos.x, last.pos.x) == (2, 3)
+    # removing a body moves the last one into its slot, its handle follows
+    world.remove_component(kept)
+    assert last.pos.x == 3 and last.m_index == 0
@@ -0,0 +1,109 @@
+from pyengine import ConVar, Physics
+from pyengine.Physics import CollisionType
+
+
+def test_rejected_binding_leaves_value_unchanged():
+    applied = []
+    var = ConVar.ConVar(int, "test_rejected_binding", 5)
+    var.Bind(applied.append, apply=False)
+    var.Bind(lambda value: value < 10, apply=False)
+    assert not var.SetValue(20)
+    assert var.GetValue() == 5 and var.GetVersion() == 0
+    # the first binding took the new value before the second rejected it, so it is given the old value back
+    assert applied == [20, 5]
+    assert var.SetValue(7)
+    assert var.GetValue() == 7 and var.GetVersion() == 1
+
+
+def test_tickrate_convar_changes_tickrate_while_running(engine):
+    var = ConVar.get_convar("e_tickrate")
+    original = engine.get_engine_tickrate()
+    engine._set_running(True)
+    try:
+        assert var.SetValue(30)
+        assert engine.get_engine_tickrate() == 30
+        assert engine.ticks_to_time(1) == 1e3 / 30
+        assert not var.SetValue(0)
+        assert var.GetValue() == 30 and engine.get_engine_tickrate() == 30
+    finally:
+        engine._set_running(False)
+        var.SetValue(original)
+
+
+def test_gravity_convar_updates_existing_bodies():
+    world = Physics.get_world()
+    var = ConVar.get_convar("phys_gravity")
+    original = var.GetValue()
+    falling = Physics.create_component(CollisionType.PHYS_PARTICLE, 0, 0, 1, 1, 0, 0, 1)
+    floating = Physics.create_component(CollisionType.PHYS_PARTICLE, 0, 0, 1, 1, 0, 0, 1, apply_grav=False)
+    try:
+        assert var.SetValue(30.0)
+        assert falling.accel.y == 30 and floating.accel.y == 0
+    finally:
+        var.SetValue(original)
+        world.remove_component(falling)
+        world.remove_component(floating)
+
+
+def test_physics_steps_convar_rejects_invalid_steps():
+    var = ConVar.get_convar("phys_steps")
+    assert not var.SetValue(0)
+    assert var.GetValue() == Physics.get_world().get_physics_steps()
+
+
+def test_tickrate_setter_and_convar_stay_in_sync(engine):
+    var = ConVar.get_convar("e_tickrate")
+    original = engine.get_engine_tickrate()
+    try:
+        assert engine.set_engine_tickrate(30)
+        assert var.GetValue() == 30
+        assert var.SetValue(original)
+        assert engine.get_engine_tickrate() == original
+        assert not engine.set_engine_tickrate(-1)
+        assert var.GetValue() == original and engine.get_engine_tickrate() == original
+    finally:
+        engine.set_engine_tickrate(original)
+
+
+def test_physics_setters_and_convars_stay_in_sync():
+    world = Physics.get_world()
+    gravity, steps = ConVar.get_convar("phys_gravity"), ConVar.get_convar("phys_steps")
+    originalGravity, originalSteps = gravity.GetValue(), steps.GetValue()
+    try:
+        Physics.set_gravity(50)
+        assert gravity.GetValue() == 50 and world.m_grav.y == 50
+        assert gravity.SetValue(originalGravity)
+        assert world.m_grav.y == originalGravity
+        assert Physics.set_physics_steps(64)
+        assert steps.GetValue() == 64 and world.get_physics_steps() == 64
+        assert not Physics.set_physics_steps(0)
+        assert steps.GetValue() == 64
+        assert steps.SetValue(originalSteps)
+        assert world.get_physics_steps() == originalSteps
+    finally:
+        Physics.set_gravity(originalGravity)
+        Physics.set_physics_steps(originalSteps)
+
+
+def test_prefix_search_narrows_and_widens():
+    for name in ("psearch_alpha", "psearch_alps", "psearch_beta", "psearch_a"):
+        ConVar.ConVar(int, name, 1)
+    search = ConVar.PrefixSearch("psearch_")
+    assert search.count() == 4
+    search.append("al")
+    assert [name for name, _ in search.get()] == ["psearch_alpha", "psearch_alps"]
+    assert search.get() == ConVar.get_startswith("psearch_al")
+    search.append("x")
+    assert search.count() == 0
+    search.backspace(2)
+    assert search.get_prefix() == "psearch_a"
+    assert [name for name, _ in search.get()] == ["psearch_a", "psearch_alpha", "psearch_alps"]
+    assert [name for name, _ in search.get(limit=1, offset=1)] == ["psearch_alpha"]
+
+
+def test_prefix_search_sees_convars_registered_after_it_started():
+    search = ConVar.PrefixSearch("psearch_late")
+    assert search.count() == 0
+    ConVar.ConVar(int, "psearch_late_one", 1)
+    assert search.get() == [("psearch_late_one", 1)]
+    assert ConVar.count_startswith("psearch_late") == 1
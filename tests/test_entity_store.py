@@ -0,0 +1,77 @@
+import pytest
+
+from pyengine import EntityStore, Physics
+from pyengine.Constants import EC_PHYSICS, EC_POSITION, EC_RECT, EC_SPRITE, EC_VELOCITY, C_RED, C_BLUE
+from pyengine.Physics import CollisionType
+
+
+def test_create_and_destroy_keep_rows_consistent():
+    store = EntityStore.EntityStore()
+    entities = [store.create(**{EC_POSITION: (i, i * 2)}) for i in range(4)]
+    assert len(store) == 4
+    store.destroy(entities[0])
+    # the last entity was moved into the removed row
+    assert len(store) == 3 and not store.has(entities[0], EC_POSITION)
+    assert [store.get(entity, EC_POSITION) for entity in entities[1:]] == [{"x": i, "y": i * 2} for i in (1, 2, 3)]
+    archetype, = store.query(EC_POSITION)
+    assert list(archetype.entities) == [entities[3], entities[1], entities[2]]
+    assert list(archetype.column(EC_POSITION, "x")) == [3, 1, 2]
+    with pytest.raises(KeyError):
+        store.create(unknown=(1,))
+
+
+def test_components_move_entities_between_archetypes():
+    store = EntityStore.EntityStore()
+    moving = store.create(**{EC_POSITION: (0, 0), EC_VELOCITY: {"x": 10, "y": -20}})
+    still = store.create(**{EC_POSITION: (5, 5)})
+    cached = store.query(EC_POSITION, EC_RECT)
+    assert cached == []
+    store.add_component(still, EC_RECT, (4, 4, C_RED))
+    # queries made before an archetype existed pick it up
+    assert [len(archetype) for archetype in cached] == [1]
+    assert store.get(still, EC_POSITION) == {"x": 5, "y": 5}
+    store.add_component(still, EC_RECT, {"w": 8, "h": 8, "colour": C_BLUE})
+    assert store.get(still, EC_RECT) == {"w": 8, "h": 8, "colour": C_BLUE}
+    EntityStore.integrate(store, 0.5)
+    assert store.get(moving, EC_POSITION) == {"x": 5, "y": -10}
+    assert store.get(still, EC_POSITION) == {"x": 5, "y": 5}
+    store.remove_component(moving, EC_VELOCITY)
+    assert not store.has(moving, EC_VELOCITY)
+    assert store.get(moving, EC_POSITION) == {"x": 5, "y": -10}
+    assert sum(len(archetype) for archetype in store.query(EC_POSITION, EC_VELOCITY)) == 0
+
+
+def test_sync_physics_copies_body_positions():
+    world = Physics.PhysicsWorld()
+    body = world.create_component(CollisionType.PHYS_PARTICLE, 3, 4, 1, 1, 0, 0, 1)
+    store = EntityStore.EntityStore()
+    entity = store.create(**{EC_POSITION: (0, 0), EC_PHYSICS: (body,)})
+    body.pos = Physics.vec2d(7, 9)
+    EntityStore.sync_physics(store)
+    assert store.get(entity, EC_POSITION) == {"x": 7, "y": 9}
+
+
+def test_draw_entities_queues_one_command_per_entity(engine):
+    store = EntityStore.EntityStore()
+    store.create(**{EC_POSITION: (1, 2), EC_RECT: (3, 4, C_RED)})
+    store.create(**{EC_POSITION: (5, 6), EC_RECT: (7, 8, C_BLUE)})
+    store.create(**{EC_POSITION: (10, 10), EC_SPRITE: ("a", 16, 16)})
+    store.create(**{EC_POSITION: (20, 20), EC_SPRITE: ("b", 8, 8)})
+    store.create(**{EC_POSITION: (30, 30), EC_SPRITE: ("a", 32, 32)})
+    store.create(**{EC_VELOCITY: (1, 1), EC_RECT: (1, 1, C_RED)})
+    queue = engine._m_rQueue
+    queue.reset()
+    try:
+        engine.draw_entities(store, layer=2)
+        commands = [(queue.rType[i], queue.path[i], queue.x[i], queue.y[i], queue.w[i], queue.h[i], queue.col[i],
+                     queue.layer[i]) for i in range(queue.count)]
+    finally:
+        queue.reset()
+    assert commands == [
+        ("rect", None, 1, 2, 3, 4, C_RED, 2),
+        ("rect", None, 5, 6, 7, 8, C_BLUE, 2),
+        # mixed textures are grouped so each texture forms one run
+        ("texture", "a", 10, 10, 16, 16, None, 2),
+        ("texture", "a", 30, 30, 32, 32, None, 2),
+        ("texture", "b", 20, 20, 8, 8, None, 2),
+    ]
@@ -0,0 +1,70 @@
+import pygame
+
+
+def _post(*events):
+    pygame.event.clear()
+    for eventType, attributes in events:
+        pygame.event.post(pygame.event.Event(eventType, attributes))
+
+
+def test_event_types_are_only_allowed_while_something_listens(engine):
+    received = []
+
+    def on_wheel(event):
+        received.append(event.y)
+
+    assert pygame.event.get_blocked(pygame.MOUSEWHEEL)
+    engine.add_event_callback(pygame.MOUSEWHEEL, on_wheel)
+    try:
+        assert not pygame.event.get_blocked(pygame.MOUSEWHEEL)
+        _post((pygame.MOUSEWHEEL, {"x": 0, "y": 3}))
+        engine._engine_gather_input()
+        assert received == [3]
+    finally:
+        assert engine.remove_event_callback(pygame.MOUSEWHEEL, on_wheel) == 0
+    assert pygame.event.get_blocked(pygame.MOUSEWHEEL)
+    _post((pygame.MOUSEWHEEL, {"x": 0, "y": 5}))
+    engine._engine_gather_input()
+    assert received == [3]
+    assert not pygame.event.get_blocked(pygame.KEYDOWN)
+
+
+def test_key_callbacks_only_see_their_key(engine):
+    space, any_key = [], []
+
+    def on_space(event):
+        space.append(event.key)
+
+    def on_key(event):
+        any_key.append(event.key)
+
+    engine.add_event_callback(pygame.KEYDOWN, on_space, key=pygame.K_SPACE)
+    engine.add_key_callback(on_key)
+    try:
+        _post((pygame.KEYDOWN, {"key": pygame.K_a}), (pygame.KEYDOWN, {"key": pygame.K_SPACE}))
+        engine._engine_gather_input()
+    finally:
+        engine.remove_event_callback(pygame.KEYDOWN, on_space, key=pygame.K_SPACE)
+        engine.remove_key_callback(on_key)
+    assert space == [pygame.K_SPACE]
+    assert any_key == [pygame.K_a, pygame.K_SPACE]
+
+
+def test_mouse_motion_is_coalesced_in_order(engine):
+    seen = []
+
+    def on_event(event):
+        seen.append((event.type, getattr(event, "rel", None)))
+
+    engine.add_event_callback(pygame.MOUSEMOTION, on_event)
+    engine.add_event_callback(pygame.MOUSEBUTTONDOWN, on_event)
+    try:
+        _post((pygame.MOUSEMOTION, {"pos": (1, 1), "rel": (1, 1), "buttons": (0, 0, 0)}),
+              (pygame.MOUSEMOTION, {"pos": (3, 4), "rel": (2, 3), "buttons": (0, 0, 0)}),
+              (pygame.MOUSEBUTTONDOWN, {"pos": (3, 4), "button": 1}),
+              (pygame.MOUSEMOTION, {"pos": (4, 4), "rel": (1, 0), "buttons": (0, 0, 0)}))
+        engine._engine_gather_input()
+    finally:
+        engine.remove_event_callback(pygame.MOUSEMOTION, on_event)
+        engine.remove_event_callback(pygame.MOUSEBUTTONDOWN, on_event)
+    assert seen == [(pygame.MOUSEMOTION, (3, 4)), (pygame.MOUSEBUTTONDOWN, None), (pygame.MOUSEMOTION, (1, 0))]
@@ -0,0 +1,26 @@
+from pyengine import ConVar, EngineLog
+from pyengine.Constants import LOG_POLICY_BLOCK, LOG_POLICY_DROP
+
+
+def test_logger_passes_queue_settings_to_new_sink(engine, tmp_path):
+    path = str(tmp_path / "options.log")
+    logger = EngineLog.Logger(path, "TEST", maxQueued=8, policy=LOG_POLICY_BLOCK, flushInterval=0.1)
+    sink = logger.get_sink()
+    assert sink.m_queue.maxsize == 8
+    assert sink.m_policy == LOG_POLICY_BLOCK
+    assert sink.m_flushInterval == 0.1
+    # a second logger on the same path shares the sink as it was created
+    other = EngineLog.Logger(path, "OTHER", maxQueued=64)
+    assert other.get_sink() is sink and sink.m_queue.maxsize == 8
+    del logger, other
+
+
+def test_log_policy_convar_updates_engine_sink(engine):
+    sink = engine.get_client_logger().get_sink()
+    policy = ConVar.get_convar("log_policy")
+    assert policy.SetValue(LOG_POLICY_BLOCK)
+    assert sink.m_policy == LOG_POLICY_BLOCK
+    assert not policy.SetValue(7)
+    assert sink.m_policy == LOG_POLICY_BLOCK
+    assert policy.SetValue(LOG_POLICY_DROP)
+    assert sink.m_policy == LOG_POLICY_DROP
@@ -0,0 +1,92 @@
+from pyengine import Physics
+from pyengine.Physics import CollisionType
+
+
+def _settle(world: Physics.PhysicsWorld, frames: int = 600) -> None:
+    for _ in range(frames):
+        world._physics_step(1e3 / 60)
+
+
+def _pile_on_floor():
+    world = Physics.PhysicsWorld()
+    floor = world.create_component(CollisionType.PHYS_PLANE, 0, 300, 400, 20, 0, 0, 0, apply_grav=False)
+    bodies = [world.create_component(CollisionType.PHYS_PARTICLE, 20 + i * 15, 250, 4, 4, 0, 0, 1)
+              for i in range(20)]
+    _settle(world)
+    return world, floor, bodies
+
+
+def test_resting_bodies_fall_asleep():
+    world, floor, bodies = _pile_on_floor()
+    assert all(body.sleeping for body in bodies)
+    assert all(body.pos.y < 300 for body in bodies)
+
+
+def test_removing_support_wakes_resting_bodies():
+    world, floor, bodies = _pile_on_floor()
+    resting = [body.pos.y for body in bodies]
+    world.remove_component(floor)
+    _settle(world, 60)
+    assert not any(body.sleeping for body in bodies)
+    assert all(body.pos.y > y + 20 for body, y in zip(bodies, resting))
+
+
+def test_removing_unrelated_body_leaves_sleepers_alone():
+    world, floor, bodies = _pile_on_floor()
+    far = world.create_component(CollisionType.PHYS_PLANE, 2000, 2000, 10, 10, 0, 0, 0, apply_grav=False)
+    world.remove_component(far)
+    assert all(body.sleeping for body in bodies)
+
+
+def test_particle_hitting_plane_from_below_stays_below():
+    world = Physics.PhysicsWorld(gravity=0)
+    ceiling = world.create_component(CollisionType.PHYS_PLANE, 0, 100, 200, 40, 0, 0, 0, apply_grav=False)
+    particle = world.create_component(CollisionType.PHYS_PARTICLE, 100, 160, 4, 4, 0, -200, 1, apply_grav=False)
+    _settle(world, 30)
+    assert particle.pos.y > ceiling.pos.y + ceiling.dimensions.y
+    assert particle.vel.y > 0
+
+
+def _fire_at_thin_plane(ccd: bool):
+    world = Physics.PhysicsWorld(gravity=0)
+    world.create_component(CollisionType.PHYS_PLANE, 0, 200, 400, 2, 0, 0, 0, apply_grav=False)
+    particle = world.create_component(CollisionType.PHYS_PARTICLE, 200, 100, 2, 2, 0, 20000, 1, apply_grav=False,
+                                      ccd=ccd)
+    _settle(world, 10)
+    return particle
+
+
+def test_fast_particle_tunnels_without_ccd():
+    assert _fire_at_thin_plane(False).pos.y > 202
+
+
+def test_ccd_stops_fast_particle_tunnelling():
+    particle = _fire_at_thin_plane(True)
+    assert particle.pos.y < 200
+    assert particle.vel.y < 0
+
+
+def test_worlds_are_independent():
+    light, heavy = Physics.PhysicsWorld(gravity=10), Physics.PhysicsWorld(steps=64, gravity=400)
+    a = light.create_component(CollisionType.PHYS_PARTICLE, 0, 0, 2, 2, 0, 0, 1)
+    b = heavy.create_component(CollisionType.PHYS_PARTICLE, 0, 0, 2, 2, 0, 0, 1)
+    assert light.get_components() == [a] and heavy.get_components() == [b]
+    assert Physics.step_worlds([light, heavy], 100) == [3, 6]
+    assert 0 < a.pos.y < b.pos.y
+    assert a not in Physics.get_world().get_components()
+
+
+def test_step_worlds_matches_stepping_each_world():
+    idle, floor, bodies = _pile_on_floor()
+    resting = [(body.pos.x, body.pos.y) for body in bodies]
+    idle.m_internal_lag = 0
+    moving, reference = Physics.PhysicsWorld(), Physics.PhysicsWorld()
+    for world in (moving, reference):
+        world.create_component(CollisionType.PHYS_PARTICLE, 10, 10, 2, 2, 30, 0, 1)
+    for _ in range(30):
+        steps = reference._physics_step(1e3 / 60)
+        assert Physics.step_worlds([moving, idle], 1e3 / 60) == [steps, steps]
+    assert moving.get_components()[0].pos == reference.get_components()[0].pos
+    # the sleeping world only advanced its accumulator
+    assert idle.m_internal_lag == reference.m_internal_lag
+    assert [(body.pos.x, body.pos.y) for body in bodies] == resting
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from pyengine import Physics, PhysicsProcess
+from pyengine.Physics import CollisionType
+from pyengine.Scene import Scene
+
+_START = [(10, 20), (30, 40), (50, 60)]
+
+
+def _build_still():
+    world = Physics.PhysicsWorld(gravity=0)
+    for x, y in _START:
+        world.create_component(CollisionType.PHYS_PARTICLE, x, y, 2, 2, 0, 0, 1, apply_grav=False)
+    return world
+
+
+def _move(world, index, x, y):
+    world.get_components()[index].pos = Physics.vec2d(x, y)
+
+
+def _wait_for(process, check, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.get_error() is None
+        snapshot = process.acquire()
+        if snapshot is not None and check(snapshot):
+            return snapshot
+        process.release()
+        time.sleep(0.005)
+    raise AssertionError("physics process did not publish the expected snapshot")
+
+
+def test_snapshots_match_the_simulated_world():
+    with PhysicsProcess.PhysicsProcess(_build_still, capacity=2) as process:
+        # bodies past the capacity are simulated but not published
+        snapshot = _wait_for(process, lambda snap: True)
+        assert len(snapshot) == 2
+        assert [snapshot.get_pos(index) for index in range(2)] == _START[:2]
+        process.release()
+        process.call(_move, 1, 70, 80)
+        snapshot = _wait_for(process, lambda snap: snap.get_pos(1) == (70, 80))
+        assert snapshot.get_pos(0) == _START[0]
+        process.release()
+        assert process.get_positions() == ([10, 70], [20, 80])
+        assert process.get_steps() > 0
+
+
+def test_acquire_release_close_cycle():
+    process = PhysicsProcess.PhysicsProcess(_build_still, capacity=3)
+    snapshot = _wait_for(process, lambda snap: True)
+    header = process.m_header
+    # the buffer being read is held so the worker publishes into the other one
+    assert header[PhysicsProcess._HDR_HOLD] == header[PhysicsProcess._HDR_FRONT]
+    sequence = snapshot.sequence
+    process.release()
+    assert header[PhysicsProcess._HDR_HOLD] == -1
+    newer = _wait_for(process, lambda snap: snap.sequence > sequence)
+    # views from the previous acquire are released when a new snapshot is acquired
+    with pytest.raises(ValueError):
+        snapshot.x[0]
+    assert newer.get_pos(2) == _START[2]
+    process.release()
+    process.close()
+    assert not process.m_process.is_alive()
+    assert process.get_error() is None
+    with pytest.raises(ValueError):
+        newer.x[0]
+    process.close()
+
+
+class _FailingScene(Scene):
+
+    def step_scene(self):
+        pass
+
+    def draw_scene(self):
+        assert self.engine.get_physics_snapshot() is not None
+        raise RuntimeError("draw failed")
+
+
+def test_snapshot_is_released_when_drawing_fails(engine):
+    with PhysicsProcess.PhysicsProcess(_build_still, capacity=3) as process:
+        _wait_for(process, lambda snap: True)
+        process.release()
+        engine.set_physics_process(process)
+        engine.set_scene(_FailingScene())
+        try:
+            with pytest.raises(RuntimeError):
+                engine._engine_draw()
+        finally:
+            engine.set_scene(None)
+            engine.set_physics_process(None)
+            engine._m_rQueue.reset()
+        assert process.m_header[PhysicsProcess._HDR_HOLD] == -1
+        assert engine.get_physics_snapshot() is None
@@ -0,0 +1,55 @@
+import gc
+import weakref
+
+import pygame
+
+from pyengine.Scene import Scene
+
+
+class _RecordingScene(Scene):
+
+    def __init__(self, log, name):
+        super().__init__()
+        self.m_log = log
+        self.m_name = name
+
+    def step_scene(self):
+        pass
+
+    def draw_scene(self):
+        pass
+
+    def on_enter(self):
+        self.m_log.append(("enter", self.m_name))
+
+    def on_exit(self):
+        self.m_log.append(("exit", self.m_name))
+
+    def on_key_event(self, event):
+        self.m_log.append(("key", self.m_name))
+
+
+def test_switching_scenes_calls_lifecycle_hooks(engine):
+    log = []
+    first, second = _RecordingScene(log, "first"), _RecordingScene(log, "second")
+    engine.set_scene(first)
+    engine.set_scene(second)
+    engine.set_scene(None)
+    assert log == [("enter", "first"), ("exit", "first"), ("enter", "second"), ("exit", "second")]
+
+
+def test_previous_scene_is_released(engine):
+    log = []
+    callbacks = len(engine._m_eKeyCallback)
+    scene = _RecordingScene(log, "scene")
+    released = weakref.ref(scene)
+    engine.set_scene(scene)
+    engine.set_scene(None)
+    assert len(engine._m_eKeyCallback) == callbacks + 1
+    del scene
+    gc.collect()
+    assert released() is None
+    # its key callback was held weakly so it is dropped rather than keeping the scene alive or being called
+    assert len(engine._m_eKeyCallback) == callbacks
+    engine._engine_dispatch_keys(pygame.event.Event(pygame.KEYDOWN, {"key": pygame.K_a}))
+    assert log == [("enter", "scene"), ("exit", "scene")]
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from pyengine.Scheduler import SystemScheduler
+
+
+def _recorder(log, name):
+    return lambda: log.append(name)
+
+
+def test_systems_run_in_added_order_unless_declared_after():
+    log = []
+    scheduler = SystemScheduler()
+    scheduler.add("input", _recorder(log, "input"), _recorder(log, "draw input"))
+    scheduler.add("physics", _recorder(log, "physics"), _recorder(log, "draw physics"), after=("ai",))
+    scheduler.add("ai", _recorder(log, "ai"), _recorder(log, "draw ai"), after=("missing",))
+    scheduler.update()
+    scheduler.render()
+    assert log == ["input", "ai", "physics", "draw input", "draw ai", "draw physics"]
+
+
+def test_dependency_cycle_is_rejected():
+    log = []
+    scheduler = SystemScheduler()
+    scheduler.add("a", _recorder(log, "a"), lambda: None, after=("b",))
+    with pytest.raises(ValueError):
+        scheduler.add("b", _recorder(log, "b"), lambda: None, after=("a",))
+    with pytest.raises(ValueError):
+        scheduler.add("a", _recorder(log, "a"), lambda: None)
+    # the rejected system was not kept and the rest still run
+    scheduler.add("b", _recorder(log, "b"), lambda: None)
+    scheduler.update()
+    assert log == ["b", "a"]
+
+
+def test_independent_systems_run_together_and_conflicting_ones_do_not():
+    scheduler = SystemScheduler(threads=4)
+    try:
+        # each of these only finishes once the other has started, so they must run at the same time
+        meeting = threading.Barrier(2, timeout=5)
+        scheduler.add("left", meeting.wait, lambda: None, reads=("world",))
+        scheduler.add("right", meeting.wait, lambda: None, reads=("world",))
+        active = []
+        overlaps = []
+
+        def writer():
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+        for index in range(4):
+            scheduler.add(f"writer{index}", writer, lambda: None, writes=("score",))
+        for _ in range(3):
+            scheduler.update()
+        assert overlaps == [1] * 12
+    finally:
+        scheduler.set_threads(0)
+
+
+def test_update_exceptions_reach_the_caller():
+    def broken():
+        raise RuntimeError("system failed")
+
+    scheduler = SystemScheduler(threads=2)
+    try:
+        scheduler.add("ok", lambda: None, lambda: None)
+        scheduler.add("broken", broken, lambda: None)
+        with pytest.raises(RuntimeError):
+            scheduler.update()
+    finally:
+        scheduler.set_threads(0)
@@ -0,0 +1,43 @@
+from pyengine import Physics
+from pyengine.Physics import CollisionType
+from pyengine.ShardRunner import ShardRunner
+
+
+def _build_falling(index):
+    world = Physics.PhysicsWorld(gravity=0)
+    for body in range(index % 3 + 1):
+        world.create_component(CollisionType.PHYS_PARTICLE, body * 50, 0, 2, 2, 0, 10 * (index + 1), 1,
+                               apply_grav=False)
+    return world
+
+
+def _collect_height(world):
+    bodies = world.get_components()
+    return len(bodies), bodies[0].pos.y
+
+
+def test_independent_shards_report_every_simulation():
+    with ShardRunner(_build_falling, 5, shards=2) as runner:
+        assert runner.get_shards() == 2
+        assert [result[0] for result in runner.get_results()] == [1, 2, 3, 1, 2]
+        stats = runner.run(32, tickTime=1e3 / 32)
+        assert len(stats["shards"]) == 2 and stats["ticks_per_second"] > 0
+        # default results: bodies, awake bodies (all of them, they never stop moving) and broadphase pairs
+        assert runner.get_results() == [(count, count, 0) for count in (1, 2, 3, 1, 2)]
+        assert [stat["ticks"] for stat in runner.get_shard_stats()] == [32, 32]
+        assert [list(stat["simulations"]) for stat in runner.get_shard_stats()] == [[0, 1], [2, 3, 4]]
+
+
+def test_lockstep_shards_share_every_tick():
+    heights = []
+
+    def on_tick(runner, tick):
+        heights.append([result[1] for result in runner.get_results()])
+
+    with ShardRunner(_build_falling, 4, shards=2, resultSize=2, collect=_collect_height) as runner:
+        runner.run(3, tickTime=1e3 / 32, lockstep=True, onTick=on_tick)
+        final = runner.get_results()
+    assert len(heights) == 3
+    for tick, row in enumerate(heights, 1):
+        assert row == [10 * (index + 1) * tick / 32 for index in range(4)]
+    assert final == [(index % 3 + 1, 10 * (index + 1) * 3 / 32) for index in range(4)]
@@ -0,0 +1,20 @@
+import pytest
+
+from pyengine.vector import vec2d, Vec2Array
+
+
+def test_batch_operations_write_into_the_same_buffer():
+    positions = Vec2Array.from_vectors([vec2d(1, 2), vec2d(3, 4)])
+    velocities = Vec2Array.from_vectors([vec2d(10, 20), vec2d(30, 40)])
+    data = positions.m_data
+    positions.add(velocities).add_scaled(velocities, 0.5).scale(2)
+    assert positions.m_data is data
+    assert list(positions.m_data) == [32, 64, 96, 128]
+
+
+@pytest.mark.parametrize("operation", [lambda a, b: a.add(b), lambda a, b: a.add_scaled(b, 2)])
+def test_mismatched_lengths_are_rejected(operation):
+    positions = Vec2Array(3)
+    with pytest.raises(ValueError):
+        operation(positions, Vec2Array(2))
+    assert len(positions) == 3